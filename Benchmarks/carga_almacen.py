@@ -0,0 +1,103 @@
+"""
+Compara el tiempo de carga y la memoria del CSV limpio contra el almacén Parquet.
+
+Se replica 'Data/homicidios_limpio.csv' la cantidad de veces indicada (con 'Id'
+distintos) para obtener un volumen representativo y cada lectura se ejecuta en un
+intérprete nuevo, de modo que la memoria residente máxima no arrastre lecturas previas.
+
+Uso:
+    python Benchmarks/carga_almacen.py [--copias N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import almacen
+
+LECTURA = '''
+import json, os, resource, sys, time
+sys.path.insert(0, {raiz!r})
+import pandas as pd
+import almacen
+inicio = time.perf_counter()
+df = {lectura}
+segundos = time.perf_counter() - inicio
+# ru_maxrss se hereda del proceso padre en Linux; VmHWM se reinicia con cada intérprete
+rss_max_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if os.path.exists('/proc/self/status'):
+    with open('/proc/self/status') as estado:
+        rss_max_kb = next(int(l.split()[1]) for l in estado if l.startswith('VmHWM'))
+print(json.dumps({{'segundos': segundos, 'filas': len(df),
+                  'memoria_df': int(df.memory_usage(deep=True).sum()),
+                  'rss_max_kb': rss_max_kb}}))
+'''
+
+
+def preparar_datos(directorio, copias):
+    """
+    Genera el CSV replicado y su dataset Parquet equivalente.
+
+    Parameters:
+        directorio (str): Directorio temporal donde escribir los archivos.
+        copias (int): Cantidad de copias del CSV limpio.
+
+    Returns:
+        tuple: La ruta del CSV y la del dataset Parquet.
+    """
+    base = pd.read_csv(os.path.join(RAIZ, 'Data/homicidios_limpio.csv'), usecols=almacen.ESQUEMA.names)
+    partes = []
+    for copia in range(copias):
+        parte = base.copy()
+        parte['Id'] = parte['Id'] + f'-{copia:05d}'
+        partes.append(parte)
+    datos = pd.concat(partes, ignore_index=True)
+
+    ruta_csv = os.path.join(directorio, 'homicidios.csv')
+    ruta_parquet = os.path.join(directorio, 'homicidios_parquet')
+    datos.to_csv(ruta_csv, index=False, encoding='utf-8')
+    almacen.escribir_parquet(datos, ruta_parquet)
+    return ruta_csv, ruta_parquet
+
+
+def medir(lectura):
+    """
+    Ejecuta una lectura en un intérprete nuevo y devuelve sus métricas.
+    """
+    codigo = LECTURA.format(raiz=RAIZ, lectura=lectura)
+    salida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True, check=True)
+    return json.loads(salida.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--copias', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_csv, ruta_parquet = preparar_datos(directorio, args.copias)
+        escenarios = {
+            'CSV completo': f'pd.read_csv({ruta_csv!r})',
+            'Parquet completo': f'almacen.leer_parquet({ruta_parquet!r})',
+            'CSV 3 columnas, 2021': f"(lambda d: d[d['Año'] == 2021])(pd.read_csv({ruta_csv!r}, "
+                                    f"usecols=['Año', 'Rol', 'Víctima']))",
+            'Parquet 3 columnas, 2021': f"almacen.leer_parquet({ruta_parquet!r}, columnas=['Año', 'Rol', 'Víctima'], "
+                                        f"filtros=[('Año', '==', 2021)])",
+        }
+
+        print(f"{'Escenario':<28}{'Filas':>10}{'Segundos':>10}{'DataFrame (MB)':>16}{'RSS máx (MB)':>14}")
+        for escenario, lectura in escenarios.items():
+            metricas = medir(lectura)
+            print(f"{escenario:<28}{metricas['filas']:>10}{metricas['segundos']:>10.3f}"
+                  f"{metricas['memoria_df'] / 2**20:>16.1f}{metricas['rss_max_kb'] / 1024:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
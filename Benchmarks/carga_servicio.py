@@ -0,0 +1,154 @@
+"""
+Prueba de carga local del servicio HTTP de 'servicio.py'.
+
+Levanta el servicio en un proceso aparte (o usa uno ya levantado con --url) y abre
+'--clientes' conexiones keep-alive concurrentes. Cada cliente hace '--peticiones'
+peticiones tomadas de una mezcla de tablas, KPIs y filtros; una fracción '--condicionales'
+repite la petición con el ETag recibido en 'If-None-Match', como un tablero que refresca.
+Se informan las respuestas por código, las peticiones por segundo y los percentiles de
+latencia. Si alguna respuesta no es 200 o 304, el script termina con código 1.
+
+Uso:
+    python Benchmarks/carga_servicio.py [--clientes 200] [--peticiones 50] [--url http://127.0.0.1:8000]
+"""
+import argparse
+import asyncio
+import collections
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.parse
+import urllib.request
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TABLAS = ['victimas_por_dia_semana', 'accidentes_por_hora_del_dia', 'victimas_por_rol_y_sexo',
+          'victimas_mensuales_por_anio', 'estadisticas_edad_por_rol', 'victimas_por_tipo_de_calle']
+
+FILTROS = ['', 'anio=2021', 'anio=2020,2021', 'comuna=1', 'comuna=1,3&victima=moto',
+           'victima=MOTO', 'desde=2019-01-01&hasta=2019-06-30', 'anio=2018&comuna=4']
+
+
+def rutas(cantidad, semilla=0):
+    """
+    Genera una mezcla reproducible de rutas de tablas y KPIs con filtros.
+    """
+    azar = random.Random(semilla)
+    mezcla = []
+    for _ in range(cantidad):
+        ruta = '/kpis' if azar.random() < 0.25 else f'/tablas/{azar.choice(TABLAS)}'
+        filtro = azar.choice(FILTROS)
+        mezcla.append(f'{ruta}?{filtro}' if filtro else ruta)
+    return mezcla
+
+
+async def _peticion(lector, escritor, host, objetivo, etag=None):
+    cabeceras = f'GET {objetivo} HTTP/1.1\r\nHost: {host}\r\n'
+    if etag:
+        cabeceras += f'If-None-Match: {etag}\r\n'
+    escritor.write((cabeceras + '\r\n').encode('latin-1'))
+    await escritor.drain()
+
+    codigo = int((await lector.readline()).split()[1])
+    encabezados = {}
+    while (linea := await lector.readline()) not in (b'\r\n', b''):
+        nombre, _, valor = linea.decode('latin-1').partition(':')
+        encabezados[nombre.strip().lower()] = valor.strip()
+    await lector.readexactly(int(encabezados.get('content-length', 0)))
+    return codigo, encabezados.get('etag')
+
+
+async def cliente(host, puerto, objetivos, condicionales, azar, latencias, codigos):
+    """
+    Hace las peticiones de un cliente por una conexión keep-alive y registra latencias y códigos.
+    """
+    lector, escritor = await asyncio.open_connection(host, puerto, limit=2**24)
+    etags = {}
+    try:
+        for objetivo in objetivos:
+            etag = etags.get(objetivo) if azar.random() < condicionales else None
+            inicio = time.perf_counter()
+            codigo, etag = await _peticion(lector, escritor, host, objetivo, etag)
+            latencias.append(time.perf_counter() - inicio)
+            codigos[codigo] += 1
+            if etag:
+                etags[objetivo] = etag
+    finally:
+        escritor.close()
+
+
+async def carga(host, puerto, clientes, peticiones, condicionales, semilla):
+    latencias, codigos = [], collections.Counter()
+    # Pocas rutas distintas por cliente, como un tablero que vuelve a pedir sus gráficos
+    tareas = []
+    for i in range(clientes):
+        propias = rutas(5, semilla + i)
+        azar = random.Random(semilla + i)
+        objetivos = [azar.choice(propias) for _ in range(peticiones)]
+        tareas.append(cliente(host, puerto, objetivos, condicionales, azar, latencias, codigos))
+    inicio = time.perf_counter()
+    await asyncio.gather(*tareas)
+    return time.perf_counter() - inicio, np.array(latencias), codigos
+
+
+def esperar_servicio(url, proceso, segundos=120):
+    limite = time.monotonic() + segundos
+    while time.monotonic() < limite:
+        if proceso is not None and proceso.poll() is not None:
+            sys.exit(f'El servicio terminó con código {proceso.returncode}')
+        try:
+            with urllib.request.urlopen(url + '/salud', timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    sys.exit(f'El servicio no respondió en {segundos} s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clientes', type=int, default=200)
+    parser.add_argument('--peticiones', type=int, default=50, help='Peticiones por cliente')
+    parser.add_argument('--condicionales', type=float, default=0.5,
+                        help="Fracción de peticiones con 'If-None-Match'")
+    parser.add_argument('--url', default=None, help='Servicio ya levantado; por defecto se levanta uno')
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args()
+
+    proceso = None
+    url = args.url
+    if url is None:
+        url = f'http://127.0.0.1:{args.puerto}'
+        proceso = subprocess.Popen([sys.executable, 'servicio.py', '--puerto', str(args.puerto)],
+                                   cwd=RAIZ, stdout=subprocess.DEVNULL)
+    try:
+        esperar_servicio(url, proceso)
+        partes = urllib.parse.urlsplit(url)
+        segundos, latencias, codigos = asyncio.run(
+            carga(partes.hostname, partes.port or 80, args.clientes, args.peticiones,
+                  args.condicionales, args.semilla))
+        with urllib.request.urlopen(url + '/salud') as respuesta:
+            salud = respuesta.read().decode()
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            proceso.wait()
+
+    total = len(latencias)
+    print(f'{args.clientes} clientes x {args.peticiones} peticiones = {total} en {segundos:.2f} s '
+          f'({total / segundos:.0f} peticiones/s)')
+    print('Códigos: ' + ', '.join(f'{codigo}: {cantidad}' for codigo, cantidad in sorted(codigos.items())))
+    for percentil in (50, 90, 99):
+        print(f'p{percentil:<3}{np.percentile(latencias, percentil) * 1000:>10.2f} ms')
+    print(f"{'max':<4}{latencias.max() * 1000:>10.2f} ms")
+    print(f'Salud: {salud}')
+    if set(codigos) - {200, 304}:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
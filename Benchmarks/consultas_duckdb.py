@@ -0,0 +1,95 @@
+"""
+Verifica que las consultas de DuckDB den los mismos resultados que pandas y compara tiempos.
+
+Para cada tabla de 'agregaciones.tablas_eda' y para el histórico de 'kpis' se comparan los
+resultados de 'consultas.ConsultasDuckDB' con los de pandas (sin importar el orden de las
+filas con empates) y se informa el tiempo de cada camino sobre el CSV limpio replicado. Si
+alguna tabla difiere, el script termina con código 1.
+
+Uso:
+    python Benchmarks/consultas_duckdb.py [--copias N] [--hilos N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+os.chdir(RAIZ)
+
+import agregaciones
+import consultas
+import kpis
+
+
+def _ordenada(tabla):
+    tabla = tabla.reset_index(drop=True)
+    return tabla.sort_values(list(tabla.columns), kind='stable').reset_index(drop=True)
+
+
+def diferencias(pandas, duckdb):
+    """
+    Compara dos diccionarios de tablas y devuelve el mensaje de cada tabla que difiere.
+    """
+    errores = {}
+    for nombre, esperada in pandas.items():
+        try:
+            pd.testing.assert_frame_equal(_ordenada(esperada), _ordenada(duckdb[nombre]),
+                                          check_dtype=False, check_column_type=False)
+        except AssertionError as error:
+            errores[nombre] = str(error)
+    return errores
+
+
+def cronometrar(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--copias', type=int, default=100)
+    parser.add_argument('--hilos', type=int, default=None)
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+
+    base = pd.read_csv(consultas.RUTA_LIMPIO)
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'homicidios.csv')
+        pd.concat([base] * args.copias, ignore_index=True).to_csv(ruta, index=False, encoding='utf-8')
+
+        def con_pandas():
+            df = pd.read_csv(ruta)
+            tablas = agregaciones.tablas_eda(df)
+            tablas['kpis'] = kpis.calcular_historico(df)
+            return tablas
+
+        def con_duckdb():
+            consulta = consultas.ConsultasDuckDB(ruta, hilos=args.hilos)
+            tablas = consulta.tablas_eda()
+            tablas['kpis'] = consulta.kpis_historico()
+            consulta.cerrar()
+            return tablas
+
+        esperadas, segundos_pandas = cronometrar(con_pandas)
+        obtenidas, segundos_duckdb = cronometrar(con_duckdb)
+
+    errores = diferencias(esperadas, obtenidas)
+    print(f'{len(base) * args.copias} filas, {len(esperadas)} tablas')
+    print(f"{'pandas (lectura + tablas)':<30}{segundos_pandas:>10.2f} s")
+    print(f"{'DuckDB (carga + consultas)':<30}{segundos_duckdb:>10.2f} s")
+    for nombre, error in errores.items():
+        print(f'\nDifiere {nombre}:\n{error}')
+    if errores:
+        sys.exit(1)
+    print('Todas las tablas coinciden.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Mide el índice espacial de grilla sobre puntos sintéticos en la extensión de CABA.
+
+Se generan puntos uniformes dentro del rectángulo que cubren las coordenadas 'XY (CABA)'
+de los datos limpios y se comparan las consultas por radio y de k vecinos contra la fuerza
+bruta con numpy, verificando que devuelvan los mismos puntos.
+
+Uso:
+    python Benchmarks/indice_espacial.py [--puntos N] [--consultas N] [--radio METROS] [--k K]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import espacial
+
+# Extensión aproximada de 'XY (CABA)' en metros
+EXTENSION_X = (93900.0, 109800.0)
+EXTENSION_Y = (91600.0, 110500.0)
+
+
+def cronometrar(funcion, *args):
+    """
+    Ejecuta la función y devuelve su resultado y los segundos que tardó.
+    """
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--puntos', type=int, default=1_000_000)
+    parser.add_argument('--consultas', type=int, default=200)
+    parser.add_argument('--radio', type=float, default=200.0)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args()
+
+    generador = np.random.default_rng(args.semilla)
+    x = generador.uniform(*EXTENSION_X, args.puntos)
+    y = generador.uniform(*EXTENSION_Y, args.puntos)
+    centros = np.column_stack([generador.uniform(*EXTENSION_X, args.consultas),
+                               generador.uniform(*EXTENSION_Y, args.consultas)])
+
+    indice, construccion = cronometrar(espacial.IndiceGrilla, x, y)
+
+    def radio_indice():
+        return [indice.en_radio(cx, cy, args.radio) for cx, cy in centros]
+
+    def radio_fuerza_bruta():
+        return [np.flatnonzero((x - cx) ** 2 + (y - cy) ** 2 <= args.radio ** 2) for cx, cy in centros]
+
+    def vecinos_indice():
+        return [indice.vecinos(cx, cy, args.k)[0] for cx, cy in centros]
+
+    def vecinos_fuerza_bruta():
+        resultados = []
+        for cx, cy in centros:
+            distancias = np.hypot(x - cx, y - cy)
+            cercanos = np.argpartition(distancias, args.k)[:args.k]
+            resultados.append(cercanos[np.argsort(distancias[cercanos], kind='stable')])
+        return resultados
+
+    radio, t_radio = cronometrar(radio_indice)
+    radio_bruto, t_radio_bruto = cronometrar(radio_fuerza_bruta)
+    vecinos, t_vecinos = cronometrar(vecinos_indice)
+    vecinos_bruto, t_vecinos_bruto = cronometrar(vecinos_fuerza_bruta)
+    hotspots, t_densidad = cronometrar(indice.hotspots, 10)
+
+    assert all(np.array_equal(a, b) for a, b in zip(radio, radio_bruto)), 'Las consultas por radio difieren'
+    assert all(np.array_equal(np.sort(a), np.sort(b)) for a, b in zip(vecinos, vecinos_bruto)), \
+        'Las consultas de vecinos difieren'
+
+    por_consulta = 1000 / args.consultas
+    print(f'{args.puntos} puntos, {args.consultas} consultas, radio {args.radio:g} m, k={args.k}')
+    print(f'Construcción del índice: {construccion:.3f} s')
+    print(f"{'Consulta':<20}{'Índice (ms)':>14}{'Fuerza bruta (ms)':>20}{'Aceleración':>14}")
+    print(f"{'Radio':<20}{t_radio * por_consulta:>14.3f}{t_radio_bruto * por_consulta:>20.3f}"
+          f"{t_radio_bruto / t_radio:>13.1f}x")
+    print(f"{'k vecinos':<20}{t_vecinos * por_consulta:>14.3f}{t_vecinos_bruto * por_consulta:>20.3f}"
+          f"{t_vecinos_bruto / t_vecinos:>13.1f}x")
+    print(f'Densidad y hotspots: {t_densidad:.3f} s (celda más densa: {hotspots["Cantidad"].iloc[0]} puntos)')
+
+
+if __name__ == '__main__':
+    main()
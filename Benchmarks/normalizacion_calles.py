@@ -0,0 +1,76 @@
+"""
+Mide la deduplicación de direcciones con el resolvedor de calles sobre variantes sintéticas.
+
+A partir de los lugares de 'Data/homicidios_limpio.csv' se generan direcciones distintas
+cambiando mayúsculas, abreviaturas y alturas e introduciendo errores de tipeo, y se
+resuelven todas con 'normalizacion.ResolvedorCalles'. Como referencia se mide la
+comparación de todos los pares de claves sobre una muestra y se extrapola a O(n²).
+
+Uso:
+    python Benchmarks/normalizacion_calles.py [--direcciones N] [--muestra N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import normalizacion
+
+VARIANTES = [('AV.', 'AVENIDA'), ('AV.', 'AV'), ('GRAL.', 'GENERAL'), ('PRES.', 'PTE'), (' y ', ' Y ')]
+
+
+def variante(calle, generador):
+    """
+    Genera una variante de un nombre de calle con una altura al azar.
+    """
+    for original, reemplazo in VARIANTES:
+        if generador.random() < 0.5:
+            calle = calle.replace(original, reemplazo)
+    if generador.random() < 0.2 and len(calle) > 6:
+        i = generador.randrange(len(calle))
+        calle = calle[:i] + generador.choice('AEIOURSNL') + calle[i + 1:]
+    if generador.random() < 0.5:
+        calle = calle.title()
+    return f'{calle} {generador.randint(1, 9999)}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--direcciones', type=int, default=200_000)
+    parser.add_argument('--muestra', type=int, default=2_000)
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args()
+
+    df = pd.read_csv(os.path.join(RAIZ, 'Data/homicidios_limpio.csv'))
+    calles = df['Calle'].dropna().unique().tolist()
+    generador = random.Random(args.semilla)
+    direcciones = pd.Series([variante(generador.choice(calles), generador) for _ in range(args.direcciones)])
+
+    inicio = time.perf_counter()
+    resolvedor = normalizacion.ResolvedorCalles(calles=calles)
+    claves = resolvedor.resolver_serie(direcciones)
+    segundos = time.perf_counter() - inicio
+
+    unicas = direcciones.unique()
+    muestra = [normalizacion.trigramas(normalizacion.canonizar_calle(d)) for d in unicas[:args.muestra]]
+    inicio = time.perf_counter()
+    for i, a in enumerate(muestra):
+        for b in muestra[i + 1:]:
+            normalizacion.similitud(a, b)
+    pares = time.perf_counter() - inicio
+    estimado = pares * (len(unicas) / len(muestra)) ** 2
+
+    print(f'Direcciones: {len(direcciones)} ({len(unicas)} distintas)')
+    print(f'Calles canónicas: {len(resolvedor.indice.claves)}, claves de lugar: {claves.nunique()}')
+    print(f'Resolvedor: {segundos:.2f} s')
+    print(f'Todos los pares (estimado a partir de {len(muestra)} direcciones): {estimado:.0f} s')
+
+
+if __name__ == '__main__':
+    main()
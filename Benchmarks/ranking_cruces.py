@@ -0,0 +1,96 @@
+"""
+Mide el ranking incremental de intersecciones de 'riesgo_cruces' sobre víctimas sintéticas.
+
+A partir de las víctimas de 'Data/homicidios_limpio.csv' se generan víctimas en cruces de
+pares de calles al azar, ordenadas por fecha, y se agregan en lotes como llegarían al
+sistema. Luego de cada lote se lee el top k de toda la ciudad y de cada comuna, y al final
+se compara cada ranking con el orden completo de todos los contadores (fuerza bruta),
+verificando que contengan las mismas intersecciones en el mismo orden.
+
+Uso:
+    python Benchmarks/ranking_cruces.py [--victimas N] [--lotes N] [--k K]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import riesgo_cruces
+
+
+def victimas_sinteticas(df, cantidad, generador):
+    """
+    Genera víctimas en cruces de calles reales, con fechas y horas al azar ordenadas.
+    """
+    calles = df['Calle'].dropna().unique()
+    muestra = df.iloc[generador.integers(len(df), size=cantidad)].reset_index(drop=True)
+    # Pocas calles concentran la mayoría de los cruces, como en los datos reales
+    pesos = 1 / np.arange(1, len(calles) + 1)
+    pesos /= pesos.sum()
+    primeras = generador.choice(calles, size=cantidad, p=pesos)
+    segundas = generador.choice(calles, size=cantidad, p=pesos)
+    muestra['Dirección normalizada'] = pd.Series(primeras, dtype=object) + ' y ' + pd.Series(segundas, dtype=object)
+    muestra['Lugar del hecho'] = muestra['Dirección normalizada']
+    segundos = np.sort(generador.integers(0, 10 * 365 * 86400, size=cantidad))
+    instantes = pd.Timestamp('2016-01-01') + pd.to_timedelta(segundos, unit='s')
+    muestra['Fecha'] = instantes.strftime('%Y-%m-%d')
+    muestra['Hora'] = instantes.strftime('%H:%M:%S')
+    return muestra
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--victimas', type=int, default=500_000)
+    parser.add_argument('--lotes', type=int, default=100)
+    parser.add_argument('--k', type=int, default=riesgo_cruces.K)
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args()
+
+    df = pd.read_csv(os.path.join(RAIZ, 'Data/homicidios_limpio.csv'))
+    victimas = victimas_sinteticas(df, args.victimas, np.random.default_rng(args.semilla))
+
+    ranking = riesgo_cruces.RankingCruces(k=args.k)
+    comunas = sorted(victimas['Comuna'].unique())
+    agregar = lectura = 0.0
+    lecturas = 0
+    for lote in np.array_split(np.arange(len(victimas)), args.lotes):
+        inicio = time.perf_counter()
+        ranking.agregar(victimas.iloc[lote])
+        agregar += time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        for comuna in [None] + comunas:
+            ranking.top(comuna=comuna)
+            lecturas += 1
+        lectura += time.perf_counter() - inicio
+
+    print(f'{len(victimas)} víctimas en {args.lotes} lotes, {len(ranking.contadores)} intersecciones')
+    print(f"{'agregar':<24}{agregar:>10.3f} s ({len(victimas) / agregar:,.0f} víctimas/s)")
+    print(f"{'top k (montículos)':<24}{lectura / lecturas * 1000:>10.3f} ms por ranking")
+
+    errores = 0
+    fuerza_bruta = 0.0
+    for vida in ranking.vidas_medias:
+        inicio = time.perf_counter()
+        completa = ranking.tabla(vida).sort_values(['Riesgo', 'Intersección'], ascending=[False, True])
+        fuerza_bruta += time.perf_counter() - inicio
+        for comuna in [None] + comunas:
+            esperada = completa if comuna is None else completa[completa['Comuna'] == comuna]
+            esperada = esperada.head(args.k)
+            obtenida = ranking.top(comuna=comuna, vida_media=vida)
+            iguales = (esperada['Intersección'].tolist() == obtenida['Intersección'].tolist()
+                       and np.allclose(esperada['Riesgo'], obtenida['Riesgo']))
+            errores += not iguales
+    print(f"{'orden completo':<24}{fuerza_bruta / len(ranking.vidas_medias) * 1000:>10.3f} ms por vida media")
+    print(f'Rankings distintos de la fuerza bruta: {errores} de {len(ranking.vidas_medias) * (len(comunas) + 1)}')
+    if errores:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Mide el renderizado de las figuras del EDA: en serie, en paralelo en frío y en caliente.
+
+* Serie: todas las figuras en el proceso actual, como al ejecutar el notebook.
+* Frío: directorio vacío, todas las figuras en el pool de procesos.
+* Caliente: mismos datos, ninguna figura cambió y solo se calculan los hashes.
+* Un cambio: se modifica la edad de una víctima y solo se redibujan las figuras afectadas.
+
+Uso:
+    python Benchmarks/renderizado_figuras.py [--formatos png svg] [--procesos N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import renderizado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--formatos', nargs='+', default=['png'])
+    parser.add_argument('--procesos', type=int, default=None)
+    args = parser.parse_args()
+
+    df = pd.read_csv(os.path.join(RAIZ, 'Data/homicidios_limpio.csv'))
+    modificado = df.copy()
+    modificado.loc[0, 'Edad'] += 1
+
+    with tempfile.TemporaryDirectory() as serie, tempfile.TemporaryDirectory() as paralelo:
+        escenarios = [
+            ('Serie', lambda: renderizado.renderizar_figuras(df, serie, args.formatos, procesos=1)),
+            ('Paralelo, frío', lambda: renderizado.renderizar_figuras(df, paralelo, args.formatos, procesos=args.procesos)),
+            ('Paralelo, caliente', lambda: renderizado.renderizar_figuras(df, paralelo, args.formatos,
+                                                                          procesos=args.procesos)),
+            ('Paralelo, un cambio', lambda: renderizado.renderizar_figuras(modificado, paralelo, args.formatos,
+                                                                           procesos=args.procesos)),
+        ]
+        print(f"{'Escenario':<22}{'Dibujadas':>10}{'Segundos':>10}")
+        for escenario, renderizar in escenarios:
+            inicio = time.perf_counter()
+            resultado = renderizar()
+            segundos = time.perf_counter() - inicio
+            dibujadas = sum(valor is not None for valor in resultado.values())
+            print(f'{escenario:<22}{dibujadas:>10}{segundos:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Compara memoria y tiempo del resumen de columnas completo contra el resumen por bloques.
+
+Se replica 'Data/homicidios_limpio.csv' la cantidad de veces indicada y cada resumen se
+ejecuta en un intérprete nuevo: el completo lee el CSV entero y llama a las funciones de
+'Utils'; el de 'bloques' lo recorre con pd.read_csv(chunksize=...). La memoria residente
+máxima del segundo debería mantenerse estable al aumentar las copias.
+
+Uso:
+    python Benchmarks/resumen_por_bloques.py [--copias N [N ...]] [--tamaño FILAS]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RESUMEN = '''
+import json, sys, time
+sys.path.insert(0, {raiz!r})
+import pandas as pd
+inicio = time.perf_counter()
+{resumen}
+segundos = time.perf_counter() - inicio
+with open('/proc/self/status') as estado:
+    rss_max_kb = next(int(l.split()[1]) for l in estado if l.startswith('VmHWM'))
+print(json.dumps({{'segundos': segundos, 'rss_max_kb': rss_max_kb}}))
+'''
+
+COMPLETO = '''
+import Utils
+df = pd.read_csv({ruta!r})
+Utils.resumen_columnas(df)
+Utils.tipos_de_variables(df)
+df['Calle'].value_counts().head(10)
+'''
+
+POR_BLOQUES = '''
+import bloques
+resumen = bloques.ResumenPorBloques(columnas_top=['Calle'])
+resumen.consumir(bloques.bloques_csv({ruta!r}, tamaño={tamaño}))
+resumen.resumen_columnas()
+resumen.tipos_de_variables()
+resumen.top_valores('Calle')
+'''
+
+
+def medir(resumen):
+    """
+    Ejecuta un resumen en un intérprete nuevo y devuelve sus métricas.
+    """
+    codigo = RESUMEN.format(raiz=RAIZ, resumen=resumen)
+    salida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True, check=True)
+    return json.loads(salida.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--copias', type=int, nargs='+', default=[100, 400])
+    parser.add_argument('--tamaño', type=int, default=50_000)
+    args = parser.parse_args()
+
+    base = pd.read_csv(os.path.join(RAIZ, 'Data/homicidios_limpio.csv'))
+    print(f"{'Filas':>10}  {'Modo':<12}{'Segundos':>10}{'RSS máx (MB)':>14}")
+    with tempfile.TemporaryDirectory() as directorio:
+        for copias in args.copias:
+            ruta = os.path.join(directorio, f'homicidios_{copias}.csv')
+            pd.concat([base] * copias, ignore_index=True).to_csv(ruta, index=False, encoding='utf-8')
+            for modo, resumen in [('completo', COMPLETO.format(ruta=ruta)),
+                                  ('por bloques', POR_BLOQUES.format(ruta=ruta, tamaño=args.tamaño))]:
+                metricas = medir(resumen)
+                print(f"{len(base) * copias:>10}  {modo:<12}{metricas['segundos']:>10.2f}"
+                      f"{metricas['rss_max_kb'] / 1024:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
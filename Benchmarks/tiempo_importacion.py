@@ -0,0 +1,68 @@
+"""
+Mide el tiempo de arranque en frío de 'from Utils import *' con 'python -X importtime'.
+
+Compara la importación actual, donde matplotlib y seaborn se cargan recién al usar
+una función de gráficos, contra la importación anticipada de ambos backends.
+
+Uso:
+    python Benchmarks/tiempo_importacion.py [--repeticiones N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ESCENARIOS = {
+    'Diferida (actual)': 'from Utils import *',
+    'Anticipada': 'import matplotlib.pyplot, seaborn\nfrom Utils import *',
+}
+
+
+def medir_importacion(codigo):
+    """
+    Ejecuta el código en un intérprete nuevo con '-X importtime' y suma los tiempos de importación.
+
+    Parameters:
+        codigo (str): El código Python a ejecutar.
+
+    Returns:
+        tuple: El tiempo acumulado en milisegundos y el conjunto de módulos importados.
+    """
+    salida = subprocess.run([sys.executable, '-X', 'importtime', '-c', codigo],
+                            cwd=RAIZ, capture_output=True, text=True, check=True).stderr
+
+    total_us = 0
+    modulos = set()
+    for linea in salida.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        _, acumulado, nombre = linea[len('import time:'):].split('|')
+        modulos.add(nombre.strip())
+        # Solo se suman los módulos de primer nivel para no contar dos veces a los anidados
+        if not nombre.startswith('  '):
+            total_us += int(acumulado)
+
+    return total_us / 1000, modulos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'Escenario':<20}{'Mediana (ms)':>14}{'matplotlib':>12}{'seaborn':>10}")
+    for escenario, codigo in ESCENARIOS.items():
+        tiempos = []
+        for _ in range(args.repeticiones):
+            tiempo, modulos = medir_importacion(codigo)
+            tiempos.append(tiempo)
+        print(f"{escenario:<20}{statistics.median(tiempos):>14.1f}"
+              f"{'sí' if 'matplotlib' in modulos else 'no':>12}"
+              f"{'sí' if 'seaborn' in modulos else 'no':>10}")
+
+
+if __name__ == '__main__':
+    main()
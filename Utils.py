@@ -1,7 +1,32 @@
+import importlib
+import numpy as np
 import pandas as pd
 from datetime import datetime
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+from agregaciones import *
+from instrumentacion import instrumentar_modulo
+
+
+class _ImportacionDiferida:
+    """
+    Representa un módulo que se importa recién al acceder a uno de sus atributos.
+
+    Permite que 'from Utils import *' no cargue matplotlib ni seaborn hasta que se
+    utilice la primera función de gráficos.
+    """
+
+    def __init__(self, nombre):
+        self._nombre = nombre
+        self._modulo = None
+
+    def __getattr__(self, atributo):
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self._nombre)
+        return getattr(self._modulo, atributo)
+
+
+plt = _ImportacionDiferida('matplotlib.pyplot')
+sns = _ImportacionDiferida('seaborn')
 
 def resumen_columnas(dataframe):
     """
@@ -28,27 +53,153 @@ def resumen_columnas(dataframe):
     return resumen
 
 
-def tipos_de_variables(dataframe):
+TAMAÑO_BLOQUE_TIPOS = 100_000
+
+_tipo_de = np.frompyfunc(type, 1, 1)
+
+# Resultados de pd.api.types.infer_dtype que garantizan un único tipo de Python
+_TIPOS_HOMOGENEOS = {'string': str, 'time': type(datetime.min.time())}
+
+_ARREGLOS_CON_MASCARA = (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray)
+
+
+def _conteo_tipos_serie(serie, muestra=None, bloque=TAMAÑO_BLOQUE_TIPOS, ejemplos=5, contar=True):
+    """
+    Cuenta los tipos de Python de los valores de una Serie, en orden de aparición.
+
+    Returns:
+        dict: Para cada tipo, una lista con la cantidad de valores y los índices de los primeros
+              ejemplos. Si 'contar' es False, solo las claves son significativas.
+    """
+    if muestra is not None:
+        serie = serie.iloc[:muestra]
+    if serie.empty:
+        return {}
+
+    # Series.apply recorre los valores de las extensiones con nulos tal como los devuelve
+    # to_numpy: los Int64 y Float64 con nulos pasan a float, los boolean con nulos a object
+    if isinstance(serie.array, _ARREGLOS_CON_MASCARA):
+        serie = pd.Series(serie.array.to_numpy(), index=serie.index)
+    elif isinstance(serie.dtype, pd.CategoricalDtype):
+        # Solo se aplica type a las categorías; los códigos -1 quedan como NaN
+        codigos = serie.cat.codes.to_numpy()
+        valores = serie.cat.categories.to_numpy(dtype=object)[codigos]
+        valores[codigos < 0] = np.nan
+        serie = pd.Series(valores, index=serie.index, dtype=object)
+
+    # Las columnas numéricas y booleanas de numpy tienen un único tipo de Python
+    if not isinstance(serie.dtype, pd.api.extensions.ExtensionDtype) and serie.dtype.kind in 'biufc':
+        tipo = type(serie.iloc[:1].astype(object).iloc[0])
+        return {tipo: [len(serie), serie.index[:ejemplos].tolist()]}
+
+    # En las fechas solo se distinguen los Timestamp de los NaT, sin crear un objeto por valor
+    if serie.dtype.kind in 'mM':
+        nulos = serie.isna().to_numpy()
+        validos = serie[~nulos]
+        grupos = [(type(validos.iloc[0]) if len(validos) else None, ~nulos), (type(pd.NaT), nulos)]
+        conteos = {}
+        for tipo, mascara in sorted(grupos, key=lambda grupo: np.argmax(grupo[1])):
+            if mascara.any():
+                conteos[tipo] = [int(mascara.sum()), serie.index[mascara][:ejemplos].tolist()]
+        return conteos
+
+    valores = serie.to_numpy(dtype=object)
+    conteos = {}
+    for inicio in range(0, len(valores), bloque):
+        parte = valores[inicio:inicio + bloque]
+        # infer_dtype recorre el bloque en C y corta en el primer valor de otro tipo
+        inferido = pd.api.types.infer_dtype(parte, skipna=False)
+        if inferido in _TIPOS_HOMOGENEOS:
+            tipos, por_valor = [_TIPOS_HOMOGENEOS[inferido]], None
+        else:
+            # Se factoriza en lugar de comparar con '==', que numpy no resuelve por elemento
+            # para clases como NAType
+            por_valor, tipos = pd.factorize(_tipo_de(parte))
+
+        for codigo, tipo in enumerate(tipos):
+            conteo = conteos.setdefault(tipo, [0, []])
+            if not contar:
+                continue
+            posiciones = np.arange(len(parte)) if por_valor is None else np.flatnonzero(por_valor == codigo)
+            conteo[0] += len(posiciones)
+            faltan = ejemplos - len(conteo[1])
+            if faltan > 0:
+                conteo[1].extend(serie.index[inicio + posiciones[:faltan]].tolist())
+    return conteos
+
+
+def tipos_de_variables(dataframe, vectorizado=True, muestra=None):
     """
     Retorna un diccionario que contiene los tipos de variables presentes en cada columna del DataFrame.
 
     Parameters:
         dataframe (pd.DataFrame): El DataFrame del cual se desea obtener los tipos de variables.
+        vectorizado (bool): Si es False, se utiliza el camino original con Series.apply en cada columna.
+        muestra (int, opcional): Si se indica, solo se revisan las primeras 'muestra' filas.
 
     Returns:
         dict: Un diccionario donde las claves son los nombres de las columnas y los valores son listas
               de los tipos de variables presentes en cada columna.
     """
+    if vectorizado:
+        return {columna: list(_conteo_tipos_serie(dataframe[columna], muestra, contar=False))
+                for columna in dataframe.columns}
+
     resultados = {}  
     
     for columna in dataframe.columns:
         # Obtener tipos de variables únicos en la columna
-        tipos = dataframe[columna].apply(type).unique()  
+        tipos = dataframe[columna].iloc[:muestra].apply(type).unique()  
         resultados[columna] = tipos.tolist()  
     
     return resultados
 
 
+def conteo_tipos(serie, muestra=None, ejemplos=5):
+    """
+    Cuenta cuántos valores de cada tipo de variable tiene una Serie, con índices de ejemplo.
+
+    Es la versión vectorizada de recorrer 'serie.apply(type).value_counts()' y mostrar una
+    muestra de cada tipo.
+
+    Parameters:
+        serie (pd.Series): La Serie a analizar.
+        muestra (int, opcional): Si se indica, solo se revisan los primeros 'muestra' valores.
+        ejemplos (int): Cantidad de índices de ejemplo por tipo.
+
+    Returns:
+        pd.DataFrame: Una fila por tipo con las columnas 'Tipo', 'Cantidad' y 'Ejemplos', de mayor a menor cantidad.
+    """
+    conteos = _conteo_tipos_serie(serie, muestra, ejemplos=ejemplos)
+    resultado = pd.DataFrame([{'Tipo': tipo, 'Cantidad': cantidad, 'Ejemplos': indices}
+                              for tipo, (cantidad, indices) in conteos.items()],
+                             columns=['Tipo', 'Cantidad', 'Ejemplos'])
+    return resultado.sort_values('Cantidad', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def perfil_tipos(dataframe, columnas=None, muestra=None, ejemplos=5):
+    """
+    Genera el conteo de tipos de variables de varias columnas de un DataFrame.
+
+    Parameters:
+        dataframe (pd.DataFrame): El DataFrame a analizar.
+        columnas (list, opcional): Columnas a analizar. Por defecto, todas.
+        muestra (int, opcional): Si se indica, solo se revisan las primeras 'muestra' filas.
+        ejemplos (int): Cantidad de índices de ejemplo por tipo.
+
+    Returns:
+        pd.DataFrame: Una fila por columna y tipo con las columnas 'Columna', 'Tipo', 'Cantidad',
+                      'Porcentaje' y 'Ejemplos'.
+    """
+    partes = []
+    for columna in (dataframe.columns if columnas is None else columnas):
+        conteo = conteo_tipos(dataframe[columna], muestra, ejemplos)
+        conteo.insert(0, 'Columna', columna)
+        conteo.insert(3, 'Porcentaje', conteo['Cantidad'] / conteo['Cantidad'].sum() * 100)
+        partes.append(conteo)
+    return pd.concat(partes, ignore_index=True)
+
+
 def convertir_a_time(x):
     """
     Convierte un valor en formato de cadena (str) o datetime a un objeto de tiempo (time).
@@ -70,6 +221,42 @@ def convertir_a_time(x):
     
     return x
 
+
+def convertir_serie_a_time(serie, vectorizado=True):
+    """
+    Convierte una Serie con valores de tipo cadena (str), datetime u otros a objetos de tiempo (time).
+
+    Es el equivalente vectorizado de aplicar 'convertir_a_time' elemento a elemento: las cadenas se
+    convierten en bloque con pd.to_datetime y un formato explícito, y los datetime con el accesor .dt.
+
+    Parameters:
+        serie (pd.Series): La Serie a convertir.
+        vectorizado (bool): Si es False, se utiliza el camino original con Series.apply.
+
+    Returns:
+        pd.Series: Una Serie de objetos time, con None donde la cadena no pudo convertirse.
+    """
+    if not vectorizado:
+        return serie.apply(convertir_a_time)
+
+    resultado = serie.astype(object)
+    tipos = serie.map(type)
+
+    # Se clasifican los tipos únicos en lugar de cada valor
+    tipos_fecha = [tipo for tipo in tipos.unique() if issubclass(tipo, datetime)]
+
+    es_texto = tipos == str
+    if es_texto.any():
+        horas = pd.to_datetime(serie[es_texto], format='%H:%M:%S', errors='coerce')
+        resultado[es_texto] = horas.dt.time.where(horas.notna(), None)
+
+    es_fecha = tipos.isin(tipos_fecha)
+    if es_fecha.any():
+        resultado[es_fecha] = pd.to_datetime(serie[es_fecha]).dt.time
+
+    return resultado
+
+
 def imputa_valor_mas_frecuente(df, columna):
     """
     Imputa el valor más frecuente en las filas donde el valor de una columna específica es 'SD'.
@@ -93,12 +280,13 @@ def imputa_valor_mas_frecuente(df, columna):
     print(df[df[columna] == valor_mas_frecuente].head())
 
 
-def imputar_edad_promedio_por_sexo(df):
+def imputar_edad_promedio_por_sexo(df, vectorizado=True):
     """
     Imputa la edad promedio correspondiente al género en el DataFrame, reemplazando los valores 'SD' con el promedio respectivo.
 
     Parameters:
         df (pd.DataFrame): El DataFrame que contiene los datos.
+        vectorizado (bool): Si es False, se utiliza el camino original fila a fila con df.apply.
 
     Returns:
         None: La función modifica el DataFrame inplace.
@@ -113,7 +301,11 @@ def imputar_edad_promedio_por_sexo(df):
     print(f'La edad promedio de Femenino es {round(promedio_por_genero["FEMENINO"])} y de Masculino es {round(promedio_por_genero["MASCULINO"])}')
 
     # Llenar los valores NaN en la columna 'Edad' utilizando el promedio correspondiente al género
-    df['Edad'] = df.apply(lambda row: promedio_por_genero[row['Sexo']] if pd.isna(row['Edad']) else row['Edad'], axis=1)
+    if vectorizado:
+        promedio_por_fila = df.groupby('Sexo')['Edad'].transform('mean')
+        df['Edad'] = df['Edad'].astype(object).where(df['Edad'].notna(), promedio_por_fila)
+    else:
+        df['Edad'] = df.apply(lambda row: promedio_por_genero[row['Sexo']] if pd.isna(row['Edad']) else row['Edad'], axis=1)
 
     # Convertir la columna 'Edad' a entero
     df['Edad'] = df['Edad'].astype(int)
@@ -150,34 +342,29 @@ def grafico_distribucion_mensual_por_ano(df):
     Returns:
         None: La función muestra el gráfico en la pantalla.
     """
-    # Se obtiene una lista de años únicos
-    años = df['Año'].unique()
+    # Se calcula la cantidad de víctimas por año y mes, con un año por columna
+    data = tabla_victimas_mensuales_por_anio(df).pivot(index='Mes', columns='Año', values='Cantidad víctimas')
+    años = data.columns
 
-    # Se define el número de filas y columnas para la cuadrícula de subgráficos
-    n_filas = 3
+    # La cuadrícula tiene dos columnas y tantas filas como hagan falta para todos los años
     n_columnas = 2
+    n_filas = max(1, -(-len(años) // n_columnas))
 
-    # Se crea una figura con subgráficos en una cuadrícula de 2x3
-    fig, axes = plt.subplots(n_filas, n_columnas, figsize=(14, 8))
+    fig, axes = plt.subplots(n_filas, n_columnas, figsize=(14, 8 * n_filas / 3), squeeze=False)
 
     # Se itera a través de los años y crea un gráfico por año
     for i, year in enumerate(años):
-        fila = i // n_columnas
-        columna = i % n_columnas
-        
-        # Se filtran los datos para el año actual y agrupa por mes
-        data_mensual = (df[df['Año'] == year]
-                        .groupby('Mes')
-                        .agg({'Cantidad víctimas':'sum'}))
-        
-        # Se configura el subgráfico actual
-        ax = axes[fila, columna]
-        data_mensual.plot(ax=ax, kind='line')
+        ax = axes[i // n_columnas, i % n_columnas]
+        data[[year]].dropna().plot(ax=ax, kind='line')
         ax.set_title('Año ' + str(year))
         ax.set_xlabel('Mes')
         ax.set_ylabel('Cantidad de Víctimas')
         ax.legend_ = None
-        
+
+    # Se ocultan los subgráficos sobrantes cuando la cantidad de años es impar
+    for ax in axes.flat[len(años):]:
+        ax.set_visible(False)
+
     plt.tight_layout()
     plt.show()
 
@@ -191,10 +378,10 @@ def cantidad_total_accidentes_por_mes(df):
     Returns:
         None: La función muestra el gráfico en la pantalla.
     """
-    df['Mes'] = df['Mes']
+    data = tabla_accidentes_por_mes(df)
 
     plt.figure(figsize=(12, 6))
-    sns.countplot(x='Mes', data=df, palette='viridis')
+    sns.barplot(x='Mes', y='Cantidad de accidentes', data=data, palette='viridis')
     plt.title('Cantidad Total de Accidentes por Mes (sin distinción de año)')
     plt.xlabel('Mes')
     plt.ylabel('Cantidad de Accidentes')
@@ -203,96 +390,54 @@ def cantidad_total_accidentes_por_mes(df):
 
 
 
-def accidentes_por_dia_semana(df):
+def accidentes_por_dia_semana(df, vectorizado=True):
     """
     Analiza y visualiza la cantidad de accidentes por día de la semana, junto con datos resumen.
 
     Parameters:
         df (pd.DataFrame): El DataFrame que contiene los datos.
+        vectorizado (bool): Si es False, se utiliza el camino original con Series.map y una función lambda.
 
     Returns:
         None: La función muestra el gráfico en la pantalla y imprime datos resumen.
     """
-    # Se convierte la columna 'Fecha' a tipo de dato datetime
-    df['Fecha'] = pd.to_datetime(df['Fecha'])
-
-    # Se extrae el día de la semana (0 = lunes, 6 = domingo)
-    df['Día semana'] = df['Fecha'].dt.dayofweek
-
-    # Se mapea el número del día de la semana a su nombre
-    dias_semana = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
-    df['Nombre día'] = df['Día semana'].map(lambda x: dias_semana[x])
-
     # Se cuenta la cantidad de accidentes por día de la semana
-    data = df.groupby('Nombre día').agg({'Cantidad víctimas': 'sum'}).reset_index()
+    data = tabla_victimas_por_dia_semana(df, vectorizado)
 
     plt.figure(figsize=(6, 3))
-    ax = sns.barplot(x='Nombre día', y='Cantidad víctimas', data=data, order=dias_semana, palette='viridis')
+    ax = sns.barplot(x='Nombre día', y='Cantidad víctimas', data=data, order=DIAS_SEMANA, palette='viridis')
 
     ax.set_title('Cantidad de Accidentes por Día de la Semana')
     ax.set_xlabel('Día de la Semana')
     ax.set_ylabel('Cantidad de Accidentes')
     plt.xticks(rotation=45)
 
-    print(f'El día de la semana con menor cantidad de víctimas tiene {data.min()[1]} víctimas')
-    print(f'El día de la semana con mayor cantidad de víctimas tiene {data.max()[1]} víctimas')
-    print(f'La diferencia porcentual es de {round((data.max()[1] - data.min()[1]) / data.min()[1] * 100, 2)}%')
+    minimo = data['Cantidad víctimas'].min()
+    maximo = data['Cantidad víctimas'].max()
+    print(f'El día de la semana con menor cantidad de víctimas tiene {minimo} víctimas')
+    print(f'El día de la semana con mayor cantidad de víctimas tiene {maximo} víctimas')
+    print(f'La diferencia porcentual es de {round((maximo - minimo) / minimo * 100, 2)}%')
 
     plt.show()
 
-def crea_categoria_momento_dia(hora):
-  """
-  Devuelve la categoría de tiempo correspondiente a la hora proporcionada.
-
-  Parameters:
-    hora: La hora a clasificar.
-
-  Returns:
-    La categoría de tiempo correspondiente.
-  """
-  if hora.hour >= 6 and hora.hour <= 10:
-    return "Mañana"
-  elif hora.hour >= 11 and hora.hour <= 13:
-    return "Medio día"
-  elif hora.hour >= 14 and hora.hour <= 18:
-    return "Tarde"
-  elif hora.hour >= 19 and hora.hour <= 23:
-    return "Noche"
-  else:
-    return "Madrugada"
-  
-
-def cantidad_accidentes_por_categoria_tiempo(df):
+
+def cantidad_accidentes_por_categoria_tiempo(df, vectorizado=True):
     '''
     Calcula la cantidad de accidentes por categoría de tiempo y muestra un gráfico de barras.
 
-    Esta función toma un DataFrame que contiene una columna 'Hora' y utiliza la función
-    'crea_categoria_momento_dia' para crear la columna 'Categoria tiempo'. Luego, cuenta
-    la cantidad de accidentes por cada categoría de tiempo, calcula los porcentajes y
-    genera un gráfico de barras que muestra la distribución de accidentes por categoría de tiempo.
+    Esta función toma un DataFrame que contiene una columna 'Hora' y utiliza
+    'tabla_accidentes_por_categoria_tiempo' para contar la cantidad de accidentes por
+    cada categoría de tiempo y sus porcentajes. Luego genera un gráfico de barras que
+    muestra la distribución de accidentes por categoría de tiempo.
 
     Parameters:
         df (pandas.DataFrame): El DataFrame que contiene la información de los accidentes.
+        vectorizado (bool): Si es False, se utiliza el camino original con Series.apply.
 
     Returns:
         None
     '''
-    # Convertir la columna 'Hora' a formato datetime
-    df['Hora'] = pd.to_datetime(df['Hora'], errors='coerce')
-
-    # Se filtran las filas con valores nulos en la columna 'Hora'
-    df = df.dropna(subset=['Hora'])
-
-    # Se aplica la función crea_categoria_momento_dia para crear la columna 'Categoria tiempo'
-    df['Categoria tiempo'] = df['Hora'].apply(crea_categoria_momento_dia)
-
-    # Se cuenta la cantidad de accidentes por categoría de tiempo
-    data = df['Categoria tiempo'].value_counts().reset_index()
-    data.columns = ['Categoria tiempo', 'Cantidad accidentes']
-
-    # Se calculan los porcentajes
-    total_accidentes = data['Cantidad accidentes'].sum()
-    data['Porcentaje'] = (data['Cantidad accidentes'] / total_accidentes) * 100
+    data = tabla_accidentes_por_categoria_tiempo(df, vectorizado)
     
     colores = sns.color_palette("pastel", n_colors=len(data))
     plt.figure(figsize=(8, 4))
@@ -309,25 +454,19 @@ def cantidad_accidentes_por_categoria_tiempo(df):
     plt.show()
 
 
-def cantidad_accidentes_por_horas_del_dia(df):
+def cantidad_accidentes_por_horas_del_dia(df, vectorizado=True):
     '''
     Genera un gráfico de barras que muestra la cantidad de accidentes por hora del día.
 
     Parameters:
         df: El conjunto de datos de accidentes.
+        vectorizado (bool): Si es False, se utiliza el camino original con Series.apply.
 
     Returns:
         Un gráfico de barras.
     '''
-    # Se extrae la hora del día de la columna 'hora'
-    df['Hora del día'] = df['Hora'].apply(lambda x: x.hour)
-
-    # Se cuenta la cantidad de accidentes por hora del día
-    data = df['Hora del día'].value_counts().reset_index()
-    data.columns = ['Hora del día', 'Cantidad de accidentes']
-
-    # Se ordena los datos por hora del día
-    data = data.sort_values(by='Hora del día')
+    # Se cuenta la cantidad de accidentes por hora del día, ordenada por hora
+    data = tabla_accidentes_por_hora_del_dia(df, vectorizado)
 
     # Se crea el gráfico de barras con una paleta de colores
     colores = sns.color_palette("husl", n_colors=len(data))
@@ -345,28 +484,19 @@ def cantidad_accidentes_por_horas_del_dia(df):
     plt.show()
 
 
-def cantidad_accidentes_semana_fin_de_semana(df):
+def cantidad_accidentes_semana_fin_de_semana(df, vectorizado=True):
     '''
     Genera un gráfico de barras que muestra la cantidad de accidentes por tipo de día (semana o fin de semana).
 
     Parameters:
         df: El conjunto de datos de accidentes.
+        vectorizado (bool): Si es False, se utiliza el camino original con Series.apply.
 
     Returns:
         Un gráfico de barras.
     '''
-    # Se convierte la columna 'fecha' a tipo de dato datetime
-    df['Fecha'] = pd.to_datetime(df['Fecha'])
-    
-    # Se extrae el día de la semana (0 = lunes, 6 = domingo)
-    df['Dia semana'] = df['Fecha'].dt.dayofweek
-    
-    # Se crea una columna 'tipo_dia' para diferenciar entre semana y fin de semana
-    df['Tipo de día'] = df['Dia semana'].apply(lambda x: 'Fin de Semana' if x >= 5 else 'Semana')
-    
     # Se cuenta la cantidad de accidentes por tipo de día
-    data = df['Tipo de día'].value_counts().reset_index()
-    data.columns = ['Tipo de día', 'Cantidad de accidentes']
+    data = tabla_accidentes_semana_fin_de_semana(df, vectorizado)
     
     # Se crea el gráfico de barras con una paleta de colores
     colores = sns.color_palette("Set2", n_colors=len(data))
@@ -506,21 +636,24 @@ def cantidad_victimas_sexo_rol_victima(df):
     colores_por_defecto = sns.color_palette()
     colores_invertidos = [colores_por_defecto[1], colores_por_defecto[0]]
 
+    # Se calculan las tablas
+    data_sexo = tabla_victimas_por_sexo(df)
+    df_rol = tabla_victimas_por_rol_y_sexo(df).pivot(index='Rol', columns='Sexo', values='Cantidad víctimas').fillna(0)
+    df_victima = tabla_victimas_por_victima_y_sexo(df).pivot(index='Víctima', columns='Sexo', values='Cantidad víctimas').fillna(0)
+
     # Se crea el gráfico
     fig, axes = plt.subplots(1, 3, figsize=(15, 4))
 
     # Gráfico 1: Sexo
-    sns.countplot(data=df, x='Sexo', ax=axes[0], palette=colores_invertidos)
+    sns.barplot(data=data_sexo, x='Sexo', y='Cantidad víctimas', ax=axes[0], palette=colores_invertidos)
     axes[0].set_title('Cantidad de víctimas por sexo') ; axes[0].set_ylabel('Cantidad de víctimas')
 
     # Gráfico 2: Rol
-    df_rol = df.groupby(['Rol', 'Sexo']).size().unstack(fill_value=0)
     df_rol.plot(kind='bar', stacked=True, ax=axes[1], color=colores_invertidos)
     axes[1].set_title('Cantidad de víctimas por rol') ; axes[1].set_ylabel('Cantidad de víctimas') ; axes[1].tick_params(axis='x', rotation=45)
     axes[1].legend().set_visible(False)
 
     # Gráfico 3: Tipo de vehículo
-    df_victima = df.groupby(['Víctima', 'Sexo']).size().unstack(fill_value=0)
     df_victima.plot(kind='bar', stacked=True, ax=axes[2], color=colores_invertidos)
     axes[2].set_title('Cantidad de víctimas por tipo de vehículo') ; axes[2].set_ylabel('Cantidad de víctimas') ; axes[2].tick_params(axis='x', rotation=45)
     axes[2].legend().set_visible(False)
@@ -545,16 +678,14 @@ def cantidad_victimas_participantes(df):
         None
     '''
     # Se ordenan los datos por 'Participantes' en orden descendente por cantidad
-    ordenado = df['Participantes'].value_counts().reset_index()
-    ordenado = ordenado.rename(columns={'Cantidad': 'participantes'})
-    ordenado = ordenado.sort_values(by='count', ascending=False)
+    ordenado = tabla_victimas_por_participantes(df)
     
     plt.figure(figsize=(15, 4))
-    n
+    
     colores = sns.color_palette("viridis", len(ordenado))
 
     # Se crea el gráfico de barras con colores
-    ax = sns.barplot(data=ordenado, x='Participantes', y='count', order=ordenado['Participantes'], palette=colores)
+    ax = sns.barplot(data=ordenado, x='Participantes', y='Cantidad víctimas', order=ordenado['Participantes'], palette=colores)
     ax.set_title('Cantidad de víctimas por participantes')
     ax.set_ylabel('Cantidad de víctimas')
     # Rotar las etiquetas del eje x a 45 grados
@@ -579,15 +710,13 @@ def cantidad_acusados(df):
         None
     '''
     # Se ordenan los datos por 'Acusado' en orden descendente por cantidad
-    ordenado = df['Acusado'].value_counts().reset_index()
-    ordenado = ordenado.rename(columns={'Cantidad': 'Acusado'})
-    ordenado = ordenado.sort_values(by='count', ascending=False)
+    ordenado = tabla_acusados(df)
     
     plt.figure(figsize=(15, 4))
     
     colores = sns.color_palette("viridis", len(ordenado))
 
-    ax = sns.barplot(data=ordenado, x='Acusado', y='count', order=ordenado['Acusado'], palette=colores)
+    ax = sns.barplot(data=ordenado, x='Acusado', y='Cantidad acusados', order=ordenado['Acusado'], palette=colores)
     ax.set_title('Cantidad de acusados en los hechos') ; ax.set_ylabel('Cantidad de acusados') 
     ax.set_xticklabels(ax.get_xticklabels(), rotation=45, horizontalalignment='right')
 
@@ -612,19 +741,21 @@ def accidentes_tipo_de_calle(df):
     '''
     paleta_colores = sns.color_palette("viridis")
 
+    data_tipo_calle = tabla_victimas_por_tipo_de_calle(df)
+    data_cruce = tabla_victimas_por_cruce(df)
+
     # Se crea el gráfico
     fig, axes = plt.subplots(1, 2, figsize=(10, 4))
 
-    sns.countplot(data=df, x='Tipo de calle', ax=axes[0], palette=paleta_colores)
+    sns.barplot(data=data_tipo_calle, x='Tipo de calle', y='Cantidad víctimas', ax=axes[0], palette=paleta_colores)
     axes[0].set_title('Cantidad de víctimas por tipo de calle') ; axes[0].set_ylabel('Cantidad de víctimas')
 
-    sns.countplot(data=df, x='Cruce', ax=axes[1], palette=paleta_colores)
+    sns.barplot(data=data_cruce, x='Cruce', y='Cantidad víctimas', ax=axes[1], palette=paleta_colores)
     axes[1].set_title('Cantidad de víctimas en cruces') ; axes[1].set_ylabel('Cantidad de víctimas')
 
     plt.show()
 
 
-
-
-
-
+# Cada función pública queda medida cuando se activa 'instrumentacion'; convertir_a_time se
+# aplica valor a valor y no se envuelve
+instrumentar_modulo(globals(), __name__, excluir=['convertir_a_time'])
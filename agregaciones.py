@@ -0,0 +1,543 @@
+import hashlib
+import weakref
+
+import numpy as np
+import pandas as pd
+
+DIAS_SEMANA = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+
+BORDES_EDAD = [0, 14, 24, 34, 44, 54, 64, np.inf]
+
+
+def crea_categoria_momento_dia(hora):
+  """
+  Devuelve la categoría de tiempo correspondiente a la hora proporcionada.
+
+  Parameters:
+    hora: La hora a clasificar.
+
+  Returns:
+    La categoría de tiempo correspondiente.
+  """
+  if hora.hour >= 6 and hora.hour <= 10:
+    return "Mañana"
+  elif hora.hour >= 11 and hora.hour <= 13:
+    return "Medio día"
+  elif hora.hour >= 14 and hora.hour <= 18:
+    return "Tarde"
+  elif hora.hour >= 19 and hora.hour <= 23:
+    return "Noche"
+  else:
+    return "Madrugada"
+
+
+def crea_categoria_momento_dia_serie(horas):
+  """
+  Devuelve la categoría de tiempo para cada hora de la Serie, equivalente vectorizado de 'crea_categoria_momento_dia'.
+
+  Parameters:
+    horas: Serie con la hora entera del día (0 a 23).
+
+  Returns:
+    Una Serie con la categoría de tiempo correspondiente a cada hora.
+  """
+  categorias = pd.cut(horas, bins=[-1, 5, 10, 13, 18, 23],
+                      labels=["Madrugada", "Mañana", "Medio día", "Tarde", "Noche"])
+  return categorias.astype(object)
+
+
+def _hora_del_dia(serie):
+  """
+  Extrae la hora entera de una Serie de horas (datetime, time, cadena 'HH:MM:SS' o segundos del día) sin recorrerla fila a fila.
+
+  Las horas que no pueden convertirse ('SD', nulos) quedan como <NA>, de modo que los conteos
+  las omiten igual que la consulta de 'consultas' con "Hora" IS NOT NULL.
+  """
+  horas = hora_datetime(serie).dt.hour
+  return horas.astype('int64') if horas.notna().all() else horas.astype('Int64')
+
+
+def bandas_de_edad(edades, bordes=BORDES_EDAD):
+    """
+    Clasifica las edades en bandas etiquetadas como '15-24', '25-34', ..., '65+'.
+
+    Parameters:
+        edades (pd.Series): Serie con las edades enteras.
+        bordes (list): Bordes de las bandas; cada banda incluye su borde superior. Si el último
+            borde es infinito, la banda final se etiqueta como 'N+'.
+
+    Returns:
+        pd.Series: Una Serie categórica ordenada con la banda de cada edad.
+    """
+    etiquetas = []
+    for i, (desde, hasta) in enumerate(zip(bordes[:-1], bordes[1:])):
+        desde = int(desde) if i == 0 else int(desde) + 1
+        etiquetas.append(f'{desde}+' if np.isinf(hasta) else f'{desde}-{int(hasta)}')
+    return pd.cut(edades, bins=bordes, labels=etiquetas, include_lowest=True)
+
+
+def _dia_semana(df, vectorizado=True):
+    """
+    Devuelve el día de la semana (0 = lunes, 6 = domingo) de la columna 'Fecha' sin modificar el DataFrame.
+    """
+    if vectorizado:
+        return pd.to_datetime(df['Fecha'], format='ISO8601').dt.dayofweek
+    return pd.to_datetime(df['Fecha']).dt.dayofweek
+
+
+def hora_datetime(serie):
+    """
+    Convierte la columna 'Hora' a datetime, con NaT donde no puede convertirse.
+
+    Equivale a pd.to_datetime(serie, errors='coerce'). Si todos los valores son cadenas, se
+    prueba primero el formato 'HH:MM:SS' y solo las que no lo cumplen se convierten elemento
+    a elemento. Los enteros se interpretan como segundos del día, como los guarda 'compactacion'.
+
+    Parameters:
+        serie (pd.Series): La columna 'Hora' en cualquiera de sus representaciones.
+
+    Returns:
+        pd.Series: Una Serie datetime64 con la hora sobre una fecha fija, o NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    if pd.api.types.is_integer_dtype(serie):
+        return pd.to_datetime(serie, unit='s')
+    if pd.api.types.infer_dtype(serie, skipna=True) != 'string':
+        return pd.to_datetime(serie, errors='coerce')
+    horas = pd.to_datetime(serie, format='%H:%M:%S', errors='coerce')
+    pendientes = horas.isna() & serie.notna()
+    if pendientes.any():
+        horas[pendientes] = pd.to_datetime(serie[pendientes], errors='coerce', format='mixed')
+    return horas
+
+
+# Columna derivada: columnas de origen y función que la calcula a partir del DataFrame
+DERIVADAS = {
+    'Día semana': (['Fecha'], lambda df: _dia_semana(df)),
+    'Nombre día': (['Fecha'], lambda df: df.derivadas['Día semana'].map(dict(enumerate(DIAS_SEMANA)))),
+    'Tipo de día': (['Fecha'], lambda df: pd.Series(np.where(df.derivadas['Día semana'] >= 5, 'Fin de Semana',
+                                                             'Semana'), index=df.index)),
+    'Hora del día': (['Hora'], lambda df: _hora_del_dia(df['Hora'])),
+    'Categoria tiempo': (['Hora'], lambda df: crea_categoria_momento_dia_serie(
+        hora_datetime(df['Hora']).dropna().dt.hour).reindex(df.index)),
+    'Rango edad': (['Edad'], lambda df: bandas_de_edad(df['Edad'])),
+}
+
+
+# Caché de columnas derivadas por DataFrame (id del DataFrame -> {nombre: (versión, columna)}).
+# pandas crea un accesor nuevo en cada df.derivadas, por lo que la caché no puede vivir en él;
+# cada entrada se descarta cuando el DataFrame deja de existir.
+_CACHES_DERIVADAS = {}
+
+
+def _cache_derivadas(df):
+    clave = id(df)
+    if clave not in _CACHES_DERIVADAS:
+        _CACHES_DERIVADAS[clave] = {}
+        weakref.finalize(df, _CACHES_DERIVADAS.pop, clave, None)
+    return _CACHES_DERIVADAS[clave]
+
+
+def _memoria(serie):
+    """
+    Devuelve los objetos que guardan los datos de la columna, para detectar sin recorrerla si
+    fue reemplazada o escrita: los arrays de Arrow son inmutables y, con copy-on-write, escribir
+    en una columna numpy de la que se guarda una referencia obliga a pandas a copiarla.
+    """
+    arreglo = serie.array
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(), serie.cat.categories
+    if hasattr(arreglo, '__arrow_array__'):
+        return (arreglo.__arrow_array__(),)
+    return (serie.to_numpy(),)
+
+
+def _misma_memoria(anterior, actual):
+    if len(anterior) != len(actual):
+        return False
+    for a, b in zip(anterior, actual):
+        if isinstance(a, np.ndarray):
+            if not (isinstance(b, np.ndarray) and a.__array_interface__ == b.__array_interface__):
+                return False
+        elif a is not b:
+            return False
+    return True
+
+
+def _digesto(serie):
+    """
+    Hash del contenido y del orden de la columna, incluido su índice.
+    """
+    valores = pd.util.hash_pandas_object(serie, index=True).to_numpy()
+    return hashlib.blake2b(valores.tobytes(), digest_size=16).digest()
+
+
+@pd.api.extensions.register_dataframe_accessor('derivadas')
+class ColumnasDerivadas:
+    """
+    Caché de columnas derivadas de un DataFrame, accesible como df.derivadas['Nombre día'].
+
+    Cada columna de DERIVADAS se calcula una sola vez por versión de sus columnas de origen.
+    La versión de una columna es un hash de su contenido, de su orden y del índice; para no
+    recalcularlo en cada acceso se memoriza junto con una referencia a los datos de la columna,
+    y solo se vuelve a calcular si esos datos fueron reemplazados o escritos. El DataFrame
+    nunca se modifica: la caché se guarda aparte, asociada al DataFrame mientras exista.
+    """
+
+    def __init__(self, df):
+        self._df = df
+        self._cache = _cache_derivadas(df)
+
+    def _version(self, columnas):
+        versiones = []
+        for columna in columnas:
+            serie = self._df[columna]
+            memoria = _memoria(serie)
+            guardada = self._cache.get(('version', columna))
+            if guardada is None or guardada[0] is not self._df.index or not _misma_memoria(guardada[2], memoria):
+                # Se guarda también la Serie: mientras exista, copy-on-write no escribe sobre sus datos
+                guardada = (self._df.index, serie, memoria, _digesto(serie))
+                self._cache[('version', columna)] = guardada
+            versiones.append(guardada[3])
+        return tuple(versiones)
+
+    def __getitem__(self, nombre):
+        """
+        Devuelve la columna derivada, calculándola solo si sus columnas de origen cambiaron.
+
+        Parameters:
+            nombre (str): Una clave de DERIVADAS, por ejemplo 'Día semana' o 'Categoria tiempo'.
+
+        Returns:
+            pd.Series: La columna derivada, alineada con el índice del DataFrame. No debe modificarse.
+        """
+        origen, calcular = DERIVADAS[nombre]
+        version = self._version(origen)
+        if nombre not in self._cache or self._cache[nombre][0] != version:
+            self._cache[nombre] = (version, calcular(self._df).rename(nombre))
+        return self._cache[nombre][1]
+
+    def con(self, nombres):
+        """
+        Devuelve una copia del DataFrame con las columnas derivadas pedidas agregadas.
+
+        Parameters:
+            nombres (list): Claves de DERIVADAS.
+
+        Returns:
+            pd.DataFrame: Un DataFrame nuevo; el original no se modifica.
+        """
+        return self._df.assign(**{nombre: self[nombre] for nombre in nombres})
+
+    def limpiar(self):
+        """
+        Descarta todas las columnas derivadas guardadas.
+        """
+        self._cache.clear()
+
+
+def _con_porcentaje(data, columna_cantidad):
+    """
+    Agrega a la tabla la columna 'Porcentaje' calculada sobre el total de 'columna_cantidad'.
+    """
+    data['Porcentaje'] = data[columna_cantidad] / data[columna_cantidad].sum() * 100
+    return data
+
+
+def _frecuencias(serie):
+    """
+    Cuenta los valores de la Serie en orden descendente. En una Serie categórica, como las que
+    deja 'compactacion.compactar', se omiten las categorías sin filas.
+    """
+    frecuencias = serie.value_counts()
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        frecuencias = frecuencias[frecuencias > 0]
+    return frecuencias
+
+
+def _conteo(df, columna, nombre_cantidad):
+    """
+    Cuenta las filas por cada valor de 'columna' en orden descendente, con su porcentaje.
+    """
+    data = _frecuencias(df[columna]).reset_index()
+    data.columns = [columna, nombre_cantidad]
+    return _con_porcentaje(data, nombre_cantidad)
+
+
+def tabla_victimas_mensuales_por_anio(df):
+    """
+    Calcula la cantidad de víctimas por año y mes.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame que contiene los datos.
+
+    Returns:
+        pd.DataFrame: Tabla con las columnas 'Año', 'Mes' y 'Cantidad víctimas'.
+    """
+    return (df.groupby(['Año', 'Mes'])
+              .agg({'Cantidad víctimas': 'sum'})
+              .reset_index())
+
+
+def tabla_accidentes_por_mes(df):
+    """
+    Calcula la cantidad total de accidentes por mes, sin distinción de año.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame que contiene los datos.
+
+    Returns:
+        pd.DataFrame: Tabla con las columnas 'Mes' y 'Cantidad de accidentes', ordenada por mes.
+    """
+    data = _frecuencias(df['Mes']).sort_index().reset_index()
+    data.columns = ['Mes', 'Cantidad de accidentes']
+    return data
+
+
+def tabla_victimas_por_dia_semana(df, vectorizado=True):
+    """
+    Calcula la cantidad de víctimas por día de la semana.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame que contiene los datos.
+        vectorizado (bool): Si es False, se utiliza el camino original con Series.map y una función lambda.
+
+    Returns:
+        pd.DataFrame: Tabla con las columnas 'Nombre día' y 'Cantidad víctimas', ordenada de lunes a domingo.
+    """
+    if vectorizado:
+        nombre_dia = df.derivadas['Nombre día']
+    else:
+        nombre_dia = _dia_semana(df, vectorizado).map(lambda x: DIAS_SEMANA[x])
+
+    data = (df['Cantidad víctimas']
+            .groupby(nombre_dia.rename('Nombre día'))
+            .sum()
+            .reset_index())
+    return data.sort_values('Nombre día', key=lambda s: s.map(DIAS_SEMANA.index)).reset_index(drop=True)
+
+
+def tabla_accidentes_por_categoria_tiempo(df, vectorizado=True):
+    """
+    Calcula la cantidad y el porcentaje de accidentes por categoría de tiempo (momento del día).
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame que contiene los datos.
+        vectorizado (bool): Si es False, se utiliza el camino original con Series.apply.
+
+    Returns:
+        pd.DataFrame: Tabla con las columnas 'Categoria tiempo', 'Cantidad accidentes' y 'Porcentaje'.
+    """
+    # Se descartan las horas que no pueden convertirse a datetime
+    if vectorizado:
+        categoria = df.derivadas['Categoria tiempo'].dropna()
+    else:
+        categoria = pd.to_datetime(df['Hora'], errors='coerce').dropna().apply(crea_categoria_momento_dia)
+
+    data = _frecuencias(categoria).reset_index()
+    data.columns = ['Categoria tiempo', 'Cantidad accidentes']
+    return _con_porcentaje(data, 'Cantidad accidentes')
+
+
+def tabla_accidentes_por_hora_del_dia(df, vectorizado=True):
+    """
+    Calcula la cantidad de accidentes por hora del día.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame que contiene los datos.
+        vectorizado (bool): Si es False, se utiliza el camino original con Series.apply.
+
+    Returns:
+        pd.DataFrame: Tabla con las columnas 'Hora del día' y 'Cantidad de accidentes', ordenada por hora.
+    """
+    if vectorizado:
+        hora_del_dia = df.derivadas['Hora del día']
+    else:
+        # Se convierte como lo hacía 'cantidad_accidentes_por_categoria_tiempo' al modificar el DataFrame
+        horas = df['Hora']
+        if not pd.api.types.is_datetime64_any_dtype(horas):
+            horas = pd.to_datetime(horas, errors='coerce')
+        hora_del_dia = horas.apply(lambda x: x.hour)
+
+    data = _frecuencias(hora_del_dia).reset_index()
+    data.columns = ['Hora del día', 'Cantidad de accidentes']
+    return data.sort_values(by='Hora del día')
+
+
+def tabla_accidentes_semana_fin_de_semana(df, vectorizado=True):
+    """
+    Calcula la cantidad de accidentes por tipo de día (semana o fin de semana).
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame que contiene los datos.
+        vectorizado (bool): Si es False, se utiliza el camino original con Series.apply.
+
+    Returns:
+        pd.DataFrame: Tabla con las columnas 'Tipo de día' y 'Cantidad de accidentes'.
+    """
+    if vectorizado:
+        tipo_dia = df.derivadas['Tipo de día']
+    else:
+        tipo_dia = _dia_semana(df, vectorizado).apply(lambda x: 'Fin de Semana' if x >= 5 else 'Semana')
+
+    data = _frecuencias(tipo_dia).reset_index()
+    data.columns = ['Tipo de día', 'Cantidad de accidentes']
+    return data
+
+
+def tabla_estadisticas_edad(df, por=None):
+    """
+    Calcula las estadísticas descriptivas de la edad de las víctimas, opcionalmente por grupo.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame que contiene los datos.
+        por (str, opcional): Columna por la cual agrupar, por ejemplo 'Año', 'Rol' o 'Víctima'.
+
+    Returns:
+        pd.DataFrame: Tabla con cantidad, media, desvío, mínimo, cuartiles y máximo de 'Edad'.
+    """
+    if por is None:
+        return df['Edad'].describe().to_frame().T.reset_index(drop=True)
+    return df.groupby(por, observed=True)['Edad'].describe().reset_index()
+
+
+def tabla_accidentes_por_anio_y_sexo(df):
+    """
+    Calcula la cantidad de accidentes y la edad promedio de las víctimas por año y sexo.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame que contiene los datos.
+
+    Returns:
+        pd.DataFrame: Tabla con las columnas 'Año', 'Sexo', 'Cantidad accidentes' y 'Edad promedio'.
+    """
+    return (df.groupby(['Año', 'Sexo'], observed=True)
+              .agg(**{'Cantidad accidentes': ('Edad', 'size'), 'Edad promedio': ('Edad', 'mean')})
+              .reset_index())
+
+
+def tabla_victimas_por_sexo(df):
+    """
+    Calcula la cantidad y el porcentaje de víctimas por sexo.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame que contiene los datos.
+
+    Returns:
+        pd.DataFrame: Tabla con las columnas 'Sexo', 'Cantidad víctimas' y 'Porcentaje'.
+    """
+    return _conteo(df, 'Sexo', 'Cantidad víctimas')
+
+
+def tabla_victimas_por_rol_y_sexo(df):
+    """
+    Calcula la cantidad y el porcentaje de víctimas por rol y sexo.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame que contiene los datos.
+
+    Returns:
+        pd.DataFrame: Tabla con las columnas 'Rol', 'Sexo', 'Cantidad víctimas' y 'Porcentaje'.
+    """
+    data = df.groupby(['Rol', 'Sexo'], observed=True).size().reset_index(name='Cantidad víctimas')
+    return _con_porcentaje(data, 'Cantidad víctimas')
+
+
+def tabla_victimas_por_victima_y_sexo(df):
+    """
+    Calcula la cantidad y el porcentaje de víctimas por tipo de vehículo y sexo.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame que contiene los datos.
+
+    Returns:
+        pd.DataFrame: Tabla con las columnas 'Víctima', 'Sexo', 'Cantidad víctimas' y 'Porcentaje'.
+    """
+    data = df.groupby(['Víctima', 'Sexo'], observed=True).size().reset_index(name='Cantidad víctimas')
+    return _con_porcentaje(data, 'Cantidad víctimas')
+
+
+def tabla_victimas_por_participantes(df):
+    """
+    Calcula la cantidad y el porcentaje de víctimas por participantes del hecho, en orden descendente.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame que contiene los datos.
+
+    Returns:
+        pd.DataFrame: Tabla con las columnas 'Participantes', 'Cantidad víctimas' y 'Porcentaje'.
+    """
+    return _conteo(df, 'Participantes', 'Cantidad víctimas')
+
+
+def tabla_acusados(df):
+    """
+    Calcula la cantidad y el porcentaje de acusados en los hechos, en orden descendente.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame que contiene los datos.
+
+    Returns:
+        pd.DataFrame: Tabla con las columnas 'Acusado', 'Cantidad acusados' y 'Porcentaje'.
+    """
+    return _conteo(df, 'Acusado', 'Cantidad acusados')
+
+
+def tabla_victimas_por_tipo_de_calle(df):
+    """
+    Calcula la cantidad y el porcentaje de víctimas por tipo de calle.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame que contiene los datos.
+
+    Returns:
+        pd.DataFrame: Tabla con las columnas 'Tipo de calle', 'Cantidad víctimas' y 'Porcentaje'.
+    """
+    return _conteo(df, 'Tipo de calle', 'Cantidad víctimas')
+
+
+def tabla_victimas_por_cruce(df):
+    """
+    Calcula la cantidad y el porcentaje de víctimas según ocurrieran o no en un cruce.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame que contiene los datos.
+
+    Returns:
+        pd.DataFrame: Tabla con las columnas 'Cruce', 'Cantidad víctimas' y 'Porcentaje'.
+    """
+    return _conteo(df, 'Cruce', 'Cantidad víctimas')
+
+
+def tablas_eda(df, vectorizado=True):
+    """
+    Calcula todas las tablas del análisis exploratorio sin generar ningún gráfico.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame que contiene los datos.
+        vectorizado (bool): Si es False, se utilizan los caminos originales fila a fila.
+
+    Returns:
+        dict: Un diccionario donde las claves son los nombres de las tablas y los valores los DataFrames.
+    """
+    return {
+        'victimas_mensuales_por_anio': tabla_victimas_mensuales_por_anio(df),
+        'accidentes_por_mes': tabla_accidentes_por_mes(df),
+        'victimas_por_dia_semana': tabla_victimas_por_dia_semana(df, vectorizado),
+        'accidentes_por_categoria_tiempo': tabla_accidentes_por_categoria_tiempo(df, vectorizado),
+        'accidentes_por_hora_del_dia': tabla_accidentes_por_hora_del_dia(df, vectorizado),
+        'accidentes_semana_fin_de_semana': tabla_accidentes_semana_fin_de_semana(df, vectorizado),
+        'estadisticas_edad': tabla_estadisticas_edad(df),
+        'estadisticas_edad_por_anio': tabla_estadisticas_edad(df, por='Año'),
+        'estadisticas_edad_por_rol': tabla_estadisticas_edad(df, por='Rol'),
+        'estadisticas_edad_por_victima': tabla_estadisticas_edad(df, por='Víctima'),
+        'accidentes_por_anio_y_sexo': tabla_accidentes_por_anio_y_sexo(df),
+        'victimas_por_sexo': tabla_victimas_por_sexo(df),
+        'victimas_por_rol_y_sexo': tabla_victimas_por_rol_y_sexo(df),
+        'victimas_por_victima_y_sexo': tabla_victimas_por_victima_y_sexo(df),
+        'victimas_por_participantes': tabla_victimas_por_participantes(df),
+        'acusados': tabla_acusados(df),
+        'victimas_por_tipo_de_calle': tabla_victimas_por_tipo_de_calle(df),
+        'victimas_por_cruce': tabla_victimas_por_cruce(df),
+    }
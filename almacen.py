@@ -0,0 +1,158 @@
+"""
+Almacén columnar en Parquet para los datos limpios de homicidios.
+
+Los datos se particionan por 'Año' y 'Mes' y se guardan con un esquema declarado:
+categorías para las columnas de baja cardinalidad, enteros chicos para los numéricos y
+tipos reales de fecha y hora para 'Fecha' y 'Hora'. La lectura admite proyección de
+columnas y filtros que se resuelven en pyarrow (particiones y estadísticas de cada
+grupo de filas) antes de llegar a pandas.
+"""
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from compactacion import expandir
+
+RUTA_PARQUET = 'Data/homicidios_limpio_parquet'
+
+PARTICIONES = pa.schema([('Año', pa.int16()), ('Mes', pa.int8())])
+
+_CATEGORIA = pa.dictionary(pa.int8(), pa.string())
+
+ESQUEMA = pa.schema([
+    ('Id', pa.string()),
+    ('Rol', _CATEGORIA),
+    ('Sexo', _CATEGORIA),
+    ('Edad', pa.int8()),
+    ('Cantidad víctimas', pa.int8()),
+    ('Fecha', pa.date32()),
+    ('Año', pa.int16()),
+    ('Mes', pa.int8()),
+    ('Día', pa.int8()),
+    ('Hora', pa.time32('s')),
+    ('Hora entera', pa.int8()),
+    ('Lugar del hecho', pa.string()),
+    ('Tipo de calle', _CATEGORIA),
+    ('Calle', pa.string()),
+    ('Cruce', _CATEGORIA),
+    ('Dirección normalizada', pa.string()),
+    ('Comuna', pa.int8()),
+    ('XY (CABA)', pa.string()),
+    ('Pos x', pa.float64()),
+    ('Pos y', pa.float64()),
+    ('Participantes', _CATEGORIA),
+    ('Víctima', _CATEGORIA),
+    ('Acusado', _CATEGORIA),
+])
+
+
+def _columna_arrow(serie, tipo):
+    """
+    Convierte una columna de pandas al tipo de arrow declarado en el esquema.
+    """
+    if pa.types.is_time(tipo):
+        if pd.api.types.is_integer_dtype(serie):
+            # 'compactacion' ya guarda la hora como segundos del día
+            segundos = serie.astype('int32')
+        else:
+            # Se pasa por segundos del día para no construir objetos time fila a fila
+            horas = pd.to_datetime(serie.astype(str), format='%H:%M:%S')
+            segundos = (horas - horas.dt.normalize()).dt.total_seconds().astype('int32')
+        return pa.array(segundos, pa.int32()).cast(tipo)
+    if pa.types.is_date(tipo):
+        return pa.array(pd.to_datetime(serie, format='ISO8601').dt.date, tipo)
+    if pa.types.is_floating(tipo):
+        # Las coordenadas faltantes se guardan como 0, igual que en la limpieza
+        return pa.array(pd.to_numeric(serie, errors='coerce').fillna(0), tipo)
+    if pa.types.is_dictionary(tipo):
+        valores = pa.array(serie, tipo.value_type)
+        return valores.dictionary_encode().cast(tipo)
+    if pa.types.is_string(tipo):
+        return pa.array(serie.astype(str), tipo)
+    return pa.array(serie, tipo)
+
+
+def a_tabla_arrow(df):
+    """
+    Convierte el DataFrame limpio en una tabla de arrow con el esquema declarado.
+
+    Las columnas que no forman parte del esquema, como las derivadas por las funciones
+    de gráficos, se descartan. Si el DataFrame está compactado, 'Id' y 'XY (CABA)' se
+    reconstruyen con 'compactacion.expandir'.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame limpio de homicidios.
+
+    Returns:
+        pa.Table: La tabla con el esquema ESQUEMA.
+    """
+    df = expandir(df, hora=False)
+    columnas = [_columna_arrow(df[campo.name], campo.type) for campo in ESQUEMA]
+    return pa.Table.from_arrays(columnas, schema=ESQUEMA)
+
+
+def escribir_parquet(df, ruta=RUTA_PARQUET):
+    """
+    Escribe el DataFrame limpio como un dataset Parquet particionado por 'Año' y 'Mes'.
+
+    Las particiones presentes en el DataFrame se reemplazan por completo; las demás se conservan.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame limpio de homicidios.
+        ruta (str): Directorio raíz del dataset.
+
+    Returns:
+        None
+    """
+    ds.write_dataset(a_tabla_arrow(df), ruta, format='parquet',
+                     partitioning=ds.partitioning(PARTICIONES, flavor='hive'),
+                     existing_data_behavior='delete_matching')
+
+
+def convertir_csv_a_parquet(ruta_csv='Data/homicidios_limpio.csv', ruta=RUTA_PARQUET):
+    """
+    Convierte el CSV limpio al dataset Parquet particionado.
+
+    Parameters:
+        ruta_csv (str): Ruta al CSV limpio.
+        ruta (str): Directorio raíz del dataset.
+
+    Returns:
+        None
+    """
+    columnas = ESQUEMA.names
+    escribir_parquet(pd.read_csv(ruta_csv, usecols=columnas), ruta)
+
+
+def leer_parquet(ruta=RUTA_PARQUET, columnas=None, filtros=None):
+    """
+    Lee el dataset Parquet con proyección de columnas y filtros resueltos por pyarrow.
+
+    Parameters:
+        ruta (str): Directorio raíz del dataset.
+        columnas (list, opcional): Columnas a leer. Por defecto, todas las del esquema.
+        filtros (list, opcional): Filtros en el formato de pyarrow, por ejemplo
+            [('Año', '>=', 2020), ('Rol', '==', 'PEATON')]. Los filtros sobre 'Año' y 'Mes'
+            descartan particiones enteras sin abrirlas.
+
+    Returns:
+        pd.DataFrame: Los datos con tipos categóricos, enteros chicos, 'Fecha' como datetime64
+            y 'Hora' como objetos time.
+    """
+    dataset = ds.dataset(ruta, format='parquet', schema=ESQUEMA,
+                         partitioning=ds.partitioning(PARTICIONES, flavor='hive'))
+    filtro = pq.filters_to_expression(filtros) if filtros else None
+    tabla = dataset.to_table(columns=columnas, filter=filtro)
+
+    # Se ordena por 'Id' para obtener un orden determinista entre particiones
+    if 'Id' in tabla.column_names:
+        tabla = tabla.sort_by('Id')
+    # Se liberan los buffers de arrow a medida que se convierten para no duplicar la memoria
+    df = tabla.to_pandas(date_as_object=False, split_blocks=True, self_destruct=True)
+    del tabla
+
+    # Parquet no conserva diccionarios de enteros, por lo que la comuna se categoriza al leer
+    if 'Comuna' in df.columns:
+        df['Comuna'] = df['Comuna'].astype('category')
+    return df
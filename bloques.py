@@ -0,0 +1,360 @@
+"""
+Resúmenes de columnas por bloques, para datos que no entran en memoria.
+
+Las funciones de 'Utils' ('resumen_columnas', 'tipos_de_variables' y
+'top_10_valores_repetidos') necesitan el DataFrame completo. Aquí el mismo resumen se
+arma consumiendo un iterador de bloques (por ejemplo pd.read_csv(chunksize=...) o los
+lotes de un dataset Parquet) y combinando resultados parciales de tamaño acotado:
+
+* conteos de datos y nulos y conjunto de tipos por columna, exactos;
+* valores distintos aproximados con HyperLogLog (error relativo ~1.04 / sqrt(2 ** precision));
+* valores más frecuentes aproximados con el resumen de Misra-Gries, cuyo conteo subestima
+  el real en a lo sumo filas / (contadores + 1).
+
+La memoria depende de la cantidad de columnas y de los parámetros, no de la cantidad de filas.
+Como read_csv infiere los tipos de cada bloque por separado, conviene pasar 'dtype' para que
+'tipos_de_variables' coincida con la lectura completa.
+"""
+import numpy as np
+import pandas as pd
+
+from Utils import tipos_de_variables
+
+PRECISION = 12
+
+CONTADORES = 1000
+
+
+def bloques_csv(ruta, tamaño=100_000, **kwargs):
+    """
+    Itera un CSV en bloques de 'tamaño' filas.
+
+    Parameters:
+        ruta (str): Ruta del CSV.
+        tamaño (int): Filas por bloque.
+        **kwargs: Argumentos adicionales para pd.read_csv.
+
+    Returns:
+        iterator: Los bloques como DataFrames.
+    """
+    with pd.read_csv(ruta, chunksize=tamaño, **kwargs) as lector:
+        yield from lector
+
+
+def bloques_parquet(ruta, columnas=None, tamaño=100_000):
+    """
+    Itera un archivo o dataset Parquet por lotes, sin materializarlo completo.
+
+    Parameters:
+        ruta (str): Ruta del archivo o directorio Parquet.
+        columnas (list, opcional): Columnas a leer.
+        tamaño (int): Filas máximas por lote.
+
+    Returns:
+        iterator: Los lotes como DataFrames.
+    """
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(ruta, format='parquet', partitioning='hive')
+    for lote in dataset.to_batches(columns=columnas, batch_size=tamaño):
+        yield lote.to_pandas()
+
+
+def _largo_de_bits(valores):
+    """
+    Cantidad de bits significativos de cada entero sin signo de 64 bits.
+    """
+    # frexp es exacto por mitades de 32 bits, que entran en la mantisa de un float64
+    altos = (valores >> np.uint64(32)).astype(np.float64)
+    bajos = (valores & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(altos > 0, 32 + np.frexp(altos)[1], np.frexp(bajos)[1])
+
+
+def _hashes(serie):
+    """
+    Hash de 64 bits de cada valor, igual para un número y para su texto.
+
+    read_csv infiere el tipo de cada bloque por separado, así que una columna puede llegar
+    como float en un bloque y como texto en otro; los valores numéricos se hashean siempre
+    como float para que 3, 3.0 y '3' cuenten como el mismo valor.
+    """
+    if pd.api.types.is_bool_dtype(serie):
+        return pd.util.hash_pandas_object(serie, index=False).to_numpy()
+    if pd.api.types.is_numeric_dtype(serie):
+        return pd.util.hash_pandas_object(serie.astype(np.float64), index=False).to_numpy()
+    numeros = pd.to_numeric(serie, errors='coerce')
+    es_numero = numeros.notna().to_numpy()
+    hashes = np.empty(len(serie), dtype=np.uint64)
+    hashes[es_numero] = pd.util.hash_pandas_object(numeros[es_numero].astype(np.float64),
+                                                   index=False).to_numpy()
+    hashes[~es_numero] = pd.util.hash_pandas_object(serie[~es_numero].astype(str),
+                                                    index=False).to_numpy()
+    return hashes
+
+
+class HyperLogLog:
+    """
+    Estimador aproximado de la cantidad de valores distintos, combinable entre bloques.
+
+    Parameters:
+        precision (int): Los primeros 'precision' bits del hash eligen el registro; usa
+            2 ** precision bytes de memoria.
+    """
+
+    def __init__(self, precision=PRECISION):
+        self.precision = precision
+        self.registros = np.zeros(2 ** precision, dtype=np.uint8)
+
+    def agregar(self, serie):
+        """
+        Agrega los valores no nulos de una Serie.
+        """
+        # Solo importan los valores distintos del bloque
+        serie = pd.Series(serie.dropna().unique())
+        if serie.empty:
+            return
+        hashes = _hashes(serie)
+
+        resto = 64 - self.precision
+        registro = (hashes >> np.uint64(resto)).astype(np.int64)
+        bits = hashes & np.uint64((1 << resto) - 1)
+        rango = (resto - _largo_de_bits(bits) + 1).astype(np.uint8)
+        np.maximum.at(self.registros, registro, rango)
+
+    def unir(self, otro):
+        """
+        Combina con otro estimador de la misma precisión.
+        """
+        np.maximum(self.registros, otro.registros, out=self.registros)
+
+    def estimar(self):
+        """
+        Devuelve la cantidad estimada de valores distintos.
+        """
+        m = len(self.registros)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimacion = alfa * m * m / np.sum(np.exp2(-self.registros.astype(np.float64)))
+        vacios = np.count_nonzero(self.registros == 0)
+        if estimacion <= 2.5 * m and vacios:
+            # Corrección para pocos valores: conteo lineal sobre los registros vacíos
+            estimacion = m * np.log(m / vacios)
+        return int(round(estimacion))
+
+
+class MisraGries:
+    """
+    Resumen de valores frecuentes con a lo sumo 'contadores' valores, combinable entre bloques.
+
+    Todo valor con frecuencia mayor a filas / (contadores + 1) está en el resumen y su conteo
+    subestima el real en a lo sumo esa cantidad.
+
+    Parameters:
+        contadores (int): Cantidad máxima de valores que se conservan.
+    """
+
+    def __init__(self, contadores=CONTADORES):
+        self.contadores = contadores
+        self.conteos = pd.Series(dtype=np.int64)
+        self.filas = 0
+
+    def _recortar(self, conteos):
+        if len(conteos) <= self.contadores:
+            return conteos
+        # Se descuenta el (contadores + 1)-ésimo conteo y se descartan los que quedan en cero
+        umbral = conteos.nlargest(self.contadores + 1).iloc[-1]
+        conteos = conteos - umbral
+        return conteos[conteos > 0]
+
+    def agregar(self, serie):
+        """
+        Agrega los valores no nulos de una Serie.
+        """
+        conteos = serie.value_counts()
+        self.filas += int(conteos.sum())
+        self._unir_conteos(self._recortar(conteos))
+
+    def _unir_conteos(self, conteos):
+        self.conteos = self._recortar(self.conteos.add(conteos, fill_value=0).astype(np.int64))
+
+    def unir(self, otro):
+        """
+        Combina con otro resumen.
+        """
+        self.filas += otro.filas
+        self._unir_conteos(otro.conteos)
+
+    def top(self, k=10):
+        """
+        Devuelve los k valores más frecuentes con sus conteos aproximados.
+        """
+        return self.conteos.sort_values(ascending=False, kind='stable').head(k).rename('count')
+
+
+class ResumenPorBloques:
+    """
+    Acumula en una sola pasada el resumen de columnas, los tipos de variables y los valores
+    más frecuentes de un iterador de bloques.
+
+    Parameters:
+        precision (int): Precisión de los HyperLogLog de valores distintos.
+        contadores (int): Tamaño de los resúmenes de Misra-Gries.
+        columnas_top (list, opcional): Columnas para las que se calculan valores frecuentes.
+            Por defecto, todas.
+    """
+
+    def __init__(self, precision=PRECISION, contadores=CONTADORES, columnas_top=None):
+        self.precision = precision
+        self.contadores = contadores
+        self.columnas_top = columnas_top
+        self.filas = 0
+        self.columnas = {}
+
+    def _columna(self, nombre):
+        if nombre not in self.columnas:
+            self.columnas[nombre] = {
+                'datos': 0,
+                'nulos': 0,
+                'tipos': [],
+                'dtypes': [],
+                'distintos': HyperLogLog(self.precision),
+                'top': (MisraGries(self.contadores)
+                        if self.columnas_top is None or nombre in self.columnas_top else None),
+            }
+        return self.columnas[nombre]
+
+    def agregar(self, bloque):
+        """
+        Incorpora un bloque al resumen.
+
+        Parameters:
+            bloque (pd.DataFrame): Un bloque de filas.
+
+        Returns:
+            None
+        """
+        # Las columnas que faltan en un bloque cuentan como nulas en sus filas
+        for nombre in self.columnas:
+            if nombre not in bloque.columns:
+                self.columnas[nombre]['nulos'] += len(bloque)
+        # Los tipos de Python de cada columna se detectan como en 'Utils', sin recorrer los valores
+        tipos_bloque = tipos_de_variables(bloque)
+        for nombre in bloque.columns:
+            nueva = nombre not in self.columnas
+            estado = self._columna(nombre)
+            if nueva:
+                estado['nulos'] += self.filas
+
+            serie = bloque[nombre]
+            datos = int(serie.count())
+            estado['datos'] += datos
+            estado['nulos'] += len(serie) - datos
+            if str(serie.dtype) not in estado['dtypes']:
+                estado['dtypes'].append(str(serie.dtype))
+
+            estado['tipos'].extend(tipo for tipo in tipos_bloque[nombre] if tipo not in estado['tipos'])
+
+            estado['distintos'].agregar(serie)
+            if estado['top'] is not None:
+                estado['top'].agregar(serie)
+        self.filas += len(bloque)
+
+    def consumir(self, bloques):
+        """
+        Incorpora todos los bloques de un iterador y devuelve el propio resumen.
+        """
+        for bloque in bloques:
+            self.agregar(bloque)
+        return self
+
+    def resumen_columnas(self):
+        """
+        Equivalente por bloques de 'Utils.resumen_columnas'.
+
+        La cantidad de valores distintos es aproximada y el tipo de datos es el que resultaría
+        de concatenar todos los bloques.
+
+        Returns:
+            pd.DataFrame: Un DataFrame con el resumen de las columnas.
+        """
+        filas = []
+        for nombre, estado in self.columnas.items():
+            dtype = pd.concat([pd.Series(dtype=dtype) for dtype in estado['dtypes']]).dtype
+            filas.append({
+                'Columna': nombre,
+                'Cantidad de Datos': estado['datos'],
+                'Cantidad de Nulos': estado['nulos'],
+                'Porcentaje de Nulos': estado['nulos'] / self.filas * 100 if self.filas else np.nan,
+                'Cantidad de Valores Distintos': estado['distintos'].estimar(),
+                'Tipo de Datos': dtype,
+            })
+        return pd.DataFrame(filas)
+
+    def tipos_de_variables(self):
+        """
+        Equivalente por bloques de 'Utils.tipos_de_variables'.
+
+        Returns:
+            dict: Los tipos de variables presentes en cada columna, en orden de aparición.
+        """
+        return {nombre: list(estado['tipos']) for nombre, estado in self.columnas.items()}
+
+    def top_valores(self, columna, k=10):
+        """
+        Devuelve los k valores más frecuentes de una columna, con conteos aproximados.
+
+        Parameters:
+            columna (str): El nombre de la columna.
+            k (int): Cantidad de valores a devolver; debe ser menor o igual a 'contadores'.
+
+        Returns:
+            pd.Series: Los valores y sus conteos, de mayor a menor.
+        """
+        top = self.columnas[columna]['top']
+        if top is None:
+            raise ValueError(f"No se calcularon valores frecuentes para la columna '{columna}'")
+        return top.top(k).rename_axis(columna)
+
+
+def resumen_columnas_por_bloques(bloques, precision=PRECISION):
+    """
+    Genera el resumen de 'Utils.resumen_columnas' a partir de un iterador de bloques.
+
+    Parameters:
+        bloques (iterable): Bloques del DataFrame, por ejemplo de 'bloques_csv'.
+        precision (int): Precisión del HyperLogLog de valores distintos.
+
+    Returns:
+        pd.DataFrame: Un DataFrame con el resumen de las columnas.
+    """
+    return ResumenPorBloques(precision, columnas_top=[]).consumir(bloques).resumen_columnas()
+
+
+def tipos_de_variables_por_bloques(bloques):
+    """
+    Retorna los tipos de variables de cada columna a partir de un iterador de bloques.
+
+    Parameters:
+        bloques (iterable): Bloques del DataFrame.
+
+    Returns:
+        dict: Un diccionario con la lista de tipos presentes en cada columna.
+    """
+    return ResumenPorBloques(columnas_top=[]).consumir(bloques).tipos_de_variables()
+
+
+def top_10_valores_repetidos_por_bloques(bloques, columna, contadores=CONTADORES):
+    """
+    Muestra los diez valores más repetidos de una columna a partir de un iterador de bloques.
+
+    Parameters:
+        bloques (iterable): Bloques del DataFrame.
+        columna (str): El nombre de la columna.
+        contadores (int): Tamaño del resumen de Misra-Gries.
+
+    Returns:
+        None: La función imprime el resultado en la consola.
+    """
+    resumen = ResumenPorBloques(contadores=contadores, columnas_top=[columna])
+    resumen.consumir(bloque[[columna]] for bloque in bloques)
+    print(f"Top 10 de valores más repetidos en la columna '{columna}' (conteos aproximados):")
+    print(resumen.top_valores(columna, 10))
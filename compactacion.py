@@ -0,0 +1,254 @@
+"""
+Representación compacta en memoria del DataFrame de víctimas.
+
+'compactar' descarta las columnas derivadas que agregan las funciones de gráficos (se
+recalculan con el accesor df.derivadas), convierte a categorías las cadenas de baja
+cardinalidad, reduce los enteros al menor tipo que los contiene, pasa 'Fecha' a datetime64,
+las coordenadas a float y guarda 'Hora' como segundos del día en un entero. Las funciones de
+'agregaciones' aceptan la hora en ese formato.
+
+Las dos columnas de texto casi únicas se separan en columnas numéricas:
+
+* 'Id' ('2016-0001') pasa a 'Id prefijo', una categoría con el texto anterior a los dígitos
+  finales, e 'Id número', un entero con un 1 delante de esos dígitos para conservar los ceros
+  a la izquierda (10001).
+* 'XY (CABA)' ('Point (98896.78238426 93532.43437792)') pasa a 'XY x' e 'XY y' en float64 y a
+  'XY decimales', la cantidad de decimales de cada coordenada (10 * x + y), para reescribir el
+  texto tal cual. Los puntos que no son 'Point (x y)', como 'Point (. .)' o el 0 con el que el
+  ETL reemplaza a ese centinela, quedan como NaN y se reescriben como 'Point (. .)'. Si algún
+  punto no puede reescribirse exacto desde float64, la columna queda como texto.
+
+'expandir' reconstruye las columnas originales para escribir el CSV o el Parquet.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Derivadas de 'Fecha', 'Hora' y 'Edad' que los gráficos agregan al DataFrame
+COLUMNAS_DERIVADAS = ['Día semana', 'Dia semana', 'Nombre día', 'Tipo de día', 'Hora del día',
+                      'Categoria tiempo', 'Rango edad']
+
+COLUMNAS_COORDENADAS = ['Pos x', 'Pos y']
+
+COLUMNAS_ID = ['Id prefijo', 'Id número']
+
+COLUMNAS_XY = ['XY x', 'XY y', 'XY decimales']
+
+CENTINELA_XY = 'Point (. .)'
+
+# Expresiones de RE2 para pyarrow.compute.extract_regex, que las evalúa sin pasar por Python
+_PATRON_ID = r'^(?P<prefijo>.*?)(?P<digitos>\d{0,18})$'
+
+_PATRON_XY = r'^Point \((?P<x>-?\d+(?:\.(?P<dx>\d*))?) (?P<y>-?\d+(?:\.(?P<dy>\d*))?)\)$'
+
+# Mayor valor absoluto de coordenada por 10 ** decimales que float64 representa exactamente
+_ENTERO_EXACTO = 2 ** 53
+
+# Fracción máxima de valores distintos para convertir una columna de texto en categoría
+FRACCION_CATEGORIAS = 0.5
+
+
+def segundos_del_dia(serie):
+    """
+    Convierte una Serie de horas (time, datetime o cadena 'HH:MM:SS') en segundos desde la medianoche.
+
+    Returns:
+        pd.Series: Enteros int32, o Int32 con nulos si alguna hora no pudo convertirse.
+    """
+    if pd.api.types.is_integer_dtype(serie):
+        return serie
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        horas = serie
+    else:
+        horas = pd.to_datetime(serie.astype(str), format='%H:%M:%S', errors='coerce')
+    segundos = (horas - horas.dt.normalize()).dt.total_seconds()
+    return segundos.astype('Int32' if segundos.isna().any() else 'int32')
+
+
+def horas_a_texto(segundos):
+    """
+    Convierte segundos del día en cadenas 'HH:MM:SS', el formato de la hora en el CSV limpio.
+    """
+    return pd.to_datetime(segundos, unit='s').dt.strftime('%H:%M:%S')
+
+
+def _campos(serie, patron):
+    """
+    Aplica la expresión regular a los textos y devuelve sus grupos como arrays de arrow, más la
+    máscara de los textos que la cumplen.
+    """
+    partes = pc.extract_regex(pa.array(serie.astype(str), pa.string(), from_pandas=True), patron)
+    validos = partes.is_valid().to_numpy(zero_copy_only=False)
+    campos = {campo.name: partes.field(i) for i, campo in enumerate(partes.type)}
+    return campos, validos
+
+
+def _separar_id(serie):
+    """
+    Separa los 'Id' en el prefijo (categoría) y los dígitos finales con un 1 delante (entero).
+    """
+    campos, validos = _campos(serie, _PATRON_ID)
+    prefijos = pd.Series(campos['prefijo'].to_numpy(zero_copy_only=False), index=serie.index)
+    numeros = pd.Series(pc.cast(pc.binary_join_element_wise('1', campos['digitos'], ''), pa.int64()).to_numpy(),
+                        index=serie.index)
+    validos &= serie.notna().to_numpy()
+    if validos.all():
+        numeros = pd.to_numeric(numeros, downcast='integer')
+    else:
+        numeros = numeros.astype('Int64').where(validos)
+    return {'Id prefijo': prefijos.where(validos).astype('category'), 'Id número': numeros}
+
+
+def _unir_id(prefijos, numeros):
+    """
+    Inversa de '_separar_id'.
+    """
+    digitos = numeros.astype(str).str[1:]
+    return (prefijos.astype(object) + digitos).where(numeros.notna()).astype('str')
+
+
+def _separar_xy(serie):
+    """
+    Separa los 'Point (x y)' en las dos coordenadas y la cantidad de decimales de cada una.
+
+    Returns:
+        dict: Las columnas 'XY x', 'XY y' y 'XY decimales', o None si algún punto tiene más de
+            9 decimales o más dígitos de los que float64 representa exactamente.
+    """
+    campos, validos = _campos(serie, _PATRON_XY)
+    columnas = {}
+    decimales = np.zeros(len(serie), dtype=np.int8)
+    for eje, factor in (('x', 10), ('y', 1)):
+        valores = pc.cast(pc.if_else(validos, campos[eje], None), pa.float64()).to_numpy(zero_copy_only=False)
+        cantidad = np.where(validos, pc.utf8_length(campos['d' + eje]).to_numpy(zero_copy_only=False), 0)
+        if cantidad.max(initial=0) > 9 or np.nanmax(np.abs(valores) * 10.0 ** cantidad, initial=0) >= _ENTERO_EXACTO:
+            return None
+        columnas['XY ' + eje] = pd.Series(valores, index=serie.index)
+        decimales += (factor * cantidad).astype(np.int8)
+    columnas['XY decimales'] = pd.Series(decimales, index=serie.index)
+    return columnas
+
+
+def _formatear(valores, decimales):
+    """
+    Escribe cada número con su cantidad de decimales, con la parte entera y la decimal como
+    enteros exactos, agrupando por cantidad de decimales.
+    """
+    texto = np.empty(len(valores), dtype=object)
+    for cantidad in np.unique(decimales).tolist():
+        cuales = decimales == cantidad
+        escalados = np.rint(np.abs(valores[cuales]) * 10.0 ** cantidad).astype(np.int64)
+        numero = pc.cast(pa.array(escalados // 10 ** cantidad), pa.string())
+        if cantidad:
+            fraccion = pc.utf8_lpad(pc.cast(pa.array(escalados % 10 ** cantidad), pa.string()), cantidad, '0')
+            numero = pc.binary_join_element_wise(numero, fraccion, '.')
+        numero = pc.if_else(pa.array(valores[cuales] < 0), pc.binary_join_element_wise('-', numero, ''), numero)
+        texto[cuales] = numero.to_numpy(zero_copy_only=False)
+    return texto
+
+
+def _unir_xy(x, y, decimales):
+    """
+    Inversa de '_separar_xy'.
+    """
+    validos = (x.notna() & y.notna()).to_numpy()
+    decimales = decimales.to_numpy()[validos]
+    texto = np.full(len(x), CENTINELA_XY, dtype=object)
+    texto[validos] = ('Point (' + _formatear(x.to_numpy()[validos], decimales // 10) + ' '
+                      + _formatear(y.to_numpy()[validos], decimales % 10) + ')')
+    return pd.Series(texto, index=x.index, dtype='str')
+
+
+def compactar(df, fraccion_categorias=FRACCION_CATEGORIAS):
+    """
+    Devuelve una copia compacta del DataFrame de víctimas; el original no se modifica.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame limpio de homicidios, leído del CSV o recién unido en el ETL.
+        fraccion_categorias (float): Las columnas de texto con a lo sumo esta fracción de valores
+            distintos respecto de las filas se convierten en categorías.
+
+    Returns:
+        pd.DataFrame: El DataFrame con los tipos compactos.
+    """
+    df = df.drop(columns=[columna for columna in COLUMNAS_DERIVADAS if columna in df.columns])
+    columnas = {}
+    for columna in df.columns:
+        serie = df[columna]
+        if columna == 'Id' and pd.api.types.infer_dtype(serie, skipna=True) == 'string':
+            columnas.update(_separar_id(serie))
+            continue
+        if columna == 'XY (CABA)':
+            separadas = _separar_xy(serie)
+            if separadas is not None:
+                columnas.update(separadas)
+                continue
+        if columna == 'Hora':
+            serie = segundos_del_dia(serie)
+        elif columna == 'Fecha':
+            serie = pd.to_datetime(serie, format='ISO8601')
+        elif columna in COLUMNAS_COORDENADAS:
+            serie = pd.to_numeric(serie, errors='coerce')
+        elif pd.api.types.is_integer_dtype(serie) or pd.api.types.infer_dtype(serie, skipna=False) == 'integer':
+            serie = pd.to_numeric(serie, downcast='integer')
+        elif (pd.api.types.infer_dtype(serie, skipna=True) == 'string'
+              and serie.nunique() <= fraccion_categorias * len(serie)):
+            serie = serie.astype('category')
+        columnas[columna] = serie
+    return pd.DataFrame(columnas, index=df.index)
+
+
+def expandir(df, hora=True):
+    """
+    Reconstruye las columnas de texto de un DataFrame compacto, para escribirlo en el CSV o el Parquet.
+
+    'Id' y 'XY (CABA)' vuelven a la posición de las columnas que los reemplazan y, si 'hora'
+    es True, 'Hora' vuelve a escribirse como 'HH:MM:SS'. Las demás columnas no cambian.
+
+    Parameters:
+        df (pd.DataFrame): Un DataFrame devuelto por 'compactar'.
+        hora (bool): Si es True, también se convierte 'Hora' a texto.
+
+    Returns:
+        pd.DataFrame: Una copia con las columnas originales.
+    """
+    reconstruidas = {}
+    if all(columna in df.columns for columna in COLUMNAS_ID):
+        reconstruidas['Id'] = (COLUMNAS_ID, _unir_id(df['Id prefijo'], df['Id número']))
+    if all(columna in df.columns for columna in COLUMNAS_XY):
+        reconstruidas['XY (CABA)'] = (COLUMNAS_XY, _unir_xy(df['XY x'], df['XY y'], df['XY decimales']))
+
+    columnas = {}
+    for columna in df.columns:
+        for nombre, (origen, serie) in reconstruidas.items():
+            if columna in origen:
+                if columna == origen[0]:
+                    columnas[nombre] = serie
+                break
+        else:
+            columnas[columna] = df[columna]
+    if hora and 'Hora' in columnas and pd.api.types.is_integer_dtype(columnas['Hora']):
+        columnas['Hora'] = horas_a_texto(columnas['Hora'])
+    return pd.DataFrame(columnas, index=df.index)
+
+
+def reporte_memoria(antes, despues):
+    """
+    Compara la memoria de cada columna, medida con memory_usage(deep=True), antes y después de compactar.
+
+    Parameters:
+        antes (pd.DataFrame): El DataFrame original.
+        despues (pd.DataFrame): El DataFrame compacto.
+
+    Returns:
+        pd.DataFrame: Bytes antes y después, tipo final y factor de reducción por columna, con
+            una fila 'Total' al final.
+    """
+    memoria_antes = antes.memory_usage(deep=True, index=False)
+    memoria_despues = despues.memory_usage(deep=True, index=False)
+    reporte = pd.DataFrame({'Bytes antes': memoria_antes, 'Bytes después': memoria_despues,
+                            'Tipo': despues.dtypes.astype(str)})
+    reporte.loc['Total'] = [memoria_antes.sum(), memoria_despues.sum(), '']
+    reporte['Reducción'] = reporte['Bytes antes'] / reporte['Bytes después'].replace(0, np.nan)
+    return reporte
@@ -0,0 +1,305 @@
+"""
+Capa de consultas SQL con DuckDB sobre los datos limpios de homicidios.
+
+El CSV limpio o el dataset Parquet de 'almacen' se registran como 'homicidios' (una tabla
+cargada una vez para el CSV, una vista para el Parquet) con los tipos de ESQUEMA_SQL; las
+columnas que no están en el esquema, como las derivadas, se omiten. Las tablas de 'agregaciones' y el histórico de KPIs de 'kpis' se resuelven como
+consultas SQL que DuckDB ejecuta en paralelo y, si se le fija un límite de memoria, volcando
+a disco lo que no entra. Los resultados tienen las mismas columnas que las versiones de pandas.
+
+DuckDB es una dependencia opcional: solo la necesita este módulo.
+"""
+import os
+
+import duckdb
+import pandas as pd
+
+from agregaciones import DIAS_SEMANA
+from poblacion import poblacion_anual
+
+RUTA_LIMPIO = 'Data/homicidios_limpio.csv'
+
+ESQUEMA_SQL = {
+    'Id': 'VARCHAR',
+    'Rol': 'VARCHAR',
+    'Sexo': 'VARCHAR',
+    'Edad': 'SMALLINT',
+    'Cantidad víctimas': 'TINYINT',
+    'Fecha': 'DATE',
+    'Año': 'SMALLINT',
+    'Mes': 'TINYINT',
+    'Día': 'TINYINT',
+    'Hora': 'TIME',
+    'Hora entera': 'TINYINT',
+    'Lugar del hecho': 'VARCHAR',
+    'Tipo de calle': 'VARCHAR',
+    'Calle': 'VARCHAR',
+    'Cruce': 'VARCHAR',
+    'Dirección normalizada': 'VARCHAR',
+    'Comuna': 'TINYINT',
+    'XY (CABA)': 'VARCHAR',
+    'Pos x': 'DOUBLE',
+    'Pos y': 'DOUBLE',
+    'Participantes': 'VARCHAR',
+    'Víctima': 'VARCHAR',
+    'Acusado': 'VARCHAR',
+}
+
+# Mismos cortes que 'agregaciones.crea_categoria_momento_dia'
+_CATEGORIA_TIEMPO = '''CASE
+    WHEN hour("Hora") BETWEEN 6 AND 10 THEN 'Mañana'
+    WHEN hour("Hora") BETWEEN 11 AND 13 THEN 'Medio día'
+    WHEN hour("Hora") BETWEEN 14 AND 18 THEN 'Tarde'
+    WHEN hour("Hora") BETWEEN 19 AND 23 THEN 'Noche'
+    ELSE 'Madrugada' END'''
+
+
+def _identificador(nombre):
+    return '"' + nombre.replace('"', '""') + '"'
+
+
+def _literal(texto):
+    return "'" + texto.replace("'", "''") + "'"
+
+
+class ConsultasDuckDB:
+    """
+    Conexión DuckDB con los datos limpios registrados como la vista 'homicidios'.
+
+    Parameters:
+        ruta (str): CSV limpio, archivo Parquet o directorio del dataset Parquet particionado.
+        hilos (int, opcional): Cantidad de hilos de DuckDB. Por defecto, todos los núcleos.
+        memoria_maxima (str, opcional): Límite de memoria, por ejemplo '2GB'; lo que no entra
+            se vuelca a 'directorio_temporal'.
+        directorio_temporal (str, opcional): Directorio para los volcados a disco.
+        materializar (bool, opcional): Si es True, los datos tipados se cargan una vez en una
+            tabla de DuckDB en lugar de releer el origen en cada consulta. Por defecto, se
+            materializa el CSV (que de otro modo se parsea entero en cada consulta) y no el
+            Parquet, del que cada consulta lee solo las columnas que usa.
+    """
+
+    def __init__(self, ruta=RUTA_LIMPIO, hilos=None, memoria_maxima=None, directorio_temporal=None,
+                 materializar=None):
+        self.ruta = ruta
+        self.conexion = duckdb.connect()
+        if hilos:
+            self.conexion.execute(f'SET threads = {int(hilos)}')
+        if memoria_maxima:
+            self.conexion.execute(f'SET memory_limit = {_literal(memoria_maxima)}')
+        if directorio_temporal:
+            self.conexion.execute(f'SET temp_directory = {_literal(directorio_temporal)}')
+        if materializar is None:
+            materializar = not (os.path.isdir(ruta) or ruta.endswith('.parquet'))
+        tipo = 'TABLE' if materializar else 'VIEW'
+        self.conexion.execute(f'CREATE {tipo} homicidios AS {self._seleccion_tipada()}')
+
+    def _origen(self):
+        """
+        Devuelve la función de lectura de DuckDB que corresponde a la ruta.
+        """
+        if os.path.isdir(self.ruta):
+            patron = os.path.join(self.ruta, '**', '*.parquet')
+            return f'read_parquet({_literal(patron)}, hive_partitioning = true)'
+        if self.ruta.endswith('.parquet'):
+            return f'read_parquet({_literal(self.ruta)})'
+        # Se lee todo como texto y se convierte en la vista, para tolerar valores como '.'
+        return f'read_csv({_literal(self.ruta)}, header = true, all_varchar = true)'
+
+    def _seleccion_tipada(self):
+        origen = self._origen()
+        disponibles = set(self.conexion.execute(f'SELECT * FROM {origen} LIMIT 0').df().columns)
+        faltantes = [columna for columna in ESQUEMA_SQL if columna not in disponibles]
+        if faltantes:
+            raise ValueError(f'Faltan columnas del esquema en {self.ruta}: {faltantes}')
+        columnas = ',\n    '.join(f'TRY_CAST({_identificador(c)} AS {tipo}) AS {_identificador(c)}'
+                                  for c, tipo in ESQUEMA_SQL.items())
+        return f'SELECT\n    {columnas}\nFROM {origen}'
+
+    def consultar(self, sql, parametros=None):
+        """
+        Ejecuta una consulta SQL sobre la vista 'homicidios' y devuelve el resultado.
+
+        Parameters:
+            sql (str): La consulta.
+            parametros (list, opcional): Valores para los marcadores '?' de la consulta.
+
+        Returns:
+            pd.DataFrame: El resultado.
+        """
+        return self.conexion.execute(sql, parametros or []).df()
+
+    def _conteo(self, columna, nombre_cantidad):
+        columna = _identificador(columna)
+        return self.consultar(f'''
+            SELECT {columna}, count(*) AS {_identificador(nombre_cantidad)},
+                   count(*) * 100.0 / sum(count(*)) OVER () AS "Porcentaje"
+            FROM homicidios GROUP BY ALL ORDER BY 2 DESC, 1''')
+
+    def tabla_victimas_mensuales_por_anio(self):
+        return self.consultar('''
+            SELECT "Año", "Mes", sum("Cantidad víctimas")::BIGINT AS "Cantidad víctimas"
+            FROM homicidios GROUP BY ALL ORDER BY ALL''')
+
+    def tabla_accidentes_por_mes(self):
+        return self.consultar('''
+            SELECT "Mes", count(*) AS "Cantidad de accidentes"
+            FROM homicidios GROUP BY ALL ORDER BY "Mes"''')
+
+    def tabla_victimas_por_dia_semana(self):
+        dias = '[' + ', '.join(_literal(dia) for dia in DIAS_SEMANA) + ']'
+        return self.consultar(f'''
+            SELECT {dias}[isodow("Fecha")] AS "Nombre día", sum("Cantidad víctimas")::BIGINT AS "Cantidad víctimas"
+            FROM homicidios GROUP BY isodow("Fecha") ORDER BY isodow("Fecha")''')
+
+    def tabla_accidentes_por_categoria_tiempo(self):
+        return self.consultar(f'''
+            SELECT {_CATEGORIA_TIEMPO} AS "Categoria tiempo", count(*) AS "Cantidad accidentes",
+                   count(*) * 100.0 / sum(count(*)) OVER () AS "Porcentaje"
+            FROM homicidios WHERE "Hora" IS NOT NULL
+            GROUP BY ALL ORDER BY 2 DESC, 1''')
+
+    def tabla_accidentes_por_hora_del_dia(self):
+        return self.consultar('''
+            SELECT hour("Hora") AS "Hora del día", count(*) AS "Cantidad de accidentes"
+            FROM homicidios WHERE "Hora" IS NOT NULL GROUP BY ALL ORDER BY 1''')
+
+    def tabla_accidentes_semana_fin_de_semana(self):
+        return self.consultar('''
+            SELECT CASE WHEN isodow("Fecha") >= 6 THEN 'Fin de Semana' ELSE 'Semana' END AS "Tipo de día",
+                   count(*) AS "Cantidad de accidentes"
+            FROM homicidios GROUP BY ALL ORDER BY 2 DESC, 1''')
+
+    def tabla_estadisticas_edad(self, por=None):
+        grupo = '' if por is None else f'{_identificador(por)}, '
+        return self.consultar(f'''
+            SELECT {grupo}count("Edad")::DOUBLE AS "count", avg("Edad") AS "mean", stddev_samp("Edad") AS "std",
+                   min("Edad")::DOUBLE AS "min", quantile_cont("Edad", 0.25) AS "25%",
+                   quantile_cont("Edad", 0.5) AS "50%", quantile_cont("Edad", 0.75) AS "75%",
+                   max("Edad")::DOUBLE AS "max"
+            FROM homicidios {'' if por is None else 'GROUP BY ALL ORDER BY 1'}''')
+
+    def tabla_accidentes_por_anio_y_sexo(self):
+        return self.consultar('''
+            SELECT "Año", "Sexo", count(*) AS "Cantidad accidentes", avg("Edad") AS "Edad promedio"
+            FROM homicidios GROUP BY ALL ORDER BY ALL''')
+
+    def tabla_victimas_por_sexo(self):
+        return self._conteo('Sexo', 'Cantidad víctimas')
+
+    def _conteo_cruzado(self, columna):
+        return self.consultar(f'''
+            SELECT {_identificador(columna)}, "Sexo", count(*) AS "Cantidad víctimas",
+                   count(*) * 100.0 / sum(count(*)) OVER () AS "Porcentaje"
+            FROM homicidios GROUP BY ALL ORDER BY 1, 2''')
+
+    def tabla_victimas_por_rol_y_sexo(self):
+        return self._conteo_cruzado('Rol')
+
+    def tabla_victimas_por_victima_y_sexo(self):
+        return self._conteo_cruzado('Víctima')
+
+    def tabla_victimas_por_participantes(self):
+        return self._conteo('Participantes', 'Cantidad víctimas')
+
+    def tabla_acusados(self):
+        return self._conteo('Acusado', 'Cantidad acusados')
+
+    def tabla_victimas_por_tipo_de_calle(self):
+        return self._conteo('Tipo de calle', 'Cantidad víctimas')
+
+    def tabla_victimas_por_cruce(self):
+        return self._conteo('Cruce', 'Cantidad víctimas')
+
+    def tablas_eda(self):
+        """
+        Calcula en DuckDB todas las tablas de 'agregaciones.tablas_eda', con las mismas claves.
+
+        Returns:
+            dict: Un diccionario donde las claves son los nombres de las tablas y los valores los DataFrames.
+        """
+        return {
+            'victimas_mensuales_por_anio': self.tabla_victimas_mensuales_por_anio(),
+            'accidentes_por_mes': self.tabla_accidentes_por_mes(),
+            'victimas_por_dia_semana': self.tabla_victimas_por_dia_semana(),
+            'accidentes_por_categoria_tiempo': self.tabla_accidentes_por_categoria_tiempo(),
+            'accidentes_por_hora_del_dia': self.tabla_accidentes_por_hora_del_dia(),
+            'accidentes_semana_fin_de_semana': self.tabla_accidentes_semana_fin_de_semana(),
+            'estadisticas_edad': self.tabla_estadisticas_edad(),
+            'estadisticas_edad_por_anio': self.tabla_estadisticas_edad(por='Año'),
+            'estadisticas_edad_por_rol': self.tabla_estadisticas_edad(por='Rol'),
+            'estadisticas_edad_por_victima': self.tabla_estadisticas_edad(por='Víctima'),
+            'accidentes_por_anio_y_sexo': self.tabla_accidentes_por_anio_y_sexo(),
+            'victimas_por_sexo': self.tabla_victimas_por_sexo(),
+            'victimas_por_rol_y_sexo': self.tabla_victimas_por_rol_y_sexo(),
+            'victimas_por_victima_y_sexo': self.tabla_victimas_por_victima_y_sexo(),
+            'victimas_por_participantes': self.tabla_victimas_por_participantes(),
+            'acusados': self.tabla_acusados(),
+            'victimas_por_tipo_de_calle': self.tabla_victimas_por_tipo_de_calle(),
+            'victimas_por_cruce': self.tabla_victimas_por_cruce(),
+        }
+
+    def kpis_historico(self, meses_tasa=6, meses_moto=12, meses_avenida=12, poblacion=poblacion_anual):
+        """
+        Calcula en SQL los conteos de las ventanas móviles de los KPIs, como 'kpis.calcular_historico'.
+
+        Los conteos mensuales se completan con los meses sin víctimas y las ventanas actual y
+        previa se resuelven con funciones de ventana; las tasas se calculan luego con la
+        población de cada año.
+
+        Parameters:
+            meses_tasa (int): Largo de la ventana de la tasa de homicidios.
+            meses_moto (int): Largo de la ventana de la variación de motociclistas.
+            meses_avenida (int): Largo de la ventana de la tasa en avenidas.
+            poblacion (callable): Función que recibe un array de años y devuelve la población.
+
+        Returns:
+            pd.DataFrame: Una fila por mes con las columnas de 'kpis.MotorKPI.historico'.
+        """
+        def ventanas(columna, largo, nombre):
+            actual = f'sum({columna}) OVER (ORDER BY indice ROWS BETWEEN {largo - 1} PRECEDING AND CURRENT ROW)'
+            previa = (f'sum({columna}) OVER (ORDER BY indice ROWS BETWEEN {2 * largo - 1} PRECEDING '
+                      f'AND {largo} PRECEDING)')
+            return f'({actual})::BIGINT AS "{nombre}", coalesce(({previa})::BIGINT, 0) AS "{nombre} previas"'
+
+        conteos = self.consultar(f'''
+            WITH mensual AS (
+                SELECT "Año" * 12 + "Mes" - 1 AS indice, count(*) AS victimas,
+                       count(*) FILTER ("Víctima" = 'MOTO') AS moto,
+                       count(*) FILTER ("Tipo de calle" = 'AVENIDA') AS avenida
+                FROM homicidios GROUP BY ALL
+            ), completo AS (
+                SELECT meses.indice, coalesce(victimas, 0) AS victimas, coalesce(moto, 0) AS moto,
+                       coalesce(avenida, 0) AS avenida
+                FROM range((SELECT min(indice) FROM mensual), (SELECT max(indice) FROM mensual) + 1) AS meses(indice)
+                LEFT JOIN mensual USING (indice)
+            )
+            SELECT indice, {ventanas('victimas', meses_tasa, 'Víctimas')},
+                   {ventanas('moto', meses_moto, 'Víctimas moto')},
+                   {ventanas('avenida', meses_avenida, 'Víctimas avenida')}
+            FROM completo ORDER BY indice''')
+
+        indices = conteos['indice'].to_numpy()
+
+        def tasa(cantidades, indices_fin):
+            return cantidades.to_numpy(dtype=float) / poblacion(indices_fin // 12) * 100000
+
+        moto_previas = conteos['Víctimas moto previas'].astype(float)
+        return pd.DataFrame({
+            'Año': indices // 12,
+            'Mes': indices % 12 + 1,
+            'Víctimas': conteos['Víctimas'],
+            'Tasa homicidios': tasa(conteos['Víctimas'], indices),
+            'Tasa homicidios previa': tasa(conteos['Víctimas previas'], indices - meses_tasa),
+            'Víctimas moto': conteos['Víctimas moto'],
+            'Víctimas moto previas': conteos['Víctimas moto previas'],
+            'Variación motociclistas': -(moto_previas - conteos['Víctimas moto']) / moto_previas.where(moto_previas != 0) * 100,
+            'Víctimas avenida': conteos['Víctimas avenida'],
+            'Tasa avenidas': tasa(conteos['Víctimas avenida'], indices),
+            'Tasa avenidas previa': tasa(conteos['Víctimas avenida previas'], indices - meses_avenida),
+        })
+
+    def cerrar(self):
+        """
+        Cierra la conexión de DuckDB.
+        """
+        self.conexion.close()
@@ -0,0 +1,188 @@
+"""
+Cubo OLAP materializado de víctimas por tiempo, lugar y perfil.
+
+El cubo agrupa una sola vez el DataFrame de víctimas por todas sus dimensiones y guarda
+las medidas aditivas de cada celda. Las vistas del análisis exploratorio se resuelven
+luego agregando (roll-up) y filtrando (slice) las celdas, sin volver a recorrer las filas.
+"""
+import pandas as pd
+
+from agregaciones import BORDES_EDAD, DIAS_SEMANA, _con_porcentaje, bandas_de_edad, crea_categoria_momento_dia_serie
+
+DIMENSIONES = ['Año', 'Mes', 'Nombre día', 'Hora entera', 'Comuna', 'Tipo de calle', 'Cruce',
+               'Rol', 'Sexo', 'Víctima', 'Acusado', 'Participantes', 'Rango edad']
+
+MEDIDAS = ['Víctimas', 'Cantidad víctimas', 'Suma edad']
+
+
+class CuboVictimas:
+    """
+    Cubo de víctimas con una fila por combinación observada de dimensiones.
+
+    Las medidas son aditivas, por lo que cualquier agregación sobre un subconjunto de
+    dimensiones se obtiene sumando celdas:
+
+    * 'Víctimas': cantidad de filas de víctimas.
+    * 'Cantidad víctimas': suma de la columna 'Cantidad víctimas' de los hechos.
+    * 'Suma edad': suma de las edades, para calcular promedios como 'Suma edad' / 'Víctimas'.
+    """
+
+    def __init__(self, celdas, dimensiones):
+        self.celdas = celdas
+        self.dimensiones = list(dimensiones)
+
+    @classmethod
+    def construir(cls, df, dimensiones=DIMENSIONES, bordes_edad=BORDES_EDAD):
+        """
+        Construye el cubo a partir del DataFrame limpio de víctimas en una sola agrupación.
+
+        Parameters:
+            df (pd.DataFrame): El DataFrame limpio de homicidios.
+            dimensiones (list): Dimensiones del cubo. 'Nombre día', 'Hora entera' y 'Rango edad'
+                se derivan de 'Fecha', 'Hora' y 'Edad' si no están en el DataFrame.
+            bordes_edad (list): Bordes de las bandas de edad para la dimensión 'Rango edad'.
+
+        Returns:
+            CuboVictimas: El cubo materializado.
+        """
+        derivadas = {
+            'Nombre día': lambda: df.derivadas['Nombre día'],
+            'Hora entera': lambda: df.derivadas['Hora del día'],
+            'Rango edad': lambda: (df.derivadas['Rango edad'] if bordes_edad is BORDES_EDAD
+                                   else bandas_de_edad(df['Edad'], bordes_edad)),
+        }
+        base = pd.DataFrame(index=df.index)
+        for dimension in dimensiones:
+            if dimension in df.columns:
+                base[dimension] = df[dimension]
+            else:
+                base[dimension] = derivadas[dimension]()
+            base[dimension] = base[dimension].astype('category')
+        base['Cantidad víctimas'] = df['Cantidad víctimas']
+        base['Edad'] = df['Edad']
+
+        # Con dropna=False las víctimas con alguna dimensión faltante conservan su celda
+        celdas = (base.groupby(list(dimensiones), observed=True, dropna=False)
+                      .agg(**{'Víctimas': ('Edad', 'size'),
+                              'Cantidad víctimas': ('Cantidad víctimas', 'sum'),
+                              'Suma edad': ('Edad', 'sum')})
+                      .reset_index())
+        return cls(celdas, dimensiones)
+
+    def filtrar(self, filtros):
+        """
+        Devuelve un cubo con solo las celdas que cumplen los filtros (slice / dice).
+
+        Parameters:
+            filtros (dict): Dimensión y valor, o lista de valores, a conservar.
+                Por ejemplo {'Año': 2021, 'Rol': ['PEATON', 'CICLISTA']}.
+
+        Returns:
+            CuboVictimas: El cubo filtrado.
+        """
+        mascara = pd.Series(True, index=self.celdas.index)
+        for dimension, valores in filtros.items():
+            if not isinstance(valores, (list, tuple, set)):
+                valores = [valores]
+            mascara &= self.celdas[dimension].isin(valores)
+        return CuboVictimas(self.celdas[mascara], self.dimensiones)
+
+    def agrupar(self, dimensiones, medidas=MEDIDAS, dropna=False):
+        """
+        Agrega el cubo sobre un subconjunto de sus dimensiones (roll-up).
+
+        Parameters:
+            dimensiones (list): Dimensiones que se conservan; las demás se suman.
+            medidas (list): Medidas a devolver.
+            dropna (bool): Si es True, se descartan las celdas con alguna de las dimensiones
+                pedidas faltante, como en un groupby de pandas. Por defecto se conservan, de
+                modo que las medidas suman lo mismo que sobre todas las filas.
+
+        Returns:
+            pd.DataFrame: Una fila por combinación observada de las dimensiones pedidas.
+        """
+        if not dimensiones:
+            return self.celdas[list(medidas)].sum().to_frame().T
+        return (self.celdas.groupby(list(dimensiones), observed=True, dropna=dropna)[list(medidas)]
+                    .sum()
+                    .reset_index())
+
+    def exportar(self, ruta):
+        """
+        Exporta las celdas del cubo a un CSV, por ejemplo para alimentar el tablero de Power BI.
+
+        Parameters:
+            ruta (str): Ruta del CSV a escribir.
+
+        Returns:
+            None
+        """
+        self.celdas.to_csv(ruta, index=False, encoding='utf-8')
+
+
+def _conteo_cubo(cubo, dimension, nombre_cantidad):
+    data = cubo.agrupar([dimension], ['Víctimas'], dropna=True).rename(columns={'Víctimas': nombre_cantidad})
+    data = data.sort_values(nombre_cantidad, ascending=False, kind='stable').reset_index(drop=True)
+    return _con_porcentaje(data, nombre_cantidad)
+
+
+def vistas_eda(cubo):
+    """
+    Calcula desde el cubo las tablas aditivas de 'agregaciones.tablas_eda'.
+
+    Las estadísticas de edad por cuartiles no son aditivas y se siguen calculando sobre las filas.
+    Como en pandas, las celdas con la dimensión agrupada faltante no se cuentan.
+
+    Parameters:
+        cubo (CuboVictimas): Un cubo con las dimensiones por defecto.
+
+    Returns:
+        dict: Un diccionario con las mismas claves y columnas que 'tablas_eda'.
+    """
+    por_mes = cubo.agrupar(['Mes'], ['Víctimas'], dropna=True).rename(columns={'Víctimas': 'Cantidad de accidentes'})
+
+    por_dia = cubo.agrupar(['Nombre día'], ['Cantidad víctimas'], dropna=True)
+    por_dia = (por_dia.sort_values('Nombre día', key=lambda s: s.astype(object).map(DIAS_SEMANA.index))
+                      .reset_index(drop=True))
+    por_dia['Nombre día'] = por_dia['Nombre día'].astype(object)
+
+    por_hora = cubo.agrupar(['Hora entera'], ['Víctimas'], dropna=True)
+    por_hora.columns = ['Hora del día', 'Cantidad de accidentes']
+
+    categoria = (por_hora['Cantidad de accidentes']
+                 .groupby(crea_categoria_momento_dia_serie(por_hora['Hora del día'].astype(int)).values)
+                 .sum())
+    por_categoria = categoria.rename_axis('Categoria tiempo').reset_index(name='Cantidad accidentes')
+    por_categoria = por_categoria.sort_values('Cantidad accidentes', ascending=False, kind='stable')
+
+    dias = cubo.agrupar(['Nombre día'], ['Víctimas'], dropna=True)
+    fin_de_semana = dias['Nombre día'].isin(['Sábado', 'Domingo']).map({True: 'Fin de Semana', False: 'Semana'})
+    por_tipo_dia = (dias['Víctimas'].groupby(fin_de_semana.values).sum()
+                    .rename_axis('Tipo de día').reset_index(name='Cantidad de accidentes')
+                    .sort_values('Cantidad de accidentes', ascending=False, kind='stable'))
+
+    anio_sexo = cubo.agrupar(['Año', 'Sexo'], ['Víctimas', 'Suma edad'], dropna=True)
+    anio_sexo['Edad promedio'] = anio_sexo['Suma edad'] / anio_sexo['Víctimas']
+    anio_sexo = anio_sexo.rename(columns={'Víctimas': 'Cantidad accidentes'}).drop(columns='Suma edad')
+
+    def por_sexo(dimension):
+        data = cubo.agrupar([dimension, 'Sexo'], ['Víctimas'], dropna=True).rename(columns={'Víctimas': 'Cantidad víctimas'})
+        return _con_porcentaje(data, 'Cantidad víctimas')
+
+    return {
+        'victimas_mensuales_por_anio': cubo.agrupar(['Año', 'Mes'], ['Cantidad víctimas'], dropna=True),
+        'accidentes_por_mes': por_mes,
+        'victimas_por_dia_semana': por_dia,
+        'accidentes_por_categoria_tiempo': _con_porcentaje(por_categoria.reset_index(drop=True),
+                                                           'Cantidad accidentes'),
+        'accidentes_por_hora_del_dia': por_hora,
+        'accidentes_semana_fin_de_semana': por_tipo_dia.reset_index(drop=True),
+        'accidentes_por_anio_y_sexo': anio_sexo,
+        'victimas_por_sexo': _conteo_cubo(cubo, 'Sexo', 'Cantidad víctimas'),
+        'victimas_por_rol_y_sexo': por_sexo('Rol'),
+        'victimas_por_victima_y_sexo': por_sexo('Víctima'),
+        'victimas_por_participantes': _conteo_cubo(cubo, 'Participantes', 'Cantidad víctimas'),
+        'acusados': _conteo_cubo(cubo, 'Acusado', 'Cantidad acusados'),
+        'victimas_por_tipo_de_calle': _conteo_cubo(cubo, 'Tipo de calle', 'Cantidad víctimas'),
+        'victimas_por_cruce': _conteo_cubo(cubo, 'Cruce', 'Cantidad víctimas'),
+    }
@@ -0,0 +1,176 @@
+"""
+Tablas cruzadas demográficas de víctimas: banda de edad, sexo, rol, vehículo y año.
+
+Cada dimensión se codifica como entero (las bandas de edad con pd.cut, mediante
+'agregaciones.bandas_de_edad') y cada fila se ubica en una celda del producto de todas las
+dimensiones. Un único np.bincount sobre (celda, edad) arma el histograma de edades de cada
+celda, del que salen sin volver a recorrer las filas:
+
+* los conteos y porcentajes de cualquier combinación de dimensiones, sumando celdas,
+* la edad media y los cuantiles de cada combinación, a partir del histograma acumulado.
+
+Las edades se redondean al entero más cercano. La memoria es proporcional al producto de
+las cantidades de valores de cada dimensión por el rango de edades, por lo que conviene no
+incluir dimensiones de alta cardinalidad como 'Calle'.
+"""
+import numpy as np
+import pandas as pd
+
+from agregaciones import BORDES_EDAD, bandas_de_edad
+
+DIMENSIONES_DEMOGRAFICAS = ['Rango edad', 'Sexo', 'Rol', 'Víctima', 'Año']
+
+CUANTILES = (0.25, 0.5, 0.75)
+
+
+def _codificar(serie):
+    """
+    Devuelve los códigos enteros de una Serie (-1 para nulos) y sus valores en orden.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(), serie.cat.categories
+    codigos, valores = pd.factorize(serie, sort=True)
+    return codigos, valores
+
+
+class TablaCruzada:
+    """
+    Histograma de edades por celda de un producto de dimensiones categóricas.
+
+    Parameters:
+        histograma (np.ndarray): Conteos con un eje por dimensión y un último eje de edades.
+        niveles (dict): Valores de cada dimensión, en el orden de sus ejes.
+        edad_minima (int): Edad correspondiente a la primera posición del eje de edades.
+    """
+
+    def __init__(self, histograma, niveles, edad_minima=0):
+        self.histograma = histograma
+        self.niveles = dict(niveles)
+        self.edad_minima = edad_minima
+
+    @property
+    def dimensiones(self):
+        return list(self.niveles)
+
+    @classmethod
+    def construir(cls, df, dimensiones=DIMENSIONES_DEMOGRAFICAS, bordes_edad=BORDES_EDAD):
+        """
+        Construye la tabla a partir del DataFrame de víctimas en una sola pasada.
+
+        Parameters:
+            df (pd.DataFrame): El DataFrame limpio de homicidios, con la columna 'Edad'.
+            dimensiones (list): Columnas de la tabla; 'Rango edad' se deriva de 'Edad' si no está.
+            bordes_edad (list): Bordes de las bandas de edad, por ejemplo [0, 24, 44, np.inf]
+                para las bandas '0-24', '25-44' y '45+'.
+
+        Returns:
+            TablaCruzada: La tabla construida.
+        """
+        edades = pd.to_numeric(df['Edad'], errors='coerce').to_numpy(dtype=float)
+        validas = ~np.isnan(edades)
+        codigos, niveles = [], {}
+        for dimension in dimensiones:
+            if dimension == 'Rango edad' and dimension not in df.columns:
+                serie = (df.derivadas['Rango edad'] if bordes_edad is BORDES_EDAD
+                         else bandas_de_edad(df['Edad'], bordes_edad))
+            else:
+                serie = df[dimension]
+            codigo, valores = _codificar(serie)
+            codigos.append(codigo)
+            niveles[dimension] = valores
+            validas &= codigo >= 0
+
+        edades = np.rint(edades[validas]).astype(np.int64)
+        edad_minima = int(edades.min()) if len(edades) else 0
+        cantidad_edades = int(edades.max()) - edad_minima + 1 if len(edades) else 1
+        forma = tuple(len(valores) for valores in niveles.values())
+
+        celdas = np.ravel_multi_index([codigo[validas] for codigo in codigos], forma) if forma else 0
+        conteos = np.bincount(celdas * cantidad_edades + edades - edad_minima,
+                              minlength=int(np.prod(forma, dtype=np.int64)) * cantidad_edades)
+        return cls(conteos.reshape(forma + (cantidad_edades,)), niveles, edad_minima)
+
+    def _marginal(self, dimensiones):
+        """
+        Suma los ejes de las dimensiones no pedidas y devuelve el histograma como (celdas, edades).
+        """
+        dimensiones = list(dimensiones)
+        faltantes = [d for d in dimensiones if d not in self.niveles]
+        if faltantes:
+            raise KeyError(f'Dimensiones que no están en la tabla: {faltantes}')
+        ejes = [self.dimensiones.index(d) for d in dimensiones]
+        otros = tuple(i for i in range(len(self.niveles)) if i not in ejes)
+        marginal = self.histograma.sum(axis=otros)
+        # Tras sumar, los ejes conservados quedan en su orden original; se llevan al pedido
+        orden = sorted(ejes)
+        marginal = np.moveaxis(marginal, [orden.index(e) for e in ejes], list(range(len(ejes))))
+        return marginal.reshape(-1, marginal.shape[-1])
+
+    def _indice(self, dimensiones):
+        if not dimensiones:
+            return pd.Index(['Total'])
+        return pd.MultiIndex.from_product([self.niveles[d] for d in dimensiones], names=list(dimensiones))
+
+    def conteos(self, dimensiones, dentro_de=None, completas=False):
+        """
+        Cuenta las víctimas de cada combinación de dimensiones, con su porcentaje.
+
+        Parameters:
+            dimensiones (list): Dimensiones de la tabla resultante.
+            dentro_de (list, opcional): Subconjunto de 'dimensiones' dentro del cual se calculan
+                los porcentajes. Por ejemplo, con dimensiones ['Rango edad', 'Sexo'] y
+                dentro_de ['Rango edad'], el porcentaje de cada sexo dentro de cada banda.
+                Por defecto, los porcentajes son sobre el total.
+            completas (bool): Si es True, se incluyen las combinaciones sin víctimas.
+
+        Returns:
+            pd.DataFrame: Columnas de las dimensiones, 'Cantidad víctimas' y 'Porcentaje'.
+        """
+        cantidades = self._marginal(dimensiones).sum(axis=1)
+        tabla = pd.DataFrame({'Cantidad víctimas': cantidades}, index=self._indice(dimensiones))
+        if dentro_de:
+            totales = tabla.groupby(level=list(dentro_de), observed=True)['Cantidad víctimas'].transform('sum')
+        else:
+            totales = cantidades.sum()
+        tabla['Porcentaje'] = tabla['Cantidad víctimas'] / np.where(totales == 0, np.nan, totales) * 100
+        if not completas:
+            tabla = tabla[tabla['Cantidad víctimas'] > 0]
+        return tabla.reset_index(drop=not dimensiones)
+
+    def estadisticas_edad(self, dimensiones, cuantiles=CUANTILES, completas=False):
+        """
+        Calcula la cantidad, la edad media y los cuantiles de edad de cada combinación.
+
+        Los cuantiles usan la interpolación lineal de pd.Series.quantile, por lo que coinciden
+        con los calculados sobre las filas.
+
+        Parameters:
+            dimensiones (list): Dimensiones de la tabla resultante; vacía para el total.
+            cuantiles (tuple): Cuantiles a calcular, entre 0 y 1.
+            completas (bool): Si es True, se incluyen las combinaciones sin víctimas.
+
+        Returns:
+            pd.DataFrame: Columnas de las dimensiones, 'Cantidad víctimas', 'Edad media' y
+                una columna por cuantil ('Q25', 'Q50', ...).
+        """
+        histograma = self._marginal(dimensiones)
+        edades = np.arange(histograma.shape[1]) + self.edad_minima
+        cantidades = histograma.sum(axis=1)
+        con_datos = np.where(cantidades == 0, np.nan, cantidades)
+        tabla = pd.DataFrame({'Cantidad víctimas': cantidades,
+                              'Edad media': histograma @ edades / con_datos},
+                             index=self._indice(dimensiones))
+
+        acumulado = histograma.cumsum(axis=1)
+        for q in cuantiles:
+            # Posición (n - 1) * q en las edades ordenadas: el valor de la posición k es la
+            # primera edad cuyo acumulado supera k
+            posicion = (cantidades - 1) * q
+            inferior = np.floor(posicion)
+            valor_inferior = edades[np.minimum((acumulado <= inferior[:, np.newaxis]).sum(axis=1), len(edades) - 1)]
+            valor_superior = edades[np.minimum((acumulado <= inferior[:, np.newaxis] + 1).sum(axis=1), len(edades) - 1)]
+            valor = valor_inferior + (posicion - inferior) * (valor_superior - valor_inferior)
+            tabla[f'Q{round(q * 100)}'] = np.where(cantidades > 0, valor, np.nan)
+        if not completas:
+            tabla = tabla[tabla['Cantidad víctimas'] > 0]
+        return tabla.reset_index(drop=not dimensiones)
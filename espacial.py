@@ -0,0 +1,181 @@
+"""
+Índice espacial sobre las coordenadas proyectadas 'XY (CABA)' de los hechos.
+
+Las coordenadas se parsean una sola vez a arrays de float (en metros) y se indexan en
+una grilla regular: los puntos se ordenan por celda, de modo que cada fila de celdas de
+una consulta es un rango contiguo que se ubica con búsqueda binaria. Sobre el índice se
+resuelven consultas por radio, k vecinos más cercanos y densidad por celda (hotspots).
+"""
+import numpy as np
+import pandas as pd
+
+TAMAÑO_CELDA = 250.0
+
+
+def parsear_xy(serie):
+    """
+    Convierte una Serie de textos 'Point (x y)' en dos arrays de coordenadas.
+
+    Los valores sin coordenadas ('Point (. .)', 0, 'Point (0 0)' o nulos) quedan como NaN.
+
+    Parameters:
+        serie (pd.Series): La columna 'XY (CABA)'.
+
+    Returns:
+        tuple: Los arrays x e y en metros.
+    """
+    coordenadas = serie.astype(str).str.extract(r'Point \(([-\d.]+) ([-\d.]+)\)')
+    # copy=True: con pandas 3 to_numpy puede devolver una vista de solo lectura
+    x = pd.to_numeric(coordenadas[0], errors='coerce').to_numpy(dtype=float, copy=True)
+    y = pd.to_numeric(coordenadas[1], errors='coerce').to_numpy(dtype=float, copy=True)
+    # La limpieza guarda las coordenadas faltantes como 0
+    faltantes = (x == 0) & (y == 0)
+    x[faltantes], y[faltantes] = np.nan, np.nan
+    return x, y
+
+
+class IndiceGrilla:
+    """
+    Índice de grilla regular sobre un conjunto de puntos.
+
+    Las consultas devuelven posiciones en los arrays originales, por lo que pueden usarse
+    directamente con df.iloc. Los puntos con coordenadas NaN no se indexan.
+
+    Parameters:
+        x (np.ndarray): Coordenadas x en metros.
+        y (np.ndarray): Coordenadas y en metros.
+        tamaño_celda (float): Lado de cada celda de la grilla en metros.
+    """
+
+    def __init__(self, x, y, tamaño_celda=TAMAÑO_CELDA):
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.tamaño_celda = float(tamaño_celda)
+
+        validos = np.flatnonzero(~(np.isnan(self.x) | np.isnan(self.y)))
+        self.x0 = self.x[validos].min()
+        self.y0 = self.y[validos].min()
+        cx, cy = self._celda(self.x[validos], self.y[validos])
+        self.columnas = int(cx.max()) + 1
+        self.filas = int(cy.max()) + 1
+
+        celdas = cy * self.columnas + cx
+        orden = np.argsort(celdas, kind='stable')
+        self._celdas = celdas[orden]
+        self._posiciones = validos[orden]
+
+    def _celda(self, x, y):
+        cx = np.floor((x - self.x0) / self.tamaño_celda).astype(np.int64)
+        cy = np.floor((y - self.y0) / self.tamaño_celda).astype(np.int64)
+        return cx, cy
+
+    def _candidatos(self, x, y, radio):
+        """
+        Posiciones de los puntos en las celdas que tocan el cuadrado de lado 2 * radio.
+        """
+        cx_min, cy_min = self._celda(x - radio, y - radio)
+        cx_max, cy_max = self._celda(x + radio, y + radio)
+        cx_min, cx_max = max(cx_min, 0), min(cx_max, self.columnas - 1)
+        cy_min, cy_max = max(cy_min, 0), min(cy_max, self.filas - 1)
+        if cx_min > cx_max or cy_min > cy_max:
+            return np.empty(0, dtype=np.int64)
+
+        # Cada fila de celdas es un rango contiguo en el orden por celda
+        filas = np.arange(cy_min, cy_max + 1) * self.columnas
+        inicios = np.searchsorted(self._celdas, filas + cx_min, side='left')
+        fines = np.searchsorted(self._celdas, filas + cx_max, side='right')
+        return np.concatenate([self._posiciones[i:f] for i, f in zip(inicios, fines)])
+
+    def en_radio(self, x, y, radio):
+        """
+        Devuelve los puntos a una distancia menor o igual a 'radio' metros de (x, y).
+
+        Parameters:
+            x (float): Coordenada x del centro.
+            y (float): Coordenada y del centro.
+            radio (float): Radio en metros.
+
+        Returns:
+            np.ndarray: Posiciones de los puntos, ordenadas.
+        """
+        candidatos = self._candidatos(x, y, radio)
+        distancia2 = (self.x[candidatos] - x) ** 2 + (self.y[candidatos] - y) ** 2
+        return np.sort(candidatos[distancia2 <= radio ** 2])
+
+    def vecinos(self, x, y, k):
+        """
+        Devuelve los k puntos más cercanos a (x, y).
+
+        Se busca en un radio que se agranda hasta contener k puntos y luego se verifica con el
+        radio exacto del k-ésimo vecino, para no perder puntos de celdas no revisadas.
+
+        Parameters:
+            x (float): Coordenada x de la consulta.
+            y (float): Coordenada y de la consulta.
+            k (int): Cantidad de vecinos.
+
+        Returns:
+            tuple: Las posiciones de los vecinos y sus distancias en metros, de menor a mayor.
+        """
+        k = min(k, len(self._posiciones))
+        radio = self.tamaño_celda
+        # Con este radio el cuadrado de búsqueda cubre toda la grilla
+        alcance = max(abs(x - self.x0), abs(x - self.x0 - self.columnas * self.tamaño_celda),
+                      abs(y - self.y0), abs(y - self.y0 - self.filas * self.tamaño_celda))
+        while True:
+            candidatos = self._candidatos(x, y, radio)
+            if len(candidatos) >= k or radio >= alcance:
+                break
+            radio *= 2
+
+        distancias = np.hypot(self.x[candidatos] - x, self.y[candidatos] - y)
+        radio_k = np.partition(distancias, k - 1)[k - 1]
+        if radio_k > radio:
+            candidatos = self._candidatos(x, y, radio_k)
+            distancias = np.hypot(self.x[candidatos] - x, self.y[candidatos] - y)
+
+        orden = np.argsort(distancias, kind='stable')[:k]
+        return candidatos[orden], distancias[orden]
+
+    def densidad(self):
+        """
+        Cuenta los puntos de cada celda ocupada de la grilla.
+
+        Returns:
+            pd.DataFrame: Una fila por celda con su centro ('X', 'Y') y la 'Cantidad' de puntos.
+        """
+        celdas, cantidades = np.unique(self._celdas, return_counts=True)
+        cx, cy = celdas % self.columnas, celdas // self.columnas
+        return pd.DataFrame({
+            'X': self.x0 + (cx + 0.5) * self.tamaño_celda,
+            'Y': self.y0 + (cy + 0.5) * self.tamaño_celda,
+            'Cantidad': cantidades,
+        })
+
+    def hotspots(self, n=10):
+        """
+        Devuelve las n celdas con más puntos.
+
+        Parameters:
+            n (int): Cantidad de celdas a devolver.
+
+        Returns:
+            pd.DataFrame: Las celdas con mayor densidad, de mayor a menor.
+        """
+        return self.densidad().nlargest(n, 'Cantidad').reset_index(drop=True)
+
+
+def indice_desde_df(df, columna='XY (CABA)', tamaño_celda=TAMAÑO_CELDA):
+    """
+    Construye el índice de grilla a partir de la columna de coordenadas del DataFrame.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame limpio de homicidios.
+        columna (str): La columna con textos 'Point (x y)'.
+        tamaño_celda (float): Lado de cada celda de la grilla en metros.
+
+    Returns:
+        IndiceGrilla: El índice, cuyas posiciones corresponden a las filas de df.
+    """
+    x, y = parsear_xy(df[columna])
+    return IndiceGrilla(x, y, tamaño_celda)
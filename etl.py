@@ -0,0 +1,504 @@
+"""
+ETL incremental de 'Data/homicidios.xlsx' a 'Data/homicidios_limpio.csv'.
+
+Reproduce la limpieza de EDA_Parte_1.ipynb, pero en cada ejecución solo procesa los
+hechos ('Id') nuevos o modificados. Las estadísticas de imputación (hora más común,
+edad promedio por sexo y valores más frecuentes) se mantienen como estado acumulado
+en un archivo JSON junto al archivo limpio, por lo que no se recalculan sobre toda la
+historia.
+"""
+import hashlib
+import json
+import os
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+import validacion
+from compactacion import compactar, expandir
+from instrumentacion import Etapa
+from Utils import convertir_serie_a_time
+
+RUTA_FUENTE = './Data/homicidios.xlsx'
+RUTA_LIMPIO = 'Data/homicidios_limpio.csv'
+HOJAS = ['HECHOS', 'VICTIMAS']
+
+COLUMNAS_HECHOS = {'Id': 'Id', 'N victimas': 'Cantidad víctimas', 'Aaaa': 'Año', 'Mm': 'Mes',
+                   'Dd': 'Día', 'Hh': 'Hora entera', 'Dirección normalizada': 'Dirección normalizada',
+                   'Xy (caba)': 'XY (CABA)', 'Victima': 'Víctima'}
+COLUMNAS_VICTIMAS = {'Id hecho': 'Id', 'Aaaa': 'Año', 'Mm': 'Mes', 'Dd': 'Día', 'Victima': 'Víctima'}
+
+
+def normalizar_columnas(dataframe, renombres):
+    """
+    Estandariza los nombres de las columnas: primera letra en mayúscula y espacios en lugar de guiones.
+
+    Parameters:
+        dataframe (pd.DataFrame): El DataFrame a normalizar.
+        renombres (dict): Renombres específicos a aplicar luego de la estandarización.
+
+    Returns:
+        pd.DataFrame: Un DataFrame con las columnas normalizadas.
+    """
+    columnas = [str(x).capitalize().replace('_', ' ') for x in dataframe.columns]
+    return dataframe.set_axis(columnas, axis=1).rename(columns=renombres)
+
+
+def _moda(contador):
+    """
+    Devuelve el valor más frecuente de un Counter; ante empates, el menor, igual que Series.mode().
+    """
+    maximo = max(contador.values())
+    return min(valor for valor, cantidad in contador.items() if cantidad == maximo)
+
+
+class EstadoETL:
+    """
+    Estado acumulado del ETL: huella de cada hecho procesado y estadísticas de imputación.
+
+    Cada hecho registra su aporte a las estadísticas, de modo que si el hecho cambia en
+    la fuente su aporte anterior se descuenta antes de sumar el nuevo.
+    """
+
+    def __init__(self):
+        self.huellas = {}
+        self.aportes = {}
+        self.horas = Counter()
+        self.sexos = Counter()
+        self.roles = Counter()
+        self.edades = {}
+
+    @classmethod
+    def cargar(cls, ruta):
+        """
+        Carga el estado desde un archivo JSON; si el archivo no existe, devuelve un estado vacío.
+        """
+        estado = cls()
+        if not os.path.exists(ruta):
+            return estado
+
+        with open(ruta, encoding='utf-8') as archivo:
+            datos = json.load(archivo)
+        estado.huellas = datos['huellas']
+        estado.aportes = datos['aportes']
+        estado.horas = Counter(datos['horas'])
+        estado.sexos = Counter(datos['sexos'])
+        estado.roles = Counter(datos['roles'])
+        estado.edades = {sexo: tuple(valores) for sexo, valores in datos['edades'].items()}
+        return estado
+
+    def guardar(self, ruta):
+        """
+        Guarda el estado en un archivo JSON, reemplazando el anterior de forma atómica.
+        """
+        datos = {'huellas': self.huellas, 'aportes': self.aportes, 'horas': self.horas,
+                 'sexos': self.sexos, 'roles': self.roles, 'edades': self.edades}
+        temporal = ruta + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump(datos, archivo, ensure_ascii=False)
+        os.replace(temporal, ruta)
+
+    def _acumular(self, aporte, signo):
+        if aporte['hora'] is not None:
+            self.horas[aporte['hora']] += signo
+        for sexo, rol in aporte['categorias']:
+            self.sexos[sexo] += signo
+            self.roles[rol] += signo
+        for sexo, edad in aporte['edades']:
+            suma, cantidad = self.edades.get(sexo, (0, 0))
+            self.edades[sexo] = (suma + signo * edad, cantidad + signo)
+
+    def podar(self):
+        """
+        Descarta los contadores que quedaron en cero; basta con hacerlo una vez por lote.
+        """
+        self.horas, self.sexos, self.roles = +self.horas, +self.sexos, +self.roles
+
+    def retirar(self, id_hecho):
+        """
+        Descuenta de las estadísticas el aporte de un hecho y olvida su huella.
+        """
+        aporte = self.aportes.pop(id_hecho, None)
+        self.huellas.pop(id_hecho, None)
+        if aporte is not None:
+            self._acumular(aporte, -1)
+
+    def registrar(self, id_hecho, huella, aporte):
+        """
+        Suma a las estadísticas el aporte de un hecho y guarda su huella.
+        """
+        self.huellas[id_hecho] = huella
+        self.aportes[id_hecho] = aporte
+        self._acumular(aporte, 1)
+
+    def registrar_lote(self, huellas, aportes, conteos):
+        """
+        Guarda las huellas y los aportes de un lote de hechos y suma sus conteos ya agregados.
+
+        Parameters:
+            huellas (dict): Huella de cada 'Id' del lote.
+            aportes (dict): Aporte de cada 'Id', como los devuelve '_aportes'.
+            conteos (dict): Los Counter 'horas', 'sexos' y 'roles' del lote completo.
+        """
+        self.huellas.update(huellas)
+        self.aportes.update(aportes)
+        self.horas.update(conteos['horas'])
+        self.sexos.update(conteos['sexos'])
+        self.roles.update(conteos['roles'])
+
+    def registrar_edad(self, id_hecho, sexo, edad):
+        """
+        Suma la edad conocida de una víctima del hecho al promedio de su sexo.
+        """
+        self.aportes[id_hecho]['edades'].append((sexo, edad))
+        self._acumular({'hora': None, 'categorias': [], 'edades': [(sexo, edad)]}, 1)
+
+    def registrar_edades(self, ids, sexos, edades):
+        """
+        Suma las edades conocidas de un lote de víctimas a los aportes de sus hechos y a los
+        promedios por sexo, agregándolas por 'Id' y por sexo en lugar de víctima por víctima.
+
+        Parameters:
+            ids (pd.Series): 'Id' del hecho de cada víctima, ya registrado en el estado.
+            sexos (pd.Series): Sexo ya imputado de cada víctima.
+            edades (pd.Series): Edad de cada víctima, sin valores faltantes.
+        """
+        pares = list(zip(sexos.tolist(), edades.astype(float).tolist()))
+        for id_hecho, lista in _listas_por_id(ids, pares).items():
+            self.aportes[id_hecho]['edades'].extend(lista)
+        por_sexo = edades.astype(float).groupby(sexos.to_numpy(), sort=False).agg(['sum', 'count'])
+        for sexo, suma, cantidad in por_sexo.itertuples():
+            suma_previa, cantidad_previa = self.edades.get(sexo, (0, 0))
+            self.edades[sexo] = (suma_previa + suma, cantidad_previa + int(cantidad))
+
+    @property
+    def hora_moda(self):
+        return pd.Timestamp(_moda(self.horas)).time()
+
+    @property
+    def sexo_moda(self):
+        return _moda(self.sexos)
+
+    @property
+    def rol_moda(self):
+        return _moda(self.roles)
+
+    def edad_promedio(self, sexo):
+        suma, cantidad = self.edades[sexo]
+        return suma / cantidad
+
+
+def _sha256(ruta):
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(1 << 20), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def leer_excel_cacheado(ruta, hojas=HOJAS, directorio_cache=None):
+    """
+    Lee varias hojas de un Excel en una sola pasada y guarda el resultado en una caché binaria.
+
+    La caché se valida primero por fecha de modificación y tamaño del archivo; si alguno
+    cambió, se compara el hash SHA-256 del contenido, de modo que un archivo solo tocado
+    tampoco se vuelve a parsear. Solo se lee el XLSX cuando su contenido cambió.
+
+    Parameters:
+        ruta (str): Ruta al archivo Excel.
+        hojas (list): Nombres de las hojas a leer.
+        directorio_cache (str, opcional): Directorio donde se guardan los DataFrames ya parseados.
+            Por defecto, '.cache' junto al archivo Excel.
+
+    Returns:
+        dict: Un diccionario con un DataFrame por hoja.
+    """
+    if directorio_cache is None:
+        directorio_cache = os.path.join(os.path.dirname(ruta), '.cache')
+    os.makedirs(directorio_cache, exist_ok=True)
+    nombre = os.path.splitext(os.path.basename(ruta))[0]
+    ruta_datos = os.path.join(directorio_cache, nombre + '.pkl')
+    ruta_meta = os.path.join(directorio_cache, nombre + '.json')
+
+    info = os.stat(ruta)
+    meta = {}
+    if os.path.exists(ruta_meta) and os.path.exists(ruta_datos):
+        with open(ruta_meta, encoding='utf-8') as archivo:
+            meta = json.load(archivo)
+
+    vigente = meta.get('ruta') == os.path.abspath(ruta) and meta.get('hojas') == list(hojas)
+    if vigente and (meta['mtime_ns'], meta['tamaño']) == (info.st_mtime_ns, info.st_size):
+        return pd.read_pickle(ruta_datos)
+
+    sha256 = _sha256(ruta)
+    if vigente and meta['sha256'] == sha256:
+        frames = pd.read_pickle(ruta_datos)
+    else:
+        frames = pd.read_excel(ruta, sheet_name=list(hojas))
+        pd.to_pickle(frames, ruta_datos + '.tmp')
+        os.replace(ruta_datos + '.tmp', ruta_datos)
+
+    meta = {'ruta': os.path.abspath(ruta), 'hojas': list(hojas), 'sha256': sha256,
+            'mtime_ns': info.st_mtime_ns, 'tamaño': info.st_size}
+    with open(ruta_meta, 'w', encoding='utf-8') as archivo:
+        json.dump(meta, archivo, ensure_ascii=False)
+    return frames
+
+
+def leer_fuente(ruta=RUTA_FUENTE, cache=True):
+    """
+    Lee las hojas HECHOS y VICTIMAS del Excel fuente y normaliza sus columnas.
+
+    Parameters:
+        ruta (str): Ruta al archivo Excel.
+        cache (bool): Si es True, reutiliza los DataFrames ya parseados mientras el Excel no cambie.
+
+    Returns:
+        tuple: Los DataFrames de hechos y de víctimas.
+    """
+    if cache:
+        hojas = leer_excel_cacheado(ruta)
+    else:
+        hojas = pd.read_excel(ruta, sheet_name=HOJAS)
+    hechos = normalizar_columnas(hojas['HECHOS'], COLUMNAS_HECHOS)
+    victimas = normalizar_columnas(hojas['VICTIMAS'], COLUMNAS_VICTIMAS)
+    return hechos, victimas
+
+
+def calcular_huellas(hechos, victimas):
+    """
+    Calcula una huella por 'Id' a partir de la fila del hecho y de las filas de sus víctimas.
+
+    Parameters:
+        hechos (pd.DataFrame): Hechos con las columnas normalizadas.
+        victimas (pd.DataFrame): Víctimas con las columnas normalizadas.
+
+    Returns:
+        pd.Series: Huella en hexadecimal indexada por 'Id'.
+    """
+    huella_hechos = pd.Series(pd.util.hash_pandas_object(hechos.astype(str), index=False).to_numpy(),
+                              index=hechos['Id'])
+    huella_victimas = (pd.Series(pd.util.hash_pandas_object(victimas.astype(str), index=False).to_numpy(),
+                                 index=victimas['Id'])
+                       .groupby(level=0).sum())
+    huellas = huella_hechos.groupby(level=0).sum().add(huella_victimas, fill_value=0).astype(np.uint64)
+    return huellas.map('{:016x}'.format)
+
+
+def _listas_por_id(ids, valores):
+    """
+    Agrupa los valores en una lista por 'Id', en el orden original, con un único ordenamiento
+    estable en lugar de una agregación de Python por grupo.
+
+    Returns:
+        dict: La lista de valores de cada 'Id', en el orden de aparición de los 'Id'.
+    """
+    codigos, unicos = pd.factorize(np.asarray(ids))
+    orden = np.argsort(codigos, kind='stable')
+    fines = np.cumsum(np.bincount(codigos, minlength=len(unicos))).tolist()
+    ordenados = [valores[i] for i in orden.tolist()]
+    return {id_hecho: ordenados[inicio:fin] for id_hecho, inicio, fin in zip(unicos, [0] + fines[:-1], fines)}
+
+
+def _aportes(hechos, victimas):
+    """
+    Extrae el aporte de cada hecho a las estadísticas de imputación a partir de los datos sin
+    imputar, agrupando las víctimas por 'Id', y los conteos de horas, sexos y roles del lote.
+    """
+    # str(time) da 'HH:MM:SS', como strftime, sin recorrer las horas en Python
+    horas = hechos['Hora'].to_numpy(dtype=object, copy=True)
+    faltantes = pd.isna(horas)
+    horas[~faltantes] = horas[~faltantes].astype(str)
+    horas[faltantes] = None
+    horas = pd.Series(horas, index=hechos['Id'].to_numpy(), dtype=object)
+    categorias = _listas_por_id(victimas['Id'], list(zip(victimas['Sexo'].tolist(), victimas['Rol'].tolist())))
+
+    aportes = {id_hecho: {'hora': hora, 'categorias': categorias.get(id_hecho, []), 'edades': []}
+               for id_hecho, hora in horas.items()}
+    for id_hecho in categorias.keys() - aportes.keys():
+        aportes[id_hecho] = {'hora': None, 'categorias': categorias[id_hecho], 'edades': []}
+
+    # Si un 'Id' se repite entre los hechos, cuenta su última hora, como al registrarlo
+    horas = horas[~horas.index.duplicated(keep='last')].dropna()
+    conteos = {'horas': Counter(horas.value_counts().to_dict()),
+               'sexos': Counter(victimas['Sexo'].value_counts(dropna=False).to_dict()),
+               'roles': Counter(victimas['Rol'].value_counts(dropna=False).to_dict())}
+    return aportes, conteos
+
+
+def limpiar_hechos(hechos, estado):
+    """
+    Aplica a los hechos la limpieza de EDA_Parte_1.ipynb usando las estadísticas del estado.
+
+    Parameters:
+        hechos (pd.DataFrame): Hechos con las columnas normalizadas y la hora ya convertida a time.
+        estado (EstadoETL): Estado con las estadísticas de imputación actualizadas.
+
+    Returns:
+        pd.DataFrame: Los hechos limpios.
+    """
+    hechos = hechos.drop(columns='Altura')
+    hora_moda = estado.hora_moda
+
+    hechos['Hora'] = hechos['Hora'].where(hechos['Hora'].notna(), hora_moda)
+    hechos['Hora entera'] = hechos['Hora entera'].replace('SD', hora_moda.hour)
+    hechos['Cruce'] = np.where(hechos['Cruce'].isna(), 'NO', 'SI')
+    hechos['Calle'] = hechos['Calle'].fillna('SD')
+    hechos['Dirección normalizada'] = hechos['Dirección normalizada'].fillna('SD')
+    hechos['Víctima'] = hechos['Víctima'].replace({'OBJETO FIJO': 'OTRO', 'PEATON_MOTO': 'OTRO'})
+    hechos['Pos x'] = hechos['Pos x'].replace('.', 0)
+    hechos['Pos y'] = hechos['Pos y'].replace('.', 0)
+    hechos['XY (CABA)'] = hechos['XY (CABA)'].replace('Point (. .)', 0)
+    return hechos
+
+
+def limpiar_victimas(victimas, estado):
+    """
+    Aplica a las víctimas la limpieza de EDA_Parte_1.ipynb usando las estadísticas del estado.
+
+    Parameters:
+        victimas (pd.DataFrame): Víctimas con las columnas normalizadas.
+        estado (EstadoETL): Estado con las estadísticas de imputación actualizadas.
+
+    Returns:
+        pd.DataFrame: Las víctimas limpias, con las columnas 'Id', 'Rol', 'Sexo' y 'Edad'.
+    """
+    victimas = victimas[['Id', 'Rol', 'Sexo', 'Edad']].copy()
+    victimas['Sexo'] = victimas['Sexo'].replace('SD', estado.sexo_moda)
+    victimas['Rol'] = victimas['Rol'].replace('SD', estado.rol_moda)
+
+    edad = pd.to_numeric(victimas['Edad'].replace('SD', np.nan))
+    promedio = victimas['Sexo'].map(estado.edad_promedio)
+    victimas['Edad'] = edad.fillna(promedio).astype(int)
+    return victimas
+
+
+def limpiar_lote(hechos, victimas, huellas, estado, retirados=()):
+    """
+    Actualiza el estado con un lote de hechos y devuelve sus hechos y víctimas limpios.
+
+    Parameters:
+        hechos (pd.DataFrame): Hechos del lote con las columnas normalizadas.
+        victimas (pd.DataFrame): Víctimas de esos hechos con las columnas normalizadas.
+        huellas (pd.Series): Huella de cada 'Id', como la devuelve calcular_huellas.
+        estado (EstadoETL): Estado a actualizar con los aportes del lote.
+        retirados (list): 'Id' modificados o eliminados cuyo aporte anterior se descuenta.
+
+    Returns:
+        tuple: Los DataFrames de hechos y de víctimas limpios, sin unir.
+    """
+    hechos = hechos.copy()
+    victimas = victimas.copy()
+    hechos['Hora'] = convertir_serie_a_time(hechos['Hora'])
+
+    # Se actualizan las estadísticas antes de imputar, con los valores sin imputar del lote
+    for id_hecho in retirados:
+        estado.retirar(id_hecho)
+    aportes, conteos = _aportes(hechos, victimas)
+    estado.registrar_lote(huellas.reindex(list(aportes)).to_dict(), aportes, conteos)
+    estado.podar()
+
+    # La edad promedio se calcula por sexo ya imputado, como en la limpieza original
+    sexo = victimas['Sexo'].replace('SD', estado.sexo_moda)
+    edad = pd.to_numeric(victimas['Edad'].replace('SD', np.nan))
+    conocidas = edad.notna()
+    estado.registrar_edades(victimas['Id'][conocidas], sexo[conocidas], edad[conocidas])
+
+    return limpiar_hechos(hechos, estado), limpiar_victimas(victimas, estado)
+
+
+def _indice_limpio(ruta_limpio):
+    """
+    Devuelve los 'Id' presentes en el CSV limpio y sus columnas, sin leer el resto del archivo.
+    """
+    if not os.path.exists(ruta_limpio):
+        return set(), None
+    columnas = list(pd.read_csv(ruta_limpio, nrows=0).columns)
+    return set(pd.read_csv(ruta_limpio, usecols=['Id'])['Id']), columnas
+
+
+def ejecutar_etl(ruta_fuente=RUTA_FUENTE, ruta_limpio=RUTA_LIMPIO, ruta_estado=None, completo=False, cache=True,
+                 validar=True):
+    """
+    Actualiza el archivo limpio procesando solo los hechos nuevos o modificados en la fuente.
+
+    Los hechos nuevos se agregan al final del archivo limpio; si hay hechos modificados o
+    eliminados, el archivo se reescribe reemplazando sus filas. El estado se guarda recién
+    después de escribir el archivo limpio, por lo que una ejecución interrumpida se retoma
+    volviendo a procesar los mismos hechos.
+
+    Parameters:
+        ruta_fuente (str): Ruta al Excel con las hojas HECHOS y VICTIMAS.
+        ruta_limpio (str): Ruta al CSV limpio.
+        ruta_estado (str, opcional): Ruta al JSON de estado. Por defecto, junto al CSV limpio.
+        completo (bool): Si es True, descarta el estado y reprocesa toda la fuente.
+        cache (bool): Si es True, evita parsear el Excel cuando no cambió desde la última lectura.
+        validar (bool): Si es True, el lote se valida con 'validacion.REGLAS_FUENTE' antes de
+            limpiarlo y con 'validacion.REGLAS_LIMPIO' después de compactarlo; si alguna regla
+            de error no se cumple, se lanza validacion.ErrorValidacion sin escribir nada.
+
+    Returns:
+        dict: La cantidad de hechos nuevos, modificados y eliminados y, si hubo lote, la memoria
+            en bytes del lote antes y después de compactarlo ('memoria_antes', 'memoria_despues')
+            y, si se validó, la cantidad de violaciones de reglas de aviso ('avisos').
+    """
+    if ruta_estado is None:
+        ruta_estado = os.path.splitext(ruta_limpio)[0] + '.estado.json'
+    estado = EstadoETL() if completo else EstadoETL.cargar(ruta_estado)
+
+    with Etapa('etl.leer_fuente') as etapa:
+        hechos, victimas = leer_fuente(ruta_fuente, cache)
+        etapa.salida(victimas)
+    with Etapa('etl.calcular_huellas', victimas) as etapa:
+        huellas = etapa.salida(calcular_huellas(hechos, victimas))
+
+    nuevos = [i for i in huellas.index if i not in estado.huellas]
+    modificados = [i for i in huellas.index if i in estado.huellas and estado.huellas[i] != huellas[i]]
+    eliminados = [i for i in estado.huellas if i not in huellas.index]
+    resumen = {'nuevos': len(nuevos), 'modificados': len(modificados), 'eliminados': len(eliminados)}
+
+    a_procesar = set(nuevos) | set(modificados)
+    if not a_procesar and not eliminados and not completo:
+        return resumen
+
+    hechos_lote = hechos[hechos['Id'].isin(a_procesar)]
+    victimas_lote = victimas[victimas['Id'].isin(a_procesar)]
+    if validar:
+        with Etapa('etl.validar_fuente', victimas_lote):
+            resultado_fuente = validacion.validar({'hechos': hechos_lote, 'victimas': victimas_lote}).exigir()
+    with Etapa('etl.limpiar_lote', victimas_lote) as etapa:
+        hechos_limpios, victimas_limpias = limpiar_lote(hechos_lote, victimas_lote,
+                                                        huellas, estado, retirados=modificados + eliminados)
+        etapa.salida(victimas_limpias)
+    with Etapa('etl.merge', victimas_limpias) as etapa:
+        lote = etapa.salida(victimas_limpias.merge(hechos_limpios, on='Id', how='left'))
+    with Etapa('etl.compactar', lote) as etapa:
+        compacto = etapa.salida(compactar(lote))
+    if validar:
+        with Etapa('etl.validar_limpio', compacto):
+            resultado_limpio = validacion.validar({'limpio': compacto}, validacion.REGLAS_LIMPIO).exigir()
+        reglas = pd.concat([resultado_fuente.resumen, resultado_limpio.resumen])
+        resumen['avisos'] = int(reglas.loc[reglas['Severidad'] == 'aviso', 'Violaciones'].sum())
+    resumen['memoria_antes'] = int(lote.memory_usage(deep=True).sum())
+    resumen['memoria_despues'] = int(compacto.memory_usage(deep=True).sum())
+    # En el CSV 'Id', 'XY (CABA)' y la hora ('HH:MM:SS') se siguen escribiendo como texto
+    lote = expandir(compacto)
+
+    with Etapa('etl.escritura', lote):
+        existentes, columnas = (set(), None) if completo else _indice_limpio(ruta_limpio)
+        reemplazados = existentes & (a_procesar | set(eliminados))
+        if existentes and not reemplazados and columnas == list(lote.columns):
+            lote.to_csv(ruta_limpio, mode='a', header=False, index=False, encoding='utf-8')
+        else:
+            limpio = lote
+            if existentes - reemplazados:
+                previo = pd.read_csv(ruta_limpio, usecols=list(lote.columns))[list(lote.columns)]
+                limpio = pd.concat([previo[~previo['Id'].isin(reemplazados)], lote], ignore_index=True)
+                limpio = limpio.sort_values('Id', kind='stable')
+            temporal = ruta_limpio + '.tmp'
+            limpio.to_csv(temporal, index=False, encoding='utf-8')
+            os.replace(temporal, ruta_limpio)
+
+    estado.guardar(ruta_estado)
+    return resumen
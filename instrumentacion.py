@@ -0,0 +1,314 @@
+"""
+Instrumentación opcional de las etapas del pipeline: tiempo, filas y memoria máxima.
+
+Las funciones públicas de 'Utils' están envueltas con 'instrumentado' y los pasos del ETL
+con el contexto 'Etapa'. Mientras la instrumentación no se active, cada envoltura solo
+comprueba una bandera y llama a la función original. Al activarla, cada llamada registra:
+
+* el tiempo de reloj,
+* las filas de entrada (del primer DataFrame o Serie recibido) y de salida (del resultado,
+  o del mismo DataFrame si la función lo modifica inplace),
+* la memoria máxima asignada durante la llamada, medida con tracemalloc,
+
+y lo escribe como una línea JSON en el log. Opcionalmente, cada etapa de primer nivel se
+perfila con cProfile (archivo .prof) o pyinstrument (archivo .html). Las etapas anidadas
+se registran con su nivel y su memoria máxima incluye la de las etapas internas.
+
+Uso:
+    with instrumentacion.ejecucion('Data/instrumentacion.jsonl', perfil='cprofile'):
+        ...  # al salir se imprime la tabla resumen
+"""
+import contextlib
+import cProfile
+import datetime
+import functools
+import json
+import os
+import re
+import time
+import tracemalloc
+
+import pandas as pd
+
+PERFILADORES = ('cprofile', 'pyinstrument')
+
+
+class _Estado:
+    """
+    Configuración y registros de la instrumentación activa.
+    """
+
+    def __init__(self):
+        self.activa = False
+        self.ruta_log = None
+        self.perfil = None
+        self.directorio_perfiles = None
+        self.registros = []
+        self.pila = []
+        self.iniciado_tracemalloc = False
+
+
+_estado = _Estado()
+
+
+def activar(ruta_log=None, perfil=None, directorio_perfiles='perfiles'):
+    """
+    Activa la instrumentación y descarta los registros anteriores.
+
+    Parameters:
+        ruta_log (str, opcional): Archivo JSON Lines al que se agrega un registro por etapa.
+            Sin él, los registros solo quedan en memoria para 'resumen'.
+        perfil (str, opcional): 'cprofile' o 'pyinstrument' para perfilar cada etapa de
+            primer nivel; pyinstrument debe estar instalado.
+        directorio_perfiles (str): Directorio donde se guardan los perfiles.
+
+    Returns:
+        None
+    """
+    if perfil not in (None,) + PERFILADORES:
+        raise ValueError(f"perfil debe ser uno de {PERFILADORES}, no {perfil!r}")
+    if perfil == 'pyinstrument':
+        try:
+            import pyinstrument  # noqa: F401
+        except ImportError as error:
+            raise ImportError("El perfil 'pyinstrument' requiere el paquete pyinstrument") from error
+    if perfil:
+        os.makedirs(directorio_perfiles, exist_ok=True)
+    if ruta_log and os.path.dirname(ruta_log):
+        os.makedirs(os.path.dirname(ruta_log), exist_ok=True)
+
+    _estado.ruta_log = ruta_log
+    _estado.perfil = perfil
+    _estado.directorio_perfiles = directorio_perfiles
+    _estado.registros = []
+    _estado.pila = []
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _estado.iniciado_tracemalloc = True
+    _estado.activa = True
+
+
+def desactivar():
+    """
+    Desactiva la instrumentación; los registros se conservan para 'resumen'.
+    """
+    _estado.activa = False
+    if _estado.iniciado_tracemalloc:
+        tracemalloc.stop()
+        _estado.iniciado_tracemalloc = False
+
+
+def activa():
+    """
+    Indica si la instrumentación está activa.
+    """
+    return _estado.activa
+
+
+def _filas(objeto):
+    if isinstance(objeto, (pd.DataFrame, pd.Series)):
+        return len(objeto)
+    return None
+
+
+def _primer_tabular(args, kwargs):
+    for valor in list(args) + list(kwargs.values()):
+        if isinstance(valor, (pd.DataFrame, pd.Series)):
+            return valor
+    return None
+
+
+def _nombre_archivo(nombre):
+    return re.sub(r'[^\w.-]+', '_', nombre)
+
+
+@contextlib.contextmanager
+def _perfilar(nombre):
+    """
+    Perfila el bloque con el perfilador configurado y guarda el resultado.
+    """
+    base = os.path.join(_estado.directorio_perfiles,
+                        f'{len(_estado.registros):04d}-{_nombre_archivo(nombre)}')
+    if _estado.perfil == 'cprofile':
+        perfilador = cProfile.Profile()
+        perfilador.enable()
+        try:
+            yield
+        finally:
+            perfilador.disable()
+            perfilador.dump_stats(base + '.prof')
+    else:
+        from pyinstrument import Profiler
+        perfilador = Profiler()
+        perfilador.start()
+        try:
+            yield
+        finally:
+            perfilador.stop()
+            with open(base + '.html', 'w', encoding='utf-8') as archivo:
+                archivo.write(perfilador.output_html())
+
+
+class Etapa:
+    """
+    Contexto que mide un bloque de código como una etapa del pipeline.
+
+    Si la instrumentación no está activa, no hace nada. Las filas de salida pueden
+    informarse dentro del bloque con 'Etapa.salida(objeto)'.
+
+    Parameters:
+        nombre (str): Nombre de la etapa en el log y en el resumen.
+        entrada (pd.DataFrame o pd.Series, opcional): Datos de entrada, para contar sus filas.
+    """
+
+    def __init__(self, nombre, entrada=None):
+        self.nombre = nombre
+        self.filas_entrada = _filas(entrada)
+        self.filas_salida = None
+        self._medir = False
+
+    def salida(self, objeto):
+        """
+        Registra las filas del resultado de la etapa y lo devuelve sin cambios.
+        """
+        self.filas_salida = _filas(objeto)
+        return objeto
+
+    def __enter__(self):
+        self._medir = _estado.activa
+        if not self._medir:
+            return self
+
+        # El pico de tracemalloc es global: se guarda el de la etapa contenedora antes de reiniciarlo
+        actual, pico = tracemalloc.get_traced_memory()
+        if _estado.pila:
+            _estado.pila[-1]['pico'] = max(_estado.pila[-1]['pico'], pico)
+        tracemalloc.reset_peak()
+        marco = {'base': actual, 'pico': actual, 'perfil': None}
+        if _estado.perfil and not _estado.pila:
+            marco['perfil'] = _perfilar(self.nombre)
+            marco['perfil'].__enter__()
+        _estado.pila.append(marco)
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if not self._medir:
+            return False
+        segundos = time.perf_counter() - self._inicio
+        marco = _estado.pila.pop()
+        if marco['perfil'] is not None:
+            marco['perfil'].__exit__(tipo, valor, traza)
+        pico = max(marco['pico'], tracemalloc.get_traced_memory()[1])
+        if _estado.pila:
+            _estado.pila[-1]['pico'] = max(_estado.pila[-1]['pico'], pico)
+        tracemalloc.reset_peak()
+
+        registro = {
+            'fecha': datetime.datetime.now().isoformat(timespec='milliseconds'),
+            'etapa': self.nombre,
+            'nivel': len(_estado.pila),
+            'segundos': segundos,
+            'filas_entrada': self.filas_entrada,
+            'filas_salida': self.filas_salida,
+            'memoria_pico_mb': (pico - marco['base']) / 2**20,
+            'error': tipo.__name__ if tipo is not None else None,
+        }
+        _estado.registros.append(registro)
+        if _estado.ruta_log:
+            with open(_estado.ruta_log, 'a', encoding='utf-8') as archivo:
+                archivo.write(json.dumps(registro, ensure_ascii=False) + '\n')
+        return False
+
+
+def instrumentado(funcion):
+    """
+    Decorador que mide cada llamada a la función como una Etapa con su nombre calificado.
+
+    Las filas de entrada son las del primer DataFrame o Serie entre los argumentos; las de
+    salida, las del resultado o, si la función devuelve None, las de esa misma entrada.
+    """
+    nombre = f'{funcion.__module__}.{funcion.__qualname__}'
+
+    @functools.wraps(funcion)
+    def envuelta(*args, **kwargs):
+        if not _estado.activa:
+            return funcion(*args, **kwargs)
+        entrada = _primer_tabular(args, kwargs)
+        with Etapa(nombre, entrada) as medicion:
+            resultado = funcion(*args, **kwargs)
+            medicion.salida(entrada if resultado is None else resultado)
+        return resultado
+
+    return envuelta
+
+
+def instrumentar_modulo(espacio, modulo, excluir=()):
+    """
+    Envuelve con 'instrumentado' las funciones públicas definidas en un módulo.
+
+    Parameters:
+        espacio (dict): El espacio de nombres del módulo, normalmente globals().
+        modulo (str): El nombre del módulo; se omiten las funciones importadas de otros.
+        excluir (list): Nombres de funciones que no se envuelven, como las que se aplican
+            valor a valor.
+
+    Returns:
+        None
+    """
+    for nombre, valor in list(espacio.items()):
+        if (callable(valor) and not isinstance(valor, type) and not nombre.startswith('_')
+                and getattr(valor, '__module__', None) == modulo and nombre not in excluir
+                and not hasattr(valor, '__wrapped__')):
+            espacio[nombre] = instrumentado(valor)
+
+
+def resumen(registros=None):
+    """
+    Resume los registros por etapa, ordenados por tiempo total.
+
+    Parameters:
+        registros (list, opcional): Registros a resumir. Por defecto, los de la activación actual.
+
+    Returns:
+        pd.DataFrame: Llamadas, segundos totales, medio y máximo, filas de entrada y salida
+            sumadas, memoria máxima y porcentaje del tiempo de las etapas de primer nivel.
+    """
+    datos = pd.DataFrame(_estado.registros if registros is None else registros,
+                         columns=['etapa', 'nivel', 'segundos', 'filas_entrada', 'filas_salida', 'memoria_pico_mb'])
+    tabla = datos.groupby('etapa').agg(
+        llamadas=('segundos', 'size'),
+        segundos=('segundos', 'sum'),
+        segundos_medio=('segundos', 'mean'),
+        segundos_max=('segundos', 'max'),
+        filas_entrada=('filas_entrada', lambda filas: filas.sum(min_count=1)),
+        filas_salida=('filas_salida', lambda filas: filas.sum(min_count=1)),
+        memoria_pico_mb=('memoria_pico_mb', 'max'),
+    )
+    total = datos.loc[datos['nivel'] == 0, 'segundos'].sum()
+    tabla['porcentaje'] = tabla['segundos'] / total * 100 if total else float('nan')
+    return tabla.sort_values('segundos', ascending=False).reset_index()
+
+
+@contextlib.contextmanager
+def ejecucion(ruta_log=None, perfil=None, directorio_perfiles='perfiles', imprimir=True):
+    """
+    Activa la instrumentación durante el bloque e imprime la tabla resumen al terminar.
+
+    Parameters:
+        ruta_log (str, opcional): Archivo JSON Lines de registros.
+        perfil (str, opcional): 'cprofile' o 'pyinstrument'.
+        directorio_perfiles (str): Directorio donde se guardan los perfiles.
+        imprimir (bool): Si es False, no se imprime el resumen; se obtiene con 'resumen()'.
+
+    Yields:
+        None
+    """
+    activar(ruta_log, perfil, directorio_perfiles)
+    try:
+        yield
+    finally:
+        desactivar()
+        if imprimir and _estado.registros:
+            with pd.option_context('display.max_rows', None, 'display.width', 200):
+                print(resumen().round(4).to_string(index=False))
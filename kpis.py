@@ -0,0 +1,219 @@
+"""
+Cálculo de los tres KPIs del README sobre ventanas móviles de meses.
+
+* Tasa de homicidios en siniestros viales: víctimas de la ventana cada 100.000 habitantes,
+  comparada con la ventana anterior (por defecto, semestres).
+* Variación de víctimas motociclistas: -(previas - actuales) / previas * 100 entre una
+  ventana y la anterior (por defecto, años).
+* Tasa de homicidios en avenidas: víctimas en avenidas de la ventana cada 100.000 habitantes
+  (por defecto, años).
+
+Los conteos se guardan como contadores mensuales por comuna, por lo que agregar un mes
+nuevo cuesta O(filas nuevas) y cada KPI se obtiene sumando los meses de la ventana. El
+modo histórico calcula todas las ventanas de una sola vez con sumas acumuladas.
+"""
+import numpy as np
+import pandas as pd
+
+from poblacion import poblacion_anual
+
+SERIES = ['Víctimas', 'Víctimas moto', 'Víctimas avenida']
+
+COLUMNAS_HISTORICO = ['Año', 'Mes', 'Víctimas', 'Tasa homicidios', 'Tasa homicidios previa', 'Víctimas moto',
+                      'Víctimas moto previas', 'Variación motociclistas', 'Víctimas avenida', 'Tasa avenidas',
+                      'Tasa avenidas previa']
+
+
+def _indice_mes(anio, mes):
+    return np.asarray(anio) * 12 + np.asarray(mes) - 1
+
+
+class MotorKPI:
+    """
+    Mantiene contadores mensuales por comuna y calcula los KPIs sobre ventanas móviles.
+
+    Parameters:
+        poblacion (callable, opcional): Función que recibe un array de años y devuelve la
+            población de CABA de cada uno. Por defecto, 'poblacion.poblacion_anual'.
+        poblacion_comunas (dict, opcional): Población de cada comuna, necesaria para las tasas
+            por comuna. Sin ella, las tasas por comuna quedan en NaN.
+    """
+
+    def __init__(self, poblacion=poblacion_anual, poblacion_comunas=None):
+        self.poblacion = poblacion
+        self.poblacion_comunas = poblacion_comunas
+        self.contadores = {}
+
+    def agregar(self, df):
+        """
+        Suma a los contadores las víctimas de un lote nuevo, en O(filas del lote).
+
+        Parameters:
+            df (pd.DataFrame): Víctimas nuevas con las columnas 'Año', 'Mes', 'Comuna',
+                'Víctima' y 'Tipo de calle'.
+
+        Returns:
+            None
+        """
+        lote = pd.DataFrame({
+            'Mes índice': _indice_mes(df['Año'], df['Mes']),
+            'Comuna': df['Comuna'].to_numpy(),
+            'Víctimas': 1,
+            'Víctimas moto': (df['Víctima'] == 'MOTO').to_numpy(dtype=int),
+            'Víctimas avenida': (df['Tipo de calle'] == 'AVENIDA').to_numpy(dtype=int),
+        })
+        conteos = lote.groupby(['Mes índice', 'Comuna'])[SERIES].sum()
+        for (indice, comuna), valores in zip(conteos.index, conteos.to_numpy()):
+            por_comuna = self.contadores.setdefault(indice, {})
+            por_comuna[comuna] = por_comuna.get(comuna, 0) + valores
+
+    def _matriz(self, por_comuna):
+        """
+        Arma los conteos mensuales densos: un array (series, grupos, meses) sin huecos de calendario.
+        """
+        claves = np.array([(indice, comuna) for indice, por_comuna in self.contadores.items()
+                           for comuna in por_comuna])
+        valores = np.array([valores for por_comuna in self.contadores.values()
+                            for valores in por_comuna.values()])
+        meses = claves[:, 0]
+        primero, ultimo = meses.min(), meses.max()
+
+        if por_comuna:
+            grupos, posicion = np.unique(claves[:, 1], return_inverse=True)
+        else:
+            grupos, posicion = np.array([None]), np.zeros(len(claves), dtype=int)
+
+        matriz = np.zeros((len(SERIES), len(grupos), ultimo - primero + 1))
+        for i in range(len(SERIES)):
+            np.add.at(matriz[i], (posicion, meses - primero), valores[:, i])
+        return matriz, grupos, np.arange(primero, ultimo + 1)
+
+    def _tasas(self, cantidades, anios, grupos, por_comuna):
+        if not por_comuna:
+            return cantidades / self.poblacion(anios)[np.newaxis, :] * 100000
+        if self.poblacion_comunas is None:
+            return np.full(cantidades.shape, np.nan)
+        poblacion = np.array([self.poblacion_comunas.get(grupo, np.nan) for grupo in grupos], dtype=float)
+        return cantidades / poblacion[:, np.newaxis] * 100000
+
+    def historico(self, meses_tasa=6, meses_moto=12, meses_avenida=12, por_comuna=False):
+        """
+        Calcula los tres KPIs para cada mes del historial en una sola pasada.
+
+        Cada fila corresponde a las ventanas que terminan en ese mes. La población de una
+        ventana es la del año de su último mes y los meses anteriores al primer dato cuentan
+        como cero.
+
+        Parameters:
+            meses_tasa (int): Largo de la ventana de la tasa de homicidios.
+            meses_moto (int): Largo de la ventana de la variación de motociclistas.
+            meses_avenida (int): Largo de la ventana de la tasa en avenidas.
+            por_comuna (bool): Si es True, calcula los KPIs de cada comuna.
+
+        Returns:
+            pd.DataFrame: Una fila por mes (y comuna) con los conteos, tasas y variaciones, con
+                las columnas de COLUMNAS_HISTORICO. Sin lotes agregados, la tabla está vacía.
+        """
+        if not self.contadores:
+            return pd.DataFrame(columns=(['Comuna'] if por_comuna else []) + COLUMNAS_HISTORICO)
+        matriz, grupos, indices = self._matriz(por_comuna)
+        anios, mes = indices // 12, indices % 12 + 1
+
+        def ventanas(serie, largo):
+            # Suma de la ventana actual y de la anterior a partir de la suma acumulada
+            acumulado = np.concatenate([np.zeros((len(grupos), 2 * largo)),
+                                        matriz[SERIES.index(serie)].cumsum(axis=1)], axis=1)
+            actual = acumulado[:, 2 * largo:] - acumulado[:, largo:-largo]
+            previa = acumulado[:, largo:-largo] - acumulado[:, :-2 * largo]
+            return actual, previa
+
+        victimas, victimas_previas = ventanas('Víctimas', meses_tasa)
+        moto, moto_previas = ventanas('Víctimas moto', meses_moto)
+        avenida, avenida_previas = ventanas('Víctimas avenida', meses_avenida)
+
+        tasa = self._tasas(victimas, anios, grupos, por_comuna)
+        tasa_previa = self._tasas(victimas_previas, (indices - meses_tasa) // 12, grupos, por_comuna)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variacion_moto = -(moto_previas - moto) / moto_previas * 100
+        variacion_moto[moto_previas == 0] = np.nan
+
+        valores = [np.tile(anios, len(grupos)), np.tile(mes, len(grupos)), victimas, tasa, tasa_previa, moto,
+                   moto_previas, variacion_moto, avenida, self._tasas(avenida, anios, grupos, por_comuna),
+                   self._tasas(avenida_previas, (indices - meses_avenida) // 12, grupos, por_comuna)]
+        columnas = {columna: np.ravel(valor) for columna, valor in zip(COLUMNAS_HISTORICO, valores)}
+        if por_comuna:
+            columnas = {'Comuna': np.repeat(grupos, len(indices)), **columnas}
+        return pd.DataFrame(columnas)
+
+    def kpis(self, anio, mes, meses_tasa=6, meses_moto=12, meses_avenida=12, comuna=None):
+        """
+        Calcula los tres KPIs para las ventanas que terminan en un mes dado.
+
+        Solo recorre los contadores de los meses de las ventanas, sin recalcular el historial.
+
+        Parameters:
+            anio (int): Año del último mes de la ventana.
+            mes (int): Último mes de la ventana.
+            meses_tasa (int): Largo de la ventana de la tasa de homicidios.
+            meses_moto (int): Largo de la ventana de la variación de motociclistas.
+            meses_avenida (int): Largo de la ventana de la tasa en avenidas.
+            comuna (int, opcional): Comuna a calcular. Por defecto, toda la ciudad.
+
+        Returns:
+            dict: Los conteos, tasas y variaciones de las ventanas actual y previa.
+        """
+        fin = int(_indice_mes(anio, mes))
+
+        def suma(serie, desde, hasta):
+            i = SERIES.index(serie)
+            total = 0
+            for indice in range(desde, hasta + 1):
+                por_comuna = self.contadores.get(indice, {})
+                if comuna is None:
+                    total += sum(valores[i] for valores in por_comuna.values())
+                elif comuna in por_comuna:
+                    total += por_comuna[comuna][i]
+            return total
+
+        def tasa(cantidad, indice_fin):
+            if comuna is None:
+                poblacion = self.poblacion([indice_fin // 12])[0]
+            else:
+                poblacion = (self.poblacion_comunas or {}).get(comuna, np.nan)
+            return cantidad / poblacion * 100000
+
+        victimas = suma('Víctimas', fin - meses_tasa + 1, fin)
+        victimas_previas = suma('Víctimas', fin - 2 * meses_tasa + 1, fin - meses_tasa)
+        moto = suma('Víctimas moto', fin - meses_moto + 1, fin)
+        moto_previas = suma('Víctimas moto', fin - 2 * meses_moto + 1, fin - meses_moto)
+        avenida = suma('Víctimas avenida', fin - meses_avenida + 1, fin)
+        avenida_previas = suma('Víctimas avenida', fin - 2 * meses_avenida + 1, fin - meses_avenida)
+
+        return {
+            'Víctimas': victimas,
+            'Tasa homicidios': tasa(victimas, fin),
+            'Tasa homicidios previa': tasa(victimas_previas, fin - meses_tasa),
+            'Víctimas moto': moto,
+            'Víctimas moto previas': moto_previas,
+            'Variación motociclistas': -(moto_previas - moto) / moto_previas * 100 if moto_previas else np.nan,
+            'Víctimas avenida': avenida,
+            'Tasa avenidas': tasa(avenida, fin),
+            'Tasa avenidas previa': tasa(avenida_previas, fin - meses_avenida),
+        }
+
+
+def calcular_historico(df, por_comuna=False, **ventanas):
+    """
+    Calcula en modo batch los KPIs de todo el historial del DataFrame limpio.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame limpio de homicidios.
+        por_comuna (bool): Si es True, calcula los KPIs de cada comuna.
+        **ventanas: Largos de ventana 'meses_tasa', 'meses_moto' y 'meses_avenida'.
+
+    Returns:
+        pd.DataFrame: Una fila por mes (y comuna) con los KPIs.
+    """
+    motor = MotorKPI()
+    motor.agregar(df)
+    return motor.historico(por_comuna=por_comuna, **ventanas)
@@ -0,0 +1,269 @@
+"""
+Normalización de nombres de calles e intersecciones.
+
+Las columnas 'Calle', 'Cruce', 'Lugar del hecho' y 'Dirección normalizada' escriben el
+mismo lugar de distintas formas ('AV GRAL PAZ', 'PAZ, GRAL. AV.', 'Av. General Paz'). Cada
+nombre se lleva a una clave canónica por tokens (mayúsculas sin acentos, abreviaturas
+unificadas, sin tipo de vía ni artículos y con los tokens ordenados) y las claves que aun
+así difieren por errores de tipeo se unifican con un índice invertido de trigramas: solo
+se comparan los nombres que comparten alguno de los trigramas más raros de la consulta,
+en lugar de comparar todos los pares.
+"""
+import math
+import re
+import unicodedata
+from functools import lru_cache
+
+import pandas as pd
+
+ABREVIATURAS = {
+    'GENERAL': 'GRAL',
+    'PRESIDENTE': 'PRES', 'PTE': 'PRES',
+    'TENIENTE': 'TTE',
+    'CORONEL': 'CNEL',
+    'DOCTOR': 'DR',
+    'INGENIERO': 'ING',
+    'CAPITAN': 'CAP',
+    'INTENDENTE': 'INT', 'ITE': 'INT',
+    'MARISCAL': 'MCAL',
+}
+
+# Se descartan de la clave: el tipo de vía y los artículos no distinguen calles en CABA
+TIPOS_VIA = {'AV', 'AVENIDA', 'AVDA', 'AU', 'AUTOPISTA', 'AUT', 'PJE', 'PASAJE', 'CALLE', 'COLECTORA'}
+
+ARTICULOS = {'DE', 'DEL', 'LA', 'LAS', 'LOS', 'EL'}
+
+SIN_DATO = {'', 'SD', 'NAN', 'NONE'}
+
+_SEPARADOR_CRUCE = re.compile(r'\s+(?:Y|E|&)\s+')
+_ALTURA = re.compile(r'^(.*\D)\s+(\d+)$')
+_KILOMETRO = re.compile(r'\bP?KM\.?\s*[\d.,]*')
+_NO_ALFANUMERICO = re.compile(r'[^A-Z0-9]+')
+
+
+def _sin_acentos(texto):
+    # Algunas direcciones vienen con UTF-8 leído como Windows-1252 ('PEÃ‘A')
+    try:
+        texto = texto.encode('cp1252').decode('utf-8')
+    except UnicodeError:
+        pass
+    return ''.join(c for c in unicodedata.normalize('NFKD', texto) if not unicodedata.combining(c))
+
+
+@lru_cache(maxsize=100_000)
+def canonizar_calle(nombre):
+    """
+    Devuelve la clave canónica de un nombre de calle.
+
+    Parameters:
+        nombre (str): El nombre tal como aparece en los datos, por ejemplo 'PAZ, GRAL. AV.'.
+
+    Returns:
+        str: Los tokens normalizados y ordenados, sin tipo de vía, artículos ni iniciales,
+            por ejemplo 'GRAL PAZ' o '3 FEBRERO', o None si el nombre está vacío o es 'SD'.
+    """
+    # Las letras perdidas en la fuente figuran como '?' ('MAGARI?OS'): se quitan sin partir la palabra
+    texto = _sin_acentos(str(nombre)).upper().replace('?', '')
+    texto = _NO_ALFANUMERICO.sub(' ', _KILOMETRO.sub(' ', texto))
+    # Las letras sueltas son iniciales ('F.'), pero los números sueltos distinguen calles ('3 DE FEBRERO')
+    tokens = [ABREVIATURAS.get(token, token) for token in texto.split()
+              if token not in TIPOS_VIA and token not in ARTICULOS and (len(token) > 1 or token.isdigit())]
+    clave = ' '.join(sorted(tokens))
+    return None if clave in SIN_DATO else clave
+
+
+def separar_lugar(lugar):
+    """
+    Separa una descripción de lugar en sus calles y su altura.
+
+    Parameters:
+        lugar (str): Por ejemplo 'AV LA PLATA 2384' o 'San Juan Av. Y Rincón'.
+
+    Returns:
+        tuple: La lista de nombres de calles y la altura como entero (o None si es un cruce
+            o no tiene altura).
+    """
+    texto = _sin_acentos(str(lugar)).upper().strip()
+    calles = [calle for calle in _SEPARADOR_CRUCE.split(texto) if calle]
+    if len(calles) == 1:
+        coincidencia = _ALTURA.match(calles[0])
+        if coincidencia:
+            return [coincidencia.group(1)], int(coincidencia.group(2))
+    return calles, None
+
+
+def trigramas(clave):
+    """
+    Devuelve el conjunto de trigramas de una clave, con un espacio de relleno en los extremos.
+    """
+    texto = f' {clave} '
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def numeros(clave):
+    """
+    Devuelve los tokens numéricos de una clave, que un error de tipeo no debe cambiar.
+    """
+    return frozenset(token for token in clave.split() if token.isdigit())
+
+
+def similitud(a, b):
+    """
+    Similitud de Jaccard entre dos conjuntos de trigramas.
+    """
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class IndiceTrigramas:
+    """
+    Índice invertido de trigramas sobre un conjunto creciente de claves canónicas.
+
+    La búsqueda usa filtrado por prefijo: si dos claves tienen una similitud de Jaccard de
+    al menos 'umbral', comparten al menos ceil(umbral * n) de los n trigramas de la
+    consulta, por lo que basta tomar candidatos de los n - ceil(umbral * n) + 1 trigramas
+    menos frecuentes para no perder ninguna coincidencia. Dos claves con números distintos
+    ('3 FEBRERO' y '27 FEBRERO') nunca coinciden, por parecidas que sean.
+
+    Parameters:
+        umbral (float): Similitud mínima para considerar que dos claves son la misma calle.
+    """
+
+    def __init__(self, umbral=0.7):
+        self.umbral = umbral
+        self.claves = []
+        self._trigramas = []
+        self._numeros = []
+        self._listas = {}
+
+    def agregar(self, clave):
+        """
+        Agrega una clave al índice y devuelve su posición.
+        """
+        posicion = len(self.claves)
+        gramas = trigramas(clave)
+        self.claves.append(clave)
+        self._trigramas.append(gramas)
+        self._numeros.append(numeros(clave))
+        for grama in gramas:
+            self._listas.setdefault(grama, []).append(posicion)
+        return posicion
+
+    def buscar(self, clave):
+        """
+        Busca la clave indexada más parecida a la consulta.
+
+        Parameters:
+            clave (str): Una clave canónica.
+
+        Returns:
+            tuple: La clave encontrada y su similitud, o (None, 0.0) si ninguna supera el umbral.
+        """
+        gramas = trigramas(clave)
+        propios = numeros(clave)
+        prefijo = len(gramas) - math.ceil(self.umbral * len(gramas)) + 1
+        raros = sorted(gramas, key=lambda grama: len(self._listas.get(grama, ())))[:prefijo]
+        candidatos = {posicion for grama in raros for posicion in self._listas.get(grama, ())}
+
+        mejor, mejor_similitud = None, 0.0
+        for posicion in candidatos:
+            if self._numeros[posicion] != propios:
+                continue
+            valor = similitud(gramas, self._trigramas[posicion])
+            if valor >= self.umbral and valor > mejor_similitud:
+                mejor, mejor_similitud = self.claves[posicion], valor
+        return mejor, mejor_similitud
+
+
+class ResolvedorCalles:
+    """
+    Asigna a cada nombre de calle o lugar una clave canónica, unificando variantes.
+
+    La primera variante de cada calle define su clave; las siguientes se resuelven por clave
+    exacta o, si difieren por errores de tipeo, por similitud de trigramas. Los resultados se
+    memorizan en una caché LRU por texto crudo, así que los valores repetidos no vuelven a
+    normalizarse.
+
+    Parameters:
+        umbral (float): Similitud mínima de trigramas para unificar dos claves.
+        tamaño_cache (int): Cantidad de textos crudos memorizados.
+        calles (iterable, opcional): Nombres conocidos con los que inicializar el índice, por
+            ejemplo los valores de la columna 'Calle'.
+    """
+
+    def __init__(self, umbral=0.7, tamaño_cache=100_000, calles=()):
+        self.indice = IndiceTrigramas(umbral)
+        self._exactas = {}
+        self.nombres = {}
+        self.resolver_calle = lru_cache(maxsize=tamaño_cache)(self._resolver_calle)
+        self.resolver_lugar = lru_cache(maxsize=tamaño_cache)(self._resolver_lugar)
+        for calle in calles:
+            self.resolver_calle(calle)
+
+    def _resolver_calle(self, nombre):
+        """
+        Devuelve la clave canónica de la calle, o None si el nombre no tiene datos.
+        """
+        clave = canonizar_calle(nombre)
+        if clave is None:
+            return None
+        if clave not in self._exactas:
+            parecida, _ = self.indice.buscar(clave)
+            if parecida is None:
+                self.indice.agregar(clave)
+                self.nombres[clave] = str(nombre)
+                parecida = clave
+            self._exactas[clave] = parecida
+        return self._exactas[clave]
+
+    def _resolver_lugar(self, lugar):
+        """
+        Devuelve la clave canónica del lugar: las calles del cruce ordenadas y unidas por ' Y ',
+        o la calle seguida de la altura. Devuelve None si ninguna calle tiene datos.
+        """
+        calles, altura = separar_lugar(lugar)
+        claves = sorted({clave for clave in map(self.resolver_calle, calles) if clave is not None})
+        if not claves:
+            return None
+        if altura is not None:
+            return f'{claves[0]} {altura}'
+        return ' Y '.join(claves)
+
+    def resolver_serie(self, serie, lugares=True):
+        """
+        Resuelve una Serie completa, normalizando una sola vez cada valor distinto.
+
+        Parameters:
+            serie (pd.Series): Nombres de calles o descripciones de lugares.
+            lugares (bool): Si es True, resuelve lugares (cruces y alturas); si no, calles.
+
+        Returns:
+            pd.Series: Las claves canónicas, con el mismo índice que la Serie.
+        """
+        codigos, valores = pd.factorize(serie)
+        resolver = self.resolver_lugar if lugares else self.resolver_calle
+        claves = pd.Series([resolver(valor) for valor in valores] + [None], dtype=object)
+        return pd.Series(claves.to_numpy()[codigos], index=serie.index, dtype=object)
+
+
+def claves_de_lugar(df, resolvedor=None):
+    """
+    Calcula las claves canónicas de calle y de lugar de cada hecho sin modificar el DataFrame.
+
+    El lugar se toma de 'Dirección normalizada' y, si falta, de 'Lugar del hecho'.
+
+    Parameters:
+        df (pd.DataFrame): Hechos o víctimas con las columnas 'Calle', 'Dirección normalizada'
+            y 'Lugar del hecho'.
+        resolvedor (ResolvedorCalles, opcional): Resolvedor a reutilizar entre llamadas.
+
+    Returns:
+        pd.DataFrame: Las columnas 'Clave calle' y 'Clave lugar', con el índice de df.
+    """
+    if resolvedor is None:
+        resolvedor = ResolvedorCalles(calles=df['Calle'].dropna().unique())
+    lugar = resolvedor.resolver_serie(df['Dirección normalizada'])
+    lugar = lugar.fillna(resolvedor.resolver_serie(df['Lugar del hecho']))
+    return pd.DataFrame({
+        'Clave calle': resolvedor.resolver_serie(df['Calle'], lugares=False),
+        'Clave lugar': lugar,
+    }, index=df.index)
@@ -0,0 +1,151 @@
+"""
+Población de CABA para fechas y períodos arbitrarios a partir de los censos.
+
+Se precalcula una tabla diaria interpolando la serie de 'Data/poblacionCABA.csv' con
+crecimiento lineal o geométrico entre censos consecutivos, de modo que la población de
+un array de fechas se obtiene indexando la tabla, sin llamadas a Python por fila. El valor
+de cada censo se asigna al 1 de enero de su año, la misma convención usada para estimar
+la población de 2021 a partir de los censos de 2010 y 2022.
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+RUTA_POBLACION = 'Data/poblacionCABA.csv'
+
+METODOS = ('lineal', 'geometrico')
+
+
+def _interpolar(x, xp, fp):
+    """
+    Interpola linealmente y extrapola con la pendiente del primer y último tramo.
+    """
+    y = np.interp(x, xp, fp)
+    antes, despues = x < xp[0], x > xp[-1]
+    y[antes] = fp[0] + (x[antes] - xp[0]) * (fp[1] - fp[0]) / (xp[1] - xp[0])
+    y[despues] = fp[-1] + (x[despues] - xp[-1]) * (fp[-1] - fp[-2]) / (xp[-1] - xp[-2])
+    return y
+
+
+def _anio_fraccional(dias):
+    """
+    Convierte fechas (datetime64[D]) en años fraccionales: 2021-01-01 es 2021.0.
+    """
+    fechas = pd.DatetimeIndex(dias)
+    dias_del_anio = np.where(fechas.is_leap_year, 366, 365)
+    return fechas.year + (fechas.dayofyear - 1) / dias_del_anio
+
+
+class InterpolacionPoblacion:
+    """
+    Tabla diaria de población interpolada entre censos, con búsqueda vectorizada.
+
+    Parameters:
+        censos (pd.DataFrame): Serie censal con las columnas 'Año' y 'Población'.
+        metodo (str): 'lineal' o 'geometrico' (tasa de crecimiento constante entre censos).
+        hasta (int, opcional): Último año cubierto por la tabla. Por defecto, diez años
+            después del último censo, extrapolando el crecimiento del último tramo.
+    """
+
+    def __init__(self, censos, metodo='lineal', hasta=None):
+        if metodo not in METODOS:
+            raise ValueError(f"El método debe ser uno de {METODOS}, no '{metodo}'")
+
+        censos = censos.sort_values('Año')
+        anios = censos['Año'].to_numpy(dtype=float)
+        poblaciones = censos['Población'].to_numpy(dtype=float)
+        if hasta is None:
+            hasta = int(anios[-1]) + 10
+
+        self.metodo = metodo
+        self.inicio = np.datetime64(f'{int(anios[0])}-01-01', 'D')
+        self.fin = np.datetime64(f'{hasta}-12-31', 'D')
+        dias = np.arange(self.inicio, self.fin + 1)
+
+        t = _anio_fraccional(dias)
+        if metodo == 'lineal':
+            self.tabla = _interpolar(t, anios, poblaciones)
+        else:
+            self.tabla = np.exp(_interpolar(t, anios, np.log(poblaciones)))
+
+        # Suma acumulada para promediar períodos sin recorrer sus días
+        self._acumulada = np.concatenate([[0.0], self.tabla.cumsum()])
+
+    @classmethod
+    def desde_csv(cls, ruta=RUTA_POBLACION, metodo='lineal', hasta=None):
+        """
+        Construye la interpolación a partir del CSV de censos.
+        """
+        return cls(pd.read_csv(ruta), metodo, hasta)
+
+    def _posiciones(self, fechas):
+        dias = np.asarray(pd.to_datetime(fechas).values.astype('datetime64[D]'))
+        posiciones = (dias - self.inicio).astype(np.int64)
+        if np.any(posiciones < 0) or np.any(dias > self.fin):
+            raise ValueError(f'Hay fechas fuera de la tabla de población ({self.inicio} a {self.fin})')
+        return posiciones
+
+    def en_fechas(self, fechas):
+        """
+        Devuelve la población de cada fecha.
+
+        Parameters:
+            fechas (array-like): Fechas como datetime64, Timestamps o cadenas ISO.
+
+        Returns:
+            np.ndarray: La población interpolada para cada fecha.
+        """
+        return self.tabla[self._posiciones(np.atleast_1d(fechas))]
+
+    def anual(self, anios):
+        """
+        Devuelve la población al 1 de enero de cada año.
+
+        Parameters:
+            anios (array-like): Años enteros.
+
+        Returns:
+            np.ndarray: La población de cada año.
+        """
+        anios = np.atleast_1d(np.asarray(anios, dtype=np.int64))
+        fechas = (anios - 1970).astype('datetime64[Y]').astype('datetime64[D]')
+        return self.en_fechas(fechas)
+
+    def promedio_periodo(self, desde, hasta):
+        """
+        Devuelve la población promedio diaria de cada período [desde, hasta], ambos inclusive.
+
+        Parameters:
+            desde (array-like): Fechas de inicio de los períodos.
+            hasta (array-like): Fechas de fin de los períodos.
+
+        Returns:
+            np.ndarray: La población promedio de cada período.
+        """
+        inicio = self._posiciones(np.atleast_1d(desde))
+        fin = self._posiciones(np.atleast_1d(hasta)) + 1
+        return (self._acumulada[fin] - self._acumulada[inicio]) / (fin - inicio)
+
+
+@lru_cache(maxsize=None)
+def interpolacion(ruta=RUTA_POBLACION, metodo='lineal'):
+    """
+    Devuelve la interpolación de población del CSV, construida una sola vez por ruta y método.
+    """
+    return InterpolacionPoblacion.desde_csv(ruta, metodo)
+
+
+def poblacion_anual(anios, ruta=RUTA_POBLACION, metodo='lineal'):
+    """
+    Estima la población de CABA para cada año a partir de los censos.
+
+    Parameters:
+        anios (array-like): Años para los cuales estimar la población.
+        ruta (str): Ruta al CSV con las columnas 'Año' y 'Población'.
+        metodo (str): 'lineal' o 'geometrico'.
+
+    Returns:
+        np.ndarray: La población estimada para cada año.
+    """
+    return interpolacion(ruta, metodo).anual(anios)
@@ -0,0 +1,185 @@
+"""
+Renderizado en lote de las figuras del análisis exploratorio (EDA_Parte_2.ipynb).
+
+Cada figura se dibuja con su función de 'Utils' en un pool de procesos con el backend Agg
+y se guarda en el directorio de salida en los formatos pedidos. Antes de dibujar se calcula
+un hash del contenido de los datos agregados que usa la figura y del código de su función;
+si coincide con el del último renderizado y los archivos existen, la figura no se vuelve a
+dibujar. Los hashes se guardan en 'indice.json' dentro del directorio de salida.
+"""
+import contextlib
+import hashlib
+import inspect
+import io
+import json
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import agregaciones as ag
+
+DIRECTORIO_FIGURAS = 'Img/eda'
+
+INDICE = 'indice.json'
+
+# Figura: función de Utils y datos de los que depende su contenido
+FIGURAS = {
+    'distribucion_mensual_por_anio': ('grafico_distribucion_mensual_por_ano',
+                                      lambda df: [ag.tabla_victimas_mensuales_por_anio(df)]),
+    'accidentes_por_mes': ('cantidad_total_accidentes_por_mes', lambda df: [ag.tabla_accidentes_por_mes(df)]),
+    'accidentes_por_dia_semana': ('accidentes_por_dia_semana', lambda df: [ag.tabla_victimas_por_dia_semana(df)]),
+    'accidentes_por_categoria_tiempo': ('cantidad_accidentes_por_categoria_tiempo',
+                                        lambda df: [ag.tabla_accidentes_por_categoria_tiempo(df)]),
+    'accidentes_por_hora_del_dia': ('cantidad_accidentes_por_horas_del_dia',
+                                    lambda df: [ag.tabla_accidentes_por_hora_del_dia(df)]),
+    'accidentes_semana_fin_de_semana': ('cantidad_accidentes_semana_fin_de_semana',
+                                        lambda df: [ag.tabla_accidentes_semana_fin_de_semana(df)]),
+    'distribucion_edad': ('distribucion_edad', lambda df: [df['Edad']]),
+    'distribucion_edad_por_anio': ('distribucion_edad_por_anio', lambda df: [df[['Año', 'Edad']]]),
+    'accidentes_por_anio_y_sexo': ('cantidades_accidentes_por_anio_y_sexo', lambda df: [df[['Año', 'Sexo', 'Edad']]]),
+    'edad_y_rol_victimas': ('edad_y_rol_victimas', lambda df: [df[['Rol', 'Edad']]]),
+    'distribucion_edad_por_victima': ('distribucion_edad_por_victima', lambda df: [df[['Víctima', 'Edad']]]),
+    'victimas_sexo_rol_victima': ('cantidad_victimas_sexo_rol_victima',
+                                  lambda df: [ag.tabla_victimas_por_sexo(df), ag.tabla_victimas_por_rol_y_sexo(df),
+                                              ag.tabla_victimas_por_victima_y_sexo(df)]),
+    'victimas_participantes': ('cantidad_victimas_participantes', lambda df: [ag.tabla_victimas_por_participantes(df)]),
+    'acusados': ('cantidad_acusados', lambda df: [ag.tabla_acusados(df)]),
+    'accidentes_tipo_de_calle': ('accidentes_tipo_de_calle',
+                                 lambda df: [ag.tabla_victimas_por_tipo_de_calle(df), ag.tabla_victimas_por_cruce(df)]),
+}
+
+_df_proceso = None
+
+
+def hash_figura(df, nombre, formatos):
+    """
+    Calcula el hash de contenido de una figura: sus datos agregados, el código de su función
+    y los formatos de salida.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame limpio de homicidios.
+        nombre (str): Nombre de la figura en FIGURAS.
+        formatos (tuple): Extensiones de los archivos a generar.
+
+    Returns:
+        str: El hash SHA-256 en hexadecimal.
+    """
+    import Utils
+
+    funcion, entradas = FIGURAS[nombre]
+    sha = hashlib.sha256()
+    sha.update(inspect.getsource(getattr(Utils, funcion)).encode('utf-8'))
+    sha.update(','.join(formatos).encode('utf-8'))
+    for datos in entradas(df):
+        columnas = datos.columns if isinstance(datos, pd.DataFrame) else [datos.name]
+        sha.update(repr(list(columnas)).encode('utf-8'))
+        sha.update(pd.util.hash_pandas_object(datos, index=True).to_numpy().tobytes())
+    return sha.hexdigest()
+
+
+def _inicializar(df):
+    """
+    Prepara cada proceso del pool: backend Agg y el DataFrame recibido una sola vez.
+    """
+    global _df_proceso
+    import matplotlib
+    matplotlib.use('Agg')
+    _df_proceso = df
+
+
+def _dibujar(nombre, directorio, formatos, df=None):
+    """
+    Dibuja una figura con su función de Utils y la guarda en cada formato.
+
+    Returns:
+        tuple: El nombre de la figura y los segundos que tardó.
+    """
+    import matplotlib.pyplot as plt
+    import Utils
+
+    inicio = time.perf_counter()
+    df = _df_proceso if df is None else df
+    plt.close('all')
+    # Las funciones imprimen resúmenes y llaman a plt.show(); como en los notebooks, se
+    # ignoran los avisos de deprecación de seaborn
+    with contextlib.redirect_stdout(io.StringIO()), _sin_mostrar(plt), warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        getattr(Utils, FIGURAS[nombre][0])(df)
+    figura = plt.gcf()
+    for formato in formatos:
+        figura.savefig(os.path.join(directorio, f'{nombre}.{formato}'), format=formato, bbox_inches='tight')
+    plt.close('all')
+    return nombre, time.perf_counter() - inicio
+
+
+@contextlib.contextmanager
+def _sin_mostrar(plt):
+    mostrar = plt.show
+    plt.show = lambda *args, **kwargs: None
+    try:
+        yield
+    finally:
+        plt.show = mostrar
+
+
+def _leer_indice(directorio):
+    ruta = os.path.join(directorio, INDICE)
+    if not os.path.exists(ruta):
+        return {}
+    with open(ruta, encoding='utf-8') as archivo:
+        return json.load(archivo)
+
+
+def _guardar_indice(directorio, indice):
+    ruta = os.path.join(directorio, INDICE)
+    temporal = ruta + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as archivo:
+        json.dump(indice, archivo, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(temporal, ruta)
+
+
+def renderizar_figuras(df, directorio=DIRECTORIO_FIGURAS, formatos=('png',), figuras=None,
+                       procesos=None, forzar=False):
+    """
+    Dibuja en paralelo las figuras cuyos datos cambiaron desde el último renderizado.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame limpio de homicidios.
+        directorio (str): Directorio donde se guardan las figuras y el índice de hashes.
+        formatos (tuple): Extensiones de salida, por ejemplo ('png', 'svg').
+        figuras (list, opcional): Nombres de FIGURAS a considerar. Por defecto, todas.
+        procesos (int, opcional): Cantidad de procesos del pool. Con 1 se dibuja en el
+            proceso actual. Por defecto, la cantidad de CPU.
+        forzar (bool): Si es True, se dibujan todas aunque su hash no haya cambiado.
+
+    Returns:
+        dict: Para cada figura, los segundos que tardó en dibujarse o None si no cambió.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    formatos = tuple(formatos)
+    indice = _leer_indice(directorio)
+
+    hashes, pendientes = {}, []
+    for nombre in (FIGURAS if figuras is None else figuras):
+        hashes[nombre] = hash_figura(df, nombre, formatos)
+        archivos = [os.path.join(directorio, f'{nombre}.{formato}') for formato in formatos]
+        if forzar or indice.get(nombre) != hashes[nombre] or not all(map(os.path.exists, archivos)):
+            pendientes.append(nombre)
+
+    resultado = {nombre: None for nombre in hashes}
+    if procesos == 1 or len(pendientes) <= 1:
+        # En el proceso actual se respeta el backend del usuario; savefig no depende de él
+        dibujadas = [_dibujar(nombre, directorio, formatos, df) for nombre in pendientes]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar, initargs=(df,)) as pool:
+            dibujadas = list(pool.map(_dibujar, pendientes, [directorio] * len(pendientes),
+                                      [formatos] * len(pendientes)))
+
+    for nombre, segundos in dibujadas:
+        resultado[nombre] = segundos
+        indice[nombre] = hashes[nombre]
+    _guardar_indice(directorio, indice)
+    return resultado
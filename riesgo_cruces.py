@@ -0,0 +1,257 @@
+"""
+Ranking incremental de las intersecciones más peligrosas, con decaimiento exponencial.
+
+Cada víctima ocurrida en un cruce se asigna a la clave canónica de la intersección de
+'normalizacion' ('A Y B' con las calles ordenadas, de modo que 'A y B' y 'B y A' coinciden),
+y sus contadores (víctimas, motociclistas, peatones, víctimas nocturnas y riesgo) se guardan
+en un diccionario que se actualiza con cada lote nuevo, sin volver a recorrer la historia.
+
+El riesgo es la suma de las víctimas ponderadas por 2^(-antigüedad / vida media). Para no
+tener que reducir todos los puntajes a medida que pasa el tiempo, se guardan con
+"decaimiento hacia adelante": cada víctima suma 2^((t - t0) / vida media), con t0 fijo, y el
+riesgo a una fecha se obtiene multiplicando por 2^(-(fecha - t0) / vida media). Como ese
+factor es el mismo para todas las intersecciones, el orden del ranking no cambia con el
+tiempo y los puntajes guardados solo crecen.
+
+Gracias a eso, para cada vida media (la "ventana" del ranking) se mantiene un montículo
+mínimo de a lo sumo k intersecciones para toda la ciudad y uno por comuna: una intersección
+cuyo puntaje crece entra si supera al mínimo, y ninguna que haya salido puede volver sin
+recibir una víctima nueva. El top k se lee en O(k log k) con k chico, sin recorrer las
+intersecciones.
+"""
+import heapq
+import math
+
+import numpy as np
+import pandas as pd
+
+from agregaciones import hora_datetime
+from normalizacion import ResolvedorCalles, claves_de_lugar
+
+K = 50
+
+# Vidas medias por defecto, en días: un trimestre, un año y cinco años
+VIDAS_MEDIAS = (90, 365, 1825)
+
+CATEGORIAS_NOCHE = ('Noche', 'Madrugada')
+
+# Exponente máximo de los puntajes guardados antes de reescalarlos, para no desbordar float
+_EXPONENTE_MAXIMO = 500
+
+
+def _dias(df):
+    """
+    Devuelve el instante de cada víctima en días desde 1970, con la fracción de la hora, o NaN
+    si la fecha falta o no puede convertirse.
+    """
+    fechas = pd.to_datetime(df['Fecha'], format='ISO8601', errors='coerce')
+    fechas = (fechas - pd.Timestamp(0)).dt.total_seconds().to_numpy()
+    horas = hora_datetime(df['Hora'])
+    segundos = (horas - horas.dt.normalize()).dt.total_seconds().fillna(0).to_numpy()
+    return (fechas + segundos) / 86400
+
+
+class _TopK:
+    """
+    Montículo mínimo con las k claves de mayor puntaje, para puntajes que solo crecen.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self.monticulo = []
+        self.entradas = {}
+
+    def actualizar(self, clave, puntaje):
+        entrada = self.entradas.get(clave)
+        if entrada is not None:
+            # El puntaje de un miembro solo puede crecer: se reordena el montículo de tamaño k
+            entrada[0] = puntaje
+            heapq.heapify(self.monticulo)
+        elif len(self.monticulo) < self.k:
+            entrada = [puntaje, clave]
+            self.entradas[clave] = entrada
+            heapq.heappush(self.monticulo, entrada)
+        elif puntaje > self.monticulo[0][0]:
+            entrada = [puntaje, clave]
+            self.entradas[clave] = entrada
+            del self.entradas[heapq.heapreplace(self.monticulo, entrada)[1]]
+
+    def escalar(self, factor):
+        for entrada in self.monticulo:
+            entrada[0] *= factor
+
+    def ordenado(self):
+        return sorted(self.monticulo, key=lambda entrada: (-entrada[0], entrada[1]))
+
+
+class RankingCruces:
+    """
+    Contadores por intersección y top k por comuna y vida media, actualizados por lotes.
+
+    Parameters:
+        k (int): Cantidad máxima de intersecciones de cada ranking.
+        vidas_medias (tuple): Vidas medias del decaimiento, en días; cada una tiene sus rankings.
+        resolvedor (normalizacion.ResolvedorCalles, opcional): Resolvedor de claves de calles a
+            reutilizar entre lotes. Por defecto, uno con las calles del primer lote.
+    """
+
+    def __init__(self, k=K, vidas_medias=VIDAS_MEDIAS, resolvedor=None):
+        self.k = k
+        self.vidas_medias = tuple(vidas_medias)
+        self.resolvedor = resolvedor
+        self.contadores = {}
+        self.ultimo = None
+        # Por vida media: el origen t0 de los puntajes y los top k de la ciudad (None) y de cada comuna
+        self._t0 = {}
+        self._tops = {vida: {} for vida in self.vidas_medias}
+
+    def _top(self, vida, comuna):
+        tops = self._tops[vida]
+        if comuna not in tops:
+            tops[comuna] = _TopK(self.k)
+        return tops[comuna]
+
+    def _reescalar(self, vida, t0):
+        """
+        Mueve el origen de los puntajes de una vida media a t0, multiplicándolos por el mismo factor.
+        """
+        factor = 2.0 ** (-(t0 - self._t0[vida]) / vida)
+        for contador in self.contadores.values():
+            contador['Riesgo'][vida] *= factor
+        for top in self._tops[vida].values():
+            top.escalar(factor)
+        self._t0[vida] = t0
+
+    def agregar(self, df):
+        """
+        Suma a los contadores las víctimas de un lote nuevo ocurridas en intersecciones.
+
+        Las víctimas de lugares sin cruce o sin fecha válida se ignoran. La comuna de cada
+        intersección es la de su primera víctima, para que cada una esté en un único ranking
+        por comuna.
+
+        Parameters:
+            df (pd.DataFrame): Víctimas con las columnas 'Fecha', 'Hora', 'Comuna', 'Rol',
+                'Víctima', 'Calle', 'Dirección normalizada' y 'Lugar del hecho'.
+
+        Returns:
+            int: La cantidad de víctimas del lote asignadas a una intersección.
+        """
+        if self.resolvedor is None:
+            self.resolvedor = ResolvedorCalles(calles=df['Calle'].dropna().unique())
+        lugar = claves_de_lugar(df, self.resolvedor)['Clave lugar']
+        dias = _dias(df)
+        # Una fecha faltante dejaría el origen t0 y todos los puntajes en NaN
+        en_cruce = lugar.str.contains(' Y ', regex=False, na=False).to_numpy() & ~np.isnan(dias)
+        if not en_cruce.any():
+            return 0
+        df = df[en_cruce]
+        dias = dias[en_cruce]
+
+        # Como en 'demografia', el lote se agrupa por intersección con factorize y np.bincount
+        codigos, claves = pd.factorize(lugar[en_cruce].to_numpy())
+        n = len(claves)
+        sumas = {
+            'Víctimas': np.bincount(codigos, minlength=n),
+            'Víctimas moto': np.bincount(codigos, weights=(df['Víctima'] == 'MOTO').to_numpy(dtype=float), minlength=n),
+            'Peatones': np.bincount(codigos, weights=(df['Rol'] == 'PEATON').to_numpy(dtype=float), minlength=n),
+            'Víctimas nocturnas': np.bincount(codigos, minlength=n, weights=df.derivadas['Categoria tiempo']
+                                              .isin(CATEGORIAS_NOCHE).to_numpy(dtype=float)),
+        }
+        ultimos = np.full(n, -np.inf)
+        np.maximum.at(ultimos, codigos, dias)
+        # Posición de la primera víctima de cada intersección, para su comuna y su nombre
+        primeras = np.full(n, len(codigos))
+        np.minimum.at(primeras, codigos, np.arange(len(codigos)))
+        comunas = df['Comuna'].to_numpy()[primeras].tolist()
+        nombres = df['Dirección normalizada'].astype(object).fillna(df['Lugar del hecho']).to_numpy()[primeras].tolist()
+
+        self.ultimo = float(dias.max()) if self.ultimo is None else max(self.ultimo, float(dias.max()))
+        riesgos = {}
+        for vida in self.vidas_medias:
+            if vida not in self._t0:
+                self._t0[vida] = float(dias.min())
+            elif (self.ultimo - self._t0[vida]) / vida > _EXPONENTE_MAXIMO:
+                self._reescalar(vida, self.ultimo)
+            riesgos[vida] = np.bincount(codigos, weights=2.0 ** ((dias - self._t0[vida]) / vida), minlength=n).tolist()
+        sumas = {columna: valores.astype(int).tolist() for columna, valores in sumas.items()}
+        ultimos = ultimos.tolist()
+
+        for i, clave in enumerate(claves):
+            contador = self.contadores.get(clave)
+            if contador is None:
+                contador = {'Comuna': comunas[i], 'Nombre': nombres[i], 'Víctimas': 0,
+                            'Víctimas moto': 0, 'Peatones': 0, 'Víctimas nocturnas': 0,
+                            'Último hecho': -math.inf, 'Riesgo': dict.fromkeys(self.vidas_medias, 0.0)}
+                self.contadores[clave] = contador
+            for columna, valores in sumas.items():
+                contador[columna] += valores[i]
+            contador['Último hecho'] = max(contador['Último hecho'], ultimos[i])
+            for vida in self.vidas_medias:
+                contador['Riesgo'][vida] += riesgos[vida][i]
+                puntaje = contador['Riesgo'][vida]
+                self._top(vida, None).actualizar(clave, puntaje)
+                self._top(vida, contador['Comuna']).actualizar(clave, puntaje)
+        return int(en_cruce.sum())
+
+    def top(self, k=None, comuna=None, vida_media=None, fecha=None):
+        """
+        Devuelve las intersecciones de mayor riesgo sin recorrer los contadores.
+
+        Parameters:
+            k (int, opcional): Cantidad de intersecciones, a lo sumo la 'k' del ranking.
+            comuna (int, opcional): Comuna del ranking. Por defecto, toda la ciudad.
+            vida_media (int, opcional): Vida media del decaimiento, una de 'vidas_medias'.
+                Por defecto, la primera.
+            fecha (str o pd.Timestamp, opcional): Fecha a la que se calcula el riesgo. Por
+                defecto, la de la última víctima agregada. No cambia el orden del ranking.
+
+        Returns:
+            pd.DataFrame: Una fila por intersección, ordenadas por 'Riesgo' descendente, con
+                'Intersección', 'Nombre', 'Comuna', los contadores, 'Porcentaje nocturno',
+                'Último hecho' y 'Riesgo' (víctimas ponderadas por el decaimiento).
+        """
+        vida = self.vidas_medias[0] if vida_media is None else vida_media
+        if vida not in self._tops:
+            raise ValueError(f'vida_media debe ser una de {self.vidas_medias}, no {vida_media!r}')
+        k = self.k if k is None else min(k, self.k)
+        columnas = ['Intersección', 'Nombre', 'Comuna', 'Víctimas', 'Víctimas moto', 'Peatones',
+                    'Víctimas nocturnas', 'Porcentaje nocturno', 'Último hecho', 'Riesgo']
+        top = self._tops[vida].get(comuna)
+        if top is None:
+            return pd.DataFrame(columns=columnas)
+
+        instante = self.ultimo if fecha is None else pd.Timestamp(fecha).value / 86400e9
+        factor = 2.0 ** (-(instante - self._t0[vida]) / vida)
+        filas = []
+        for puntaje, clave in top.ordenado()[:k]:
+            contador = self.contadores[clave]
+            filas.append([clave, contador['Nombre'], contador['Comuna'], contador['Víctimas'],
+                          contador['Víctimas moto'], contador['Peatones'], contador['Víctimas nocturnas'],
+                          contador['Víctimas nocturnas'] / contador['Víctimas'] * 100,
+                          contador['Último hecho'], puntaje * factor])
+        tabla = pd.DataFrame(filas, columns=columnas)
+        tabla['Último hecho'] = pd.to_datetime(tabla['Último hecho'] * 86400, unit='s').dt.round('s')
+        return tabla
+
+    def tabla(self, vida_media=None, fecha=None):
+        """
+        Devuelve los contadores de todas las intersecciones, recorriéndolos; sirve para
+        verificar los rankings o para análisis que no son top k.
+
+        Returns:
+            pd.DataFrame: Las mismas columnas que 'top', sin ordenar.
+        """
+        vida = self.vidas_medias[0] if vida_media is None else vida_media
+        instante = self.ultimo if fecha is None else pd.Timestamp(fecha).value / 86400e9
+        factor = 2.0 ** (-(instante - self._t0[vida]) / vida) if self.contadores else 1.0
+        tabla = pd.DataFrame([
+            {'Intersección': clave, 'Nombre': contador['Nombre'], 'Comuna': contador['Comuna'],
+             'Víctimas': contador['Víctimas'], 'Víctimas moto': contador['Víctimas moto'],
+             'Peatones': contador['Peatones'], 'Víctimas nocturnas': contador['Víctimas nocturnas'],
+             'Porcentaje nocturno': contador['Víctimas nocturnas'] / contador['Víctimas'] * 100,
+             'Último hecho': contador['Último hecho'], 'Riesgo': contador['Riesgo'][vida] * factor}
+            for clave, contador in self.contadores.items()])
+        if not tabla.empty:
+            tabla['Último hecho'] = pd.to_datetime(tabla['Último hecho'] * 86400, unit='s').dt.round('s')
+        return tabla
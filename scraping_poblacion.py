@@ -0,0 +1,285 @@
+"""
+Web scraping de la población histórica de CABA, con caché HTTP en disco y modo sin conexión.
+
+Reemplaza a Poblacion_CABA.ipynb para regenerar 'Data/poblacionCABA.csv':
+
+* 'CacheHTTP' guarda cada página en disco con su ETag y su Last-Modified, indexada por el
+  hash de la URL. Las descargas siguientes son condicionales: un 304 reutiliza la copia
+  guardada, y si no hay red se usa la última copia disponible.
+* 'extraer_poblacion' ubica la tabla "Población histórica" con una sola expresión XPath de
+  lxml (el encabezado 'navbox-title' y su tabla contenedora), en lugar de recorrer todas las
+  tablas de la página. lxml es opcional: sin él se usa BeautifulSoup con 'html.parser', como
+  en el notebook.
+* La tabla ya parseada se guarda junto a la página con el SHA-256 del HTML, por lo que
+  mientras la página no cambie tampoco se vuelve a parsear.
+* Con 'offline=True' el CSV se regenera desde la copia de la página guardada en
+  'Data/fixtures', sin acceder a la red.
+
+Uso:
+    python scraping_poblacion.py [--offline] [--actualizar-fixture]
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+
+import pandas as pd
+
+from poblacion import RUTA_POBLACION, interpolacion
+
+URL = 'https://es.wikipedia.org/wiki/Buenos_Aires'
+
+RUTA_FIXTURE = 'Data/fixtures/poblacion_wikipedia.html'
+
+DIRECTORIO_CACHE = 'Data/.cache/http'
+
+TITULO_TABLA = 'Población histórica'
+
+# Encabezado de la tabla, como lo busca el notebook: <th colspan="3" class="navbox-title">
+XPATH_TABLA = (f"//th[@colspan='3' and contains(concat(' ', normalize-space(@class), ' '), ' navbox-title ')"
+               f" and contains(normalize-space(.), '{TITULO_TABLA}')]/ancestor::table[1]")
+
+# Separadores de miles que usa Wikipedia; \s incluye el espacio duro y el espacio fino
+_SEPARADORES = re.compile(r'\s')
+
+
+class ErrorScraping(Exception):
+    """
+    No se pudo obtener la página o no se encontró la tabla de población.
+    """
+
+
+class CacheHTTP:
+    """
+    Caché en disco de respuestas HTTP, indexada por URL y validada con ETag / Last-Modified.
+
+    Parameters:
+        directorio (str): Directorio donde se guardan los cuerpos y sus metadatos.
+        sesion (requests.Session, opcional): Sesión para las descargas. Por defecto, una nueva.
+        timeout (float): Segundos máximos de espera de cada descarga.
+    """
+
+    def __init__(self, directorio=DIRECTORIO_CACHE, sesion=None, timeout=10):
+        self.directorio = directorio
+        self.sesion = sesion
+        self.timeout = timeout
+
+    def _rutas(self, url):
+        clave = hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]
+        base = os.path.join(self.directorio, clave)
+        return base + '.html', base + '.json'
+
+    def metadatos(self, url):
+        """
+        Devuelve los metadatos guardados de la URL, o un diccionario vacío si no está en caché.
+        """
+        ruta_cuerpo, ruta_meta = self._rutas(url)
+        if not (os.path.exists(ruta_cuerpo) and os.path.exists(ruta_meta)):
+            return {}
+        with open(ruta_meta, encoding='utf-8') as archivo:
+            return json.load(archivo)
+
+    def leer(self, url):
+        """
+        Devuelve el cuerpo guardado de la URL, o None si no está en caché.
+        """
+        ruta_cuerpo, _ = self._rutas(url)
+        if not self.metadatos(url):
+            return None
+        with open(ruta_cuerpo, encoding='utf-8') as archivo:
+            return archivo.read()
+
+    def guardar(self, url, cuerpo, **metadatos):
+        """
+        Guarda el cuerpo y los metadatos de la URL, reemplazando los anteriores de forma atómica.
+        """
+        os.makedirs(self.directorio, exist_ok=True)
+        ruta_cuerpo, ruta_meta = self._rutas(url)
+        with open(ruta_cuerpo + '.tmp', 'w', encoding='utf-8') as archivo:
+            archivo.write(cuerpo)
+        os.replace(ruta_cuerpo + '.tmp', ruta_cuerpo)
+        meta = {'url': url, 'sha256': hashlib.sha256(cuerpo.encode('utf-8')).hexdigest(), **metadatos}
+        with open(ruta_meta + '.tmp', 'w', encoding='utf-8') as archivo:
+            json.dump(meta, archivo, ensure_ascii=False)
+        os.replace(ruta_meta + '.tmp', ruta_meta)
+
+    def actualizar_metadatos(self, url, **cambios):
+        meta = self.metadatos(url)
+        meta.update(cambios)
+        _, ruta_meta = self._rutas(url)
+        with open(ruta_meta, 'w', encoding='utf-8') as archivo:
+            json.dump(meta, archivo, ensure_ascii=False)
+
+    def obtener(self, url, offline=False):
+        """
+        Devuelve el HTML de la URL, descargándolo solo si cambió desde la copia guardada.
+
+        Parameters:
+            url (str): La URL a obtener.
+            offline (bool): Si es True, solo se usa la copia guardada.
+
+        Returns:
+            str: El cuerpo de la respuesta.
+        """
+        meta = self.metadatos(url)
+        if offline:
+            if not meta:
+                raise ErrorScraping(f'{url} no está en la caché y el modo es sin conexión')
+            return self.leer(url)
+
+        import requests
+
+        encabezados = {'User-Agent': 'PI_2_Data-Analysis (scraping de población de CABA)'}
+        if meta.get('etag'):
+            encabezados['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            encabezados['If-Modified-Since'] = meta['last_modified']
+        try:
+            respuesta = (self.sesion or requests).get(url, headers=encabezados, timeout=self.timeout)
+        except requests.RequestException as error:
+            if meta:
+                return self.leer(url)
+            raise ErrorScraping(f'No se pudo descargar {url} y no hay copia en caché: {error}') from error
+
+        if respuesta.status_code == 304 and meta:
+            return self.leer(url)
+        if respuesta.status_code != 200:
+            raise ErrorScraping(f'{url} respondió {respuesta.status_code}')
+        respuesta.encoding = respuesta.encoding or 'utf-8'
+        self.guardar(url, respuesta.text, etag=respuesta.headers.get('ETag'),
+                     last_modified=respuesta.headers.get('Last-Modified'))
+        return respuesta.text
+
+
+def _celdas_lxml(html):
+    import lxml.html
+
+    documento = lxml.html.fromstring(html)
+    tablas = documento.xpath(XPATH_TABLA)
+    if not tablas:
+        return None
+    return [[celda.text_content().strip() for celda in fila.xpath('./th|./td')]
+            for fila in tablas[0].xpath('./tr|./tbody/tr')]
+
+
+def _celdas_bs4(html):
+    from bs4 import BeautifulSoup
+
+    sopa = BeautifulSoup(html, 'html.parser')
+    encabezado = sopa.find(lambda etiqueta: etiqueta.name == 'th' and etiqueta.get('colspan') == '3'
+                           and 'navbox-title' in etiqueta.get('class', [])
+                           and TITULO_TABLA in etiqueta.get_text())
+    if encabezado is None:
+        return None
+    return [[celda.get_text(strip=True) for celda in fila.find_all(['th', 'td'], recursive=False)]
+            for fila in encabezado.find_parent('table').find_all('tr')]
+
+
+def extraer_poblacion(html, parser=None):
+    """
+    Extrae la tabla "Población histórica" del HTML de la página de Buenos Aires.
+
+    Parameters:
+        html (str): El HTML de la página.
+        parser (str, opcional): 'lxml' o 'bs4'. Por defecto, lxml si está instalado.
+
+    Returns:
+        pd.DataFrame: Columnas 'Año' y 'Población' como enteros, sin el cambio porcentual.
+    """
+    if parser is None:
+        try:
+            import lxml.html  # noqa: F401
+            parser = 'lxml'
+        except ImportError:
+            parser = 'bs4'
+    if parser not in ('lxml', 'bs4'):
+        raise ValueError(f"parser debe ser 'lxml' o 'bs4', no {parser!r}")
+
+    filas = _celdas_lxml(html) if parser == 'lxml' else _celdas_bs4(html)
+    if filas is None:
+        raise ErrorScraping(f"No se encontró la tabla '{TITULO_TABLA}' en la página")
+
+    # Se descartan el título (una celda) y la fila de encabezados ('Año', 'Pob.', '±%')
+    datos = [fila[:2] for fila in filas if len(fila) == 3 and fila[0].strip().isdigit()]
+    if not datos:
+        raise ErrorScraping(f"La tabla '{TITULO_TABLA}' no tiene filas de datos")
+    tabla = pd.DataFrame(datos, columns=['Año', 'Población'])
+    tabla['Año'] = tabla['Año'].astype(int)
+    tabla['Población'] = tabla['Población'].str.replace(_SEPARADORES, '', regex=True).astype(int)
+    return tabla
+
+
+def obtener_poblacion(url=URL, offline=False, fixture=RUTA_FIXTURE, cache=None, parser=None):
+    """
+    Obtiene la tabla de población de la página, reutilizando la descarga y el parseo en caché.
+
+    Parameters:
+        url (str): URL de la página de Buenos Aires en Wikipedia.
+        offline (bool): Si es True, se parsea la copia guardada en 'fixture' sin usar la red.
+        fixture (str): Ruta a la copia de la página para el modo sin conexión.
+        cache (CacheHTTP, opcional): Caché de descargas. Por defecto, una en DIRECTORIO_CACHE.
+        parser (str, opcional): 'lxml' o 'bs4'.
+
+    Returns:
+        pd.DataFrame: Columnas 'Año' y 'Población'.
+    """
+    if offline:
+        with open(fixture, encoding='utf-8') as archivo:
+            return extraer_poblacion(archivo.read(), parser)
+
+    cache = cache or CacheHTTP()
+    html = cache.obtener(url)
+    sha256 = hashlib.sha256(html.encode('utf-8')).hexdigest()
+    parseada = cache.metadatos(url).get('tabla')
+    if parseada and parseada['sha256'] == sha256:
+        return pd.DataFrame(parseada['filas'], columns=['Año', 'Población'])
+
+    tabla = extraer_poblacion(html, parser)
+    cache.actualizar_metadatos(url, tabla={'sha256': sha256, 'filas': tabla.values.tolist()})
+    return tabla
+
+
+def regenerar_csv(ruta=RUTA_POBLACION, offline=False, fixture=RUTA_FIXTURE, actualizar_fixture=False, **kwargs):
+    """
+    Regenera el CSV de población que usan 'poblacion' y los KPIs.
+
+    Parameters:
+        ruta (str): Ruta del CSV a escribir.
+        offline (bool): Si es True, se regenera desde la copia guardada en 'fixture'.
+        fixture (str): Ruta a la copia de la página.
+        actualizar_fixture (bool): Si es True y se descargó la página, la copia guardada se
+            reemplaza por la descarga, para usarla luego sin conexión.
+        **kwargs: Argumentos 'url', 'cache' y 'parser' de 'obtener_poblacion'.
+
+    Returns:
+        pd.DataFrame: La tabla escrita.
+    """
+    tabla = obtener_poblacion(offline=offline, fixture=fixture, **kwargs)
+    if actualizar_fixture and not offline:
+        cache = kwargs.get('cache') or CacheHTTP()
+        os.makedirs(os.path.dirname(fixture) or '.', exist_ok=True)
+        with open(fixture, 'w', encoding='utf-8') as archivo:
+            archivo.write(cache.leer(kwargs.get('url', URL)))
+    tabla.to_csv(ruta, index=False, encoding='utf-8')
+    # La interpolación de población se construye una vez por ruta; se descarta la anterior
+    interpolacion.cache_clear()
+    return tabla
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ruta', default=RUTA_POBLACION)
+    parser.add_argument('--offline', action='store_true', help='Usa la copia guardada de la página')
+    parser.add_argument('--fixture', default=RUTA_FIXTURE)
+    parser.add_argument('--actualizar-fixture', action='store_true',
+                        help='Guarda la página descargada como copia para el modo sin conexión')
+    parser.add_argument('--parser', choices=['lxml', 'bs4'], default=None)
+    args = parser.parse_args()
+
+    tabla = regenerar_csv(args.ruta, args.offline, args.fixture, args.actualizar_fixture, parser=args.parser)
+    print(f'{len(tabla)} censos escritos en {args.ruta}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+"""
+Series temporales de víctimas por dimensión: tendencias móviles, variación interanual y estacionalidad.
+
+'construir_series' arma, para cada valor de cada dimensión (comuna, vehículo de la víctima,
+tipo de calle) y para el total, una serie densa y completa en el calendario, diaria,
+semanal o mensual. Cada fila se asigna a un período entero y a un código de grupo, y los
+conteos de todas las series de una dimensión salen de un único np.bincount, por lo que el
+costo es O(filas) por dimensión y los períodos sin víctimas quedan en cero.
+
+Las series se devuelven como un DataFrame ancho (una columna por serie, con un MultiIndex
+dimensión/valor), y las ventanas móviles, las variaciones interanuales y la descomposición
+estacional operan sobre todas las columnas a la vez con sumas acumuladas de numpy.
+"""
+import numpy as np
+import pandas as pd
+
+DIMENSIONES_SERIES = ['Comuna', 'Víctima', 'Tipo de calle']
+
+# Frecuencia: paso del índice de pandas, períodos por año y período estacional por defecto
+FRECUENCIAS = {
+    'D': ('D', 365, 7),
+    'W': ('7D', 52, 52),
+    'M': ('MS', 12, 12),
+}
+
+
+def _periodos(fechas, frecuencia):
+    """
+    Asigna a cada fecha un período entero y devuelve también la fecha de inicio del período 0.
+    """
+    dias = fechas.to_numpy().astype('datetime64[D]').astype(np.int64)
+    if frecuencia == 'D':
+        periodos = dias
+        origen = dias.min()
+        return periodos - origen, np.datetime64(int(origen), 'D')
+    if frecuencia == 'W':
+        # El 1970-01-01 fue jueves: se corre el origen para que las semanas empiecen el lunes
+        periodos = (dias + 3) // 7
+        origen = periodos.min()
+        return periodos - origen, np.datetime64(int(origen * 7 - 3), 'D')
+    meses = fechas.dt.year.to_numpy() * 12 + fechas.dt.month.to_numpy() - 1
+    origen = meses.min()
+    return meses - origen, np.datetime64(f'{origen // 12:04d}-{origen % 12 + 1:02d}', 'M').astype('datetime64[D]')
+
+
+def construir_series(df, frecuencia='M', dimensiones=DIMENSIONES_SERIES, valor=None, total=True):
+    """
+    Construye las series temporales densas de cada valor de cada dimensión.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame limpio de homicidios, con la columna 'Fecha'. Las filas
+            sin fecha o con una fecha que no puede convertirse se omiten.
+        frecuencia (str): 'D' (diaria), 'W' (semanal, desde el lunes) o 'M' (mensual).
+        dimensiones (list): Columnas por las que se abre cada serie.
+        valor (str, opcional): Columna a sumar. Por defecto, se cuentan las filas (víctimas).
+        total (bool): Si es True, se agrega la serie total como ('Total', 'Total').
+
+    Returns:
+        pd.DataFrame: Un período por fila, desde el primero hasta el último con datos y sin
+            huecos, y una columna por serie con un MultiIndex ('Dimensión', 'Valor').
+    """
+    paso = FRECUENCIAS[frecuencia][0]
+    fechas = pd.to_datetime(df['Fecha'], format='ISO8601', errors='coerce')
+    # NaT no tiene período: como entero sería el mínimo de int64 y rompería el bincount
+    validas = fechas.notna().to_numpy()
+    if not validas.any():
+        raise ValueError("No hay filas con una 'Fecha' válida para construir las series")
+    if not validas.all():
+        df, fechas = df[validas], fechas[validas]
+    periodos, origen = _periodos(fechas, frecuencia)
+    cantidad = int(periodos.max()) + 1
+    pesos = None if valor is None else df[valor].to_numpy(dtype=float)
+
+    bloques, columnas = [], []
+    if total:
+        bloques.append(np.bincount(periodos, weights=pesos, minlength=cantidad)[np.newaxis, :])
+        columnas.append(('Total', 'Total'))
+    for dimension in dimensiones:
+        codigos, valores = pd.factorize(df[dimension], sort=True)
+        validos = codigos >= 0
+        conteos = np.bincount(codigos[validos] * cantidad + periodos[validos],
+                              weights=None if pesos is None else pesos[validos],
+                              minlength=len(valores) * cantidad)
+        bloques.append(conteos.reshape(len(valores), cantidad))
+        columnas.extend((dimension, v) for v in valores)
+
+    indice = pd.date_range(pd.Timestamp(origen), periods=cantidad, freq=paso, name='Período')
+    series = pd.DataFrame(np.vstack(bloques).T, index=indice,
+                          columns=pd.MultiIndex.from_tuples(columnas, names=['Dimensión', 'Valor']))
+    series.attrs['frecuencia'] = frecuencia
+    return series
+
+
+def _frecuencia(series, frecuencia):
+    if frecuencia is None:
+        frecuencia = series.attrs.get('frecuencia')
+    if frecuencia not in FRECUENCIAS:
+        raise ValueError(f"frecuencia debe ser una de {list(FRECUENCIAS)}, no {frecuencia!r}")
+    return frecuencia
+
+
+def _sumas_moviles(valores, ventana):
+    """
+    Suma de las últimas 'ventana' filas de cada columna, con NaN en las primeras ventana - 1.
+    """
+    acumulado = np.vstack([np.zeros((1, valores.shape[1])), np.cumsum(valores, axis=0)])
+    sumas = np.full(valores.shape, np.nan)
+    sumas[ventana - 1:] = acumulado[ventana:] - acumulado[:-ventana]
+    return sumas
+
+
+def ventana_movil(series, ventana, funcion='mean'):
+    """
+    Aplica una ventana móvil hacia atrás a todas las series a la vez.
+
+    Parameters:
+        series (pd.DataFrame): Series como las devuelve 'construir_series'.
+        ventana (int): Cantidad de períodos de la ventana, incluido el actual.
+        funcion (str): 'sum' o 'mean' se resuelven con sumas acumuladas; cualquier otra
+            agregación de pandas ('median', 'max', ...) se delega en DataFrame.rolling.
+
+    Returns:
+        pd.DataFrame: Un DataFrame con la forma de 'series', con NaN hasta completar la primera ventana.
+    """
+    if funcion not in ('sum', 'mean'):
+        return series.rolling(ventana).agg(funcion)
+    sumas = _sumas_moviles(series.to_numpy(dtype=float), ventana)
+    if funcion == 'mean':
+        sumas /= ventana
+    return pd.DataFrame(sumas, index=series.index, columns=series.columns)
+
+
+def variacion_interanual(series, frecuencia=None, porcentual=False):
+    """
+    Compara cada período con el mismo período del año anterior.
+
+    En las series diarias se compara con la misma fecha del año anterior; en las semanales,
+    con 52 semanas antes, y en las mensuales, con 12 meses antes.
+
+    Parameters:
+        series (pd.DataFrame): Series como las devuelve 'construir_series'.
+        frecuencia (str, opcional): 'D', 'W' o 'M'. Por defecto, la guardada en series.attrs.
+        porcentual (bool): Si es True, devuelve la variación en porcentaje en lugar de la diferencia.
+
+    Returns:
+        pd.DataFrame: La diferencia (o variación porcentual) de cada período, NaN durante el primer año.
+    """
+    frecuencia = _frecuencia(series, frecuencia)
+    if frecuencia == 'D':
+        anterior = series.reindex(series.index - pd.DateOffset(years=1)).set_axis(series.index)
+    else:
+        anterior = series.shift(FRECUENCIAS[frecuencia][1])
+    if porcentual:
+        return (series - anterior) / anterior.where(anterior != 0) * 100
+    return series - anterior
+
+
+def _tendencia(valores, periodo):
+    """
+    Media móvil centrada de largo 'periodo' (2 x periodo si es par), con NaN en los bordes.
+    """
+    medias = _sumas_moviles(valores, periodo) / periodo
+    tendencia = np.full(valores.shape, np.nan)
+    mitad = periodo // 2
+    if periodo % 2:
+        tendencia[mitad:len(valores) - mitad] = medias[periodo - 1:]
+    else:
+        centradas = (medias[periodo - 1:-1] + medias[periodo:]) / 2
+        tendencia[mitad:len(valores) - mitad] = centradas
+    return tendencia
+
+
+def descomponer(series, periodo=None, frecuencia=None):
+    """
+    Descompone cada serie en tendencia, estacionalidad y residuo (descomposición aditiva clásica).
+
+    La tendencia es una media móvil centrada de un período estacional; la estacionalidad es el
+    promedio de la serie sin tendencia en cada posición del ciclo, centrado en cero; el residuo
+    es lo que resta. Todas las series se procesan juntas como una matriz.
+
+    Parameters:
+        series (pd.DataFrame): Series como las devuelve 'construir_series'.
+        periodo (int, opcional): Largo del ciclo estacional. Por defecto, 7 para las series
+            diarias y 52 o 12 para las semanales y mensuales.
+        frecuencia (str, opcional): 'D', 'W' o 'M'. Por defecto, la guardada en series.attrs.
+
+    Returns:
+        dict: DataFrames 'tendencia', 'estacional' y 'residuo' con la forma de 'series'.
+    """
+    if periodo is None:
+        periodo = FRECUENCIAS[_frecuencia(series, frecuencia)][2]
+    valores = series.to_numpy(dtype=float)
+    if len(valores) < 2 * periodo:
+        raise ValueError(f'Se necesitan al menos {2 * periodo} períodos para descomponer con período {periodo}')
+
+    tendencia = _tendencia(valores, periodo)
+    sin_tendencia = valores - tendencia
+
+    # Se completan los períodos hasta un múltiplo del ciclo para promediar cada posición
+    ciclos = -(-len(valores) // periodo)
+    relleno = np.full((ciclos * periodo - len(valores), valores.shape[1]), np.nan)
+    por_posicion = np.nanmean(np.vstack([sin_tendencia, relleno]).reshape(ciclos, periodo, -1), axis=0)
+    por_posicion -= por_posicion.mean(axis=0)
+    estacional = por_posicion[np.arange(len(valores)) % periodo]
+
+    def marco(datos):
+        return pd.DataFrame(datos, index=series.index, columns=series.columns)
+
+    return {'tendencia': marco(tendencia), 'estacional': marco(estacional),
+            'residuo': marco(valores - tendencia - estacional)}
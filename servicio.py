@@ -0,0 +1,400 @@
+"""
+Servicio HTTP local de solo lectura con las tablas del EDA y los KPIs en JSON.
+
+El CSV limpio se lee y compacta una única vez al iniciar. Las rutas son:
+
+* GET /tablas: nombres de las tablas disponibles.
+* GET /tablas/<nombre>: una tabla de 'agregaciones.tablas_eda'.
+* GET /kpis: el histórico de los tres KPIs de 'kpis.calcular_historico'.
+* GET /salud: filas cargadas y estado de la caché.
+
+Todas aceptan los filtros 'anio', 'comuna' y 'victima' (uno o varios valores separados por
+comas) y 'desde' / 'hasta' (fechas AAAA-MM-DD inclusivas). En las tablas, los filtros se
+aplican a las víctimas. En los KPIs, 'comuna' y 'victima' filtran las víctimas, mientras que
+el año y las fechas seleccionan los meses del resultado, para que las ventanas previas del
+primer mes pedido sigan contando; las tasas siempre usan la población de toda la ciudad.
+'/kpis' acepta además los largos de ventana 'meses_tasa', 'meses_moto' y 'meses_avenida'.
+
+Las respuestas se guardan en una caché LRU con vencimiento, con la ruta y los parámetros
+normalizados como clave, de modo que '?anio=2021,2020' y '?anio=2020&anio=2021' comparten
+la entrada. El ETag depende solo de la versión de los datos y de esa clave: una petición con
+'If-None-Match' vigente recibe 304 sin calcular nada. Las peticiones iguales que llegan
+mientras una se calcula esperan ese mismo cálculo, que corre en un hilo aparte para no
+bloquear el bucle de eventos.
+
+Uso:
+    python servicio.py [--ruta Data/homicidios_limpio.csv] [--puerto 8000] [--ttl 300]
+"""
+import argparse
+import asyncio
+import collections
+import datetime
+import hashlib
+import json
+import os
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import agregaciones
+import kpis
+from compactacion import compactar
+
+RUTA_LIMPIO = 'Data/homicidios_limpio.csv'
+
+FILTROS = ('anio', 'comuna', 'victima', 'desde', 'hasta')
+
+VENTANAS_KPI = ('meses_tasa', 'meses_moto', 'meses_avenida')
+
+# Columnas de 'kpis.calcular_historico' que son conteos, aunque el histórico las calcule en float
+CONTEOS_KPI = ['Víctimas', 'Víctimas moto', 'Víctimas moto previas', 'Víctimas avenida']
+
+ESTADOS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+# Límite de la línea de petición y de cada encabezado, en bytes
+LIMITE_LINEA = 8192
+
+
+class ErrorPeticion(Exception):
+    """
+    Petición inválida; se responde con el código y el mensaje indicados.
+    """
+
+    def __init__(self, codigo, mensaje):
+        super().__init__(mensaje)
+        self.codigo = codigo
+        self.mensaje = mensaje
+
+
+class CacheLRU:
+    """
+    Caché de respuestas con desalojo del menos usado y vencimiento por tiempo.
+
+    Parameters:
+        capacidad (int): Cantidad máxima de entradas.
+        ttl (float): Segundos de validez de cada entrada; None para que no venzan.
+        reloj (callable): Función que devuelve el tiempo actual en segundos.
+    """
+
+    def __init__(self, capacidad=1024, ttl=300, reloj=time.monotonic):
+        self.capacidad = capacidad
+        self.ttl = ttl
+        self.reloj = reloj
+        self.entradas = collections.OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave):
+        entrada = self.entradas.get(clave)
+        if entrada is None or (self.ttl is not None and self.reloj() - entrada[0] > self.ttl):
+            if entrada is not None:
+                del self.entradas[clave]
+            self.fallos += 1
+            return None
+        self.entradas.move_to_end(clave)
+        self.aciertos += 1
+        return entrada[1]
+
+    def guardar(self, clave, valor):
+        self.entradas[clave] = (self.reloj(), valor)
+        self.entradas.move_to_end(clave)
+        while len(self.entradas) > self.capacidad:
+            self.entradas.popitem(last=False)
+
+    def estado(self):
+        return {'entradas': len(self.entradas), 'capacidad': self.capacidad,
+                'aciertos': self.aciertos, 'fallos': self.fallos}
+
+
+def _enteros(nombre, valores):
+    try:
+        return tuple(sorted({int(v) for v in valores}))
+    except ValueError:
+        raise ErrorPeticion(400, f"'{nombre}' debe ser una lista de enteros") from None
+
+
+def _fecha(nombre, valores):
+    if len(valores) != 1:
+        raise ErrorPeticion(400, f"'{nombre}' admite una sola fecha")
+    try:
+        return datetime.date.fromisoformat(valores[0]).isoformat()
+    except ValueError:
+        raise ErrorPeticion(400, f"'{nombre}' debe ser una fecha AAAA-MM-DD") from None
+
+
+def normalizar_parametros(consulta, permitidos=FILTROS):
+    """
+    Convierte la cadena de consulta en una tupla ordenada y canónica, usada como clave de caché.
+
+    Los valores repetidos o separados por comas se unen, se ordenan y se deduplican; los
+    vehículos se pasan a mayúsculas y las fechas a formato ISO.
+
+    Parameters:
+        consulta (str): La cadena de consulta de la URL, sin el '?'.
+        permitidos (tuple): Nombres de parámetros aceptados.
+
+    Returns:
+        tuple: Pares (nombre, valor) ordenados por nombre, sin los parámetros vacíos.
+    """
+    crudos = collections.defaultdict(list)
+    for nombre, valor in urllib.parse.parse_qsl(consulta, keep_blank_values=False):
+        nombre = nombre.strip().lower()
+        if nombre not in permitidos:
+            raise ErrorPeticion(400, f"Parámetro desconocido '{nombre}'; se aceptan {list(permitidos)}")
+        crudos[nombre].extend(v.strip() for v in valor.split(',') if v.strip())
+
+    normalizados = {}
+    for nombre, valores in crudos.items():
+        if not valores:
+            continue
+        if nombre in ('desde', 'hasta'):
+            normalizados[nombre] = _fecha(nombre, valores)
+        elif nombre == 'victima':
+            normalizados[nombre] = tuple(sorted({v.upper() for v in valores}))
+        elif nombre in VENTANAS_KPI:
+            meses = _enteros(nombre, valores)
+            if len(meses) != 1 or meses[0] < 1:
+                raise ErrorPeticion(400, f"'{nombre}' debe ser un único entero positivo")
+            normalizados[nombre] = meses[0]
+        else:
+            normalizados[nombre] = _enteros(nombre, valores)
+    if normalizados.get('desde', '') > normalizados.get('hasta', '9999'):
+        raise ErrorPeticion(400, "'desde' es posterior a 'hasta'")
+    return tuple(sorted(normalizados.items()))
+
+
+def _mascara_fechas(fechas, parametros):
+    fechas = np.asarray(fechas, dtype='datetime64[D]')
+    mascara = np.ones(len(fechas), dtype=bool)
+    if 'desde' in parametros:
+        mascara &= fechas >= np.datetime64(parametros['desde'])
+    if 'hasta' in parametros:
+        mascara &= fechas <= np.datetime64(parametros['hasta'])
+    return mascara
+
+
+class ServicioAnalitico:
+    """
+    Datos en memoria, cálculo de las respuestas y caché del servicio.
+
+    Parameters:
+        df (pd.DataFrame): El DataFrame limpio de homicidios; se compacta al construir el servicio.
+        version (str): Identificador de los datos, parte de cada ETag.
+        capacidad (int): Entradas máximas de la caché.
+        ttl (float): Segundos de validez de cada entrada de la caché.
+    """
+
+    def __init__(self, df, version, capacidad=1024, ttl=300):
+        self.df = compactar(df)
+        self.version = version
+        self.cache = CacheLRU(capacidad, ttl)
+        self.ttl = ttl
+        self.pendientes = {}
+        # Un solo hilo de cálculo: con un núcleo, más hilos solo compiten por el GIL
+        self.ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='servicio')
+        self.tablas = list(agregaciones.tablas_eda(self.df))
+
+    @classmethod
+    def desde_csv(cls, ruta=RUTA_LIMPIO, **kwargs):
+        """
+        Lee el CSV limpio y usa su tamaño y fecha de modificación como versión de los datos.
+        """
+        datos = os.stat(ruta)
+        version = hashlib.sha1(f'{os.path.abspath(ruta)}:{datos.st_size}:{datos.st_mtime_ns}'.encode()).hexdigest()[:12]
+        return cls(pd.read_csv(ruta), version, **kwargs)
+
+    def filtrar(self, parametros):
+        """
+        Devuelve las víctimas que cumplen los filtros de 'anio', 'comuna', 'victima' y fechas.
+        """
+        df = self.df
+        mascara = _mascara_fechas(df['Fecha'], parametros)
+        if 'anio' in parametros:
+            mascara &= df['Año'].isin(parametros['anio']).to_numpy()
+        if 'comuna' in parametros:
+            mascara &= df['Comuna'].isin(parametros['comuna']).to_numpy()
+        if 'victima' in parametros:
+            mascara &= df['Víctima'].isin(parametros['victima']).to_numpy()
+        return df if mascara.all() else df[mascara]
+
+    def etag(self, ruta, parametros):
+        clave = repr((self.version, ruta, parametros)).encode()
+        return '"' + hashlib.sha1(clave).hexdigest()[:20] + '"'
+
+    def calcular(self, ruta, parametros):
+        """
+        Calcula los cuerpos JSON de una ruta con parámetros ya normalizados.
+
+        Para '/tablas/' se calculan de una vez todas las tablas con esos filtros, ya que un
+        tablero suele pedir varias y 'agregaciones.tablas_eda' comparte las columnas derivadas.
+
+        Returns:
+            dict: El JSON codificado en UTF-8 de cada ruta calculada.
+        """
+        parametros = dict(parametros)
+        if ruta == '/tablas':
+            return {ruta: json.dumps({'tablas': self.tablas}, ensure_ascii=False).encode()}
+        if ruta == '/kpis':
+            ventanas = {nombre: parametros.pop(nombre) for nombre in VENTANAS_KPI if nombre in parametros}
+            seleccion = {nombre: parametros.pop(nombre) for nombre in ('anio', 'desde', 'hasta')
+                         if nombre in parametros}
+            victimas = self.filtrar(parametros)
+            if victimas.empty:
+                return {ruta: b'[]'}
+            historico = kpis.calcular_historico(victimas, **ventanas)
+            fin_de_mes = pd.to_datetime(pd.DataFrame({'year': historico['Año'], 'month': historico['Mes'],
+                                                      'day': 1})) + pd.offsets.MonthEnd(0)
+            mascara = _mascara_fechas(fin_de_mes, seleccion)
+            if 'anio' in seleccion:
+                mascara &= historico['Año'].isin(seleccion['anio']).to_numpy()
+            historico = historico[mascara].astype(dict.fromkeys(CONTEOS_KPI, 'int64'))
+            return {ruta: historico.to_json(orient='records', force_ascii=False).encode()}
+        victimas = self.filtrar(parametros)
+        if victimas.empty:
+            return {f'/tablas/{nombre}': b'[]' for nombre in self.tablas}
+        return {f'/tablas/{nombre}': tabla.to_json(orient='records', force_ascii=False).encode()
+                for nombre, tabla in agregaciones.tablas_eda(victimas).items()}
+
+    async def responder(self, ruta, parametros):
+        """
+        Devuelve el cuerpo de la respuesta desde la caché o calculándolo una sola vez por clave.
+        """
+        cuerpo = self.cache.obtener((ruta, parametros))
+        if cuerpo is not None:
+            return cuerpo
+        calculo = ('/tablas/' if ruta.startswith('/tablas/') else ruta, parametros)
+        pendiente = self.pendientes.get(calculo)
+        if pendiente is None:
+            pendiente = asyncio.get_running_loop().run_in_executor(self.ejecutor, self.calcular, *calculo)
+            self.pendientes[calculo] = pendiente
+
+            def terminar(futuro):
+                del self.pendientes[calculo]
+                if not futuro.cancelled() and futuro.exception() is None:
+                    for calculada, cuerpo in futuro.result().items():
+                        self.cache.guardar((calculada, parametros), cuerpo)
+
+            pendiente.add_done_callback(terminar)
+        # Si el cliente se desconecta, el cálculo sigue para las demás peticiones que lo esperan
+        return (await asyncio.shield(pendiente))[ruta]
+
+    def salud(self):
+        return json.dumps({'filas': len(self.df), 'version': self.version,
+                           'cache': self.cache.estado()}).encode()
+
+    async def atender(self, metodo, objetivo, encabezados):
+        """
+        Resuelve una petición y devuelve (código, encabezados, cuerpo).
+        """
+        if metodo not in ('GET', 'HEAD'):
+            raise ErrorPeticion(405, f'Método {metodo} no permitido')
+        url = urllib.parse.urlsplit(objetivo)
+        ruta = url.path.rstrip('/') or '/'
+        if ruta == '/salud':
+            return 200, {'Cache-Control': 'no-store'}, self.salud()
+        if ruta == '/tablas' or ruta.startswith('/tablas/'):
+            parametros = normalizar_parametros(url.query)
+        elif ruta == '/kpis':
+            parametros = normalizar_parametros(url.query, FILTROS + VENTANAS_KPI)
+        else:
+            raise ErrorPeticion(404, f"Ruta desconocida '{ruta}'")
+        if ruta.startswith('/tablas/') and ruta.removeprefix('/tablas/') not in self.tablas:
+            raise ErrorPeticion(404, f"Tabla desconocida '{ruta.removeprefix('/tablas/')}'")
+
+        etag = self.etag(ruta, parametros)
+        cabeceras = {'ETag': etag, 'Cache-Control': f'max-age={int(self.ttl or 0)}'}
+        condicion = encabezados.get('if-none-match', '')
+        if condicion and (condicion.strip() == '*' or etag in (e.strip() for e in condicion.split(','))):
+            return 304, cabeceras, b''
+        return 200, cabeceras, await self.responder(ruta, parametros)
+
+    async def conexion(self, lector, escritor):
+        """
+        Atiende las peticiones HTTP/1.1 de una conexión, con keep-alive.
+        """
+        try:
+            while True:
+                try:
+                    linea = await lector.readline()
+                except (ConnectionError, ValueError):
+                    break
+                if not linea:
+                    break
+                partes = linea.decode('latin-1').split()
+                encabezados = {}
+                while True:
+                    cabecera = await lector.readline()
+                    if cabecera in (b'\r\n', b'\n', b''):
+                        break
+                    nombre, _, valor = cabecera.decode('latin-1').partition(':')
+                    encabezados[nombre.strip().lower()] = valor.strip()
+
+                version = partes[2] if len(partes) == 3 else 'HTTP/1.0'
+                conexion = encabezados.get('connection', '').lower()
+                mantener = conexion == 'keep-alive' if version == 'HTTP/1.0' else conexion != 'close'
+                try:
+                    if len(partes) != 3 or len(linea) > LIMITE_LINEA:
+                        raise ErrorPeticion(400, 'Línea de petición inválida')
+                    codigo, cabeceras, cuerpo = await self.atender(partes[0], partes[1], encabezados)
+                except ErrorPeticion as error:
+                    codigo, cabeceras = error.codigo, {}
+                    cuerpo = json.dumps({'error': error.mensaje}, ensure_ascii=False).encode()
+                except Exception as error:
+                    codigo, cabeceras = 500, {}
+                    cuerpo = json.dumps({'error': f'{type(error).__name__}: {error}'}, ensure_ascii=False).encode()
+
+                cabeceras = {'Content-Type': 'application/json; charset=utf-8',
+                             'Content-Length': str(len(cuerpo)),
+                             'Connection': 'keep-alive' if mantener else 'close', **cabeceras}
+                respuesta = [f'HTTP/1.1 {codigo} {ESTADOS[codigo]}']
+                respuesta += [f'{nombre}: {valor}' for nombre, valor in cabeceras.items()]
+                escritor.write(('\r\n'.join(respuesta) + '\r\n\r\n').encode('latin-1'))
+                if partes[:1] != ['HEAD']:
+                    escritor.write(cuerpo)
+                await escritor.drain()
+                if not mantener:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            escritor.close()
+
+    async def servir(self, host='127.0.0.1', puerto=8000, listo=None):
+        """
+        Escucha en host:puerto hasta que se cancele la tarea.
+
+        Parameters:
+            host (str): Dirección en la que escuchar.
+            puerto (int): Puerto TCP; 0 elige uno libre.
+            listo (callable, opcional): Se llama con el puerto efectivo cuando el servidor escucha.
+        """
+        servidor = await asyncio.start_server(self.conexion, host, puerto, backlog=1024, limit=LIMITE_LINEA * 2)
+        if listo is not None:
+            listo(servidor.sockets[0].getsockname()[1])
+        async with servidor:
+            await servidor.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ruta', default=RUTA_LIMPIO)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8000)
+    parser.add_argument('--ttl', type=float, default=300, help='Segundos de validez de la caché')
+    parser.add_argument('--capacidad', type=int, default=1024, help='Entradas máximas de la caché')
+    args = parser.parse_args()
+
+    servicio = ServicioAnalitico.desde_csv(args.ruta, capacidad=args.capacidad, ttl=args.ttl)
+    try:
+        asyncio.run(servicio.servir(args.host, args.puerto,
+                                    listo=lambda puerto: print(f'Escuchando en http://{args.host}:{puerto}', flush=True)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Generador de datos sintéticos con la forma de 'Data/homicidios.xlsx' y del CSV limpio.
+
+Los hechos se generan remuestreando con reposición filas reales: cada hecho sintético
+copia un hecho real con todas sus víctimas, de modo que se conservan tanto las
+distribuciones de 'Rol', 'Víctima', 'Acusado', 'Tipo de calle', 'Comuna' y 'Hora' como
+las relaciones entre columnas (por ejemplo, 'Cantidad víctimas' con las filas de víctimas).
+Cada copia recibe un 'Id' nuevo y sus coordenadas se desplazan unos metros, para que los
+hechos no se superpongan exactamente. Todo el muestreo es vectorizado; la memoria crece
+linealmente con la cantidad de filas (las columnas de texto son de tipo object), por lo
+que las escalas más grandes (decenas de millones de filas) conviene generarlas por bloques
+con 'bloques_limpios'.
+"""
+import numpy as np
+import pandas as pd
+
+from etl import RUTA_FUENTE, RUTA_LIMPIO, leer_fuente
+
+COLUMNAS_DISTRIBUCION = ['Rol', 'Víctima', 'Acusado', 'Tipo de calle', 'Comuna', 'Hora']
+
+# Desvío, en metros, del desplazamiento aplicado a las coordenadas de cada copia
+DESVIO_METROS = 50.0
+
+
+def _ids(cantidad, prefijo):
+    return prefijo + pd.Series(np.arange(1, cantidad + 1)).astype(str).str.zfill(len(str(cantidad)))
+
+
+def _desplazar_xy(serie, rng):
+    """
+    Suma un desplazamiento normal a los textos 'Point (x y)'; los demás valores no cambian.
+    """
+    coordenadas = serie.astype(str).str.extract(r'^Point \(([-\d.]+) ([-\d.]+)\)$')
+    x = pd.to_numeric(coordenadas[0], errors='coerce')
+    y = pd.to_numeric(coordenadas[1], errors='coerce')
+    validos = (x.notna() & y.notna() & ((x != 0) | (y != 0))).to_numpy()
+    resultado = serie.to_numpy(dtype=object, copy=True)
+    if validos.any():
+        dx, dy = rng.normal(0, DESVIO_METROS, (2, validos.sum()))
+        resultado[validos] = ('Point (' + (x[validos] + dx).round(8).astype(str) + ' '
+                              + (y[validos] + dy).round(8).astype(str) + ')').to_numpy()
+    return pd.Series(resultado, index=serie.index)
+
+
+def generar_fuente(hechos, semilla=0, ruta=RUTA_FUENTE, prefijo='S'):
+    """
+    Genera tablas HECHOS y VICTIMAS sintéticas, con las columnas normalizadas de etl.leer_fuente.
+
+    Parameters:
+        hechos (int): Cantidad de hechos a generar; las víctimas son aproximadamente un 3 % más.
+        semilla (int): Semilla del generador aleatorio.
+        ruta (str): Ruta al Excel fuente del que se toman las filas reales.
+        prefijo (str): Prefijo de los 'Id' sintéticos, para no confundirlos con los reales.
+
+    Returns:
+        tuple: Los DataFrames de hechos y de víctimas.
+    """
+    rng = np.random.default_rng(semilla)
+    reales, victimas_reales = leer_fuente(ruta)
+
+    # Las víctimas de cada hecho real forman un rango contiguo una vez ordenadas por 'Id'
+    victimas_reales = victimas_reales.sort_values('Id', kind='stable').reset_index(drop=True)
+    inicios = victimas_reales['Id'].searchsorted(reales['Id'], side='left')
+    cantidades = victimas_reales['Id'].searchsorted(reales['Id'], side='right') - inicios
+
+    elegidos = rng.integers(0, len(reales), hechos)
+    sinteticos = reales.iloc[elegidos].reset_index(drop=True)
+    sinteticos['Id'] = _ids(hechos, prefijo)
+    sinteticos['XY (CABA)'] = _desplazar_xy(sinteticos['XY (CABA)'], rng)
+
+    por_hecho = cantidades[elegidos]
+    desde = np.repeat(inicios[elegidos], por_hecho)
+    desplazamiento = np.arange(por_hecho.sum()) - np.repeat(np.cumsum(por_hecho) - por_hecho, por_hecho)
+    victimas = victimas_reales.iloc[desde + desplazamiento].reset_index(drop=True)
+    victimas['Id'] = np.repeat(sinteticos['Id'].to_numpy(), por_hecho)
+    return sinteticos, victimas
+
+
+def generar_limpio(filas, semilla=0, ruta=RUTA_LIMPIO, prefijo='S'):
+    """
+    Genera un DataFrame limpio sintético, con las columnas de 'Data/homicidios_limpio.csv'.
+
+    Las víctimas de un mismo hecho real se copian juntas, por lo que la cantidad de filas
+    puede superar levemente a 'filas'.
+
+    Parameters:
+        filas (int): Cantidad aproximada de víctimas a generar.
+        semilla (int): Semilla del generador aleatorio.
+        ruta (str): Ruta al CSV limpio del que se toman las filas reales.
+        prefijo (str): Prefijo de los 'Id' sintéticos.
+
+    Returns:
+        pd.DataFrame: El DataFrame limpio sintético.
+    """
+    rng = np.random.default_rng(semilla)
+    reales = pd.read_csv(ruta)
+    codigos, ids = pd.factorize(reales['Id'])
+    posiciones = np.argsort(codigos, kind='stable')
+    cantidades = np.bincount(codigos)
+    inicios = np.cumsum(cantidades) - cantidades
+
+    hechos = max(1, int(round(filas * len(ids) / len(reales))))
+    elegidos = rng.integers(0, len(ids), hechos)
+    por_hecho = cantidades[elegidos]
+    desde = np.repeat(inicios[elegidos], por_hecho)
+    desplazamiento = np.arange(por_hecho.sum()) - np.repeat(np.cumsum(por_hecho) - por_hecho, por_hecho)
+    limpio = reales.iloc[posiciones[desde + desplazamiento]].reset_index(drop=True)
+    limpio['Id'] = np.repeat(_ids(hechos, prefijo).to_numpy(), por_hecho)
+    limpio['XY (CABA)'] = _desplazar_xy(limpio['XY (CABA)'], rng)
+    return limpio
+
+
+def bloques_limpios(filas, tamaño=1_000_000, semilla=0, ruta=RUTA_LIMPIO):
+    """
+    Genera un DataFrame limpio sintético por bloques, sin tenerlo entero en memoria.
+
+    Cada bloque usa su propia semilla y un prefijo de 'Id' distinto, por lo que los 'Id' no
+    se repiten entre bloques. El resultado puede consumirse con 'bloques.ResumenPorBloques'
+    o escribirse a disco bloque a bloque.
+
+    Parameters:
+        filas (int): Cantidad aproximada total de víctimas a generar.
+        tamaño (int): Cantidad aproximada de víctimas por bloque.
+        semilla (int): Semilla del primer bloque; el bloque i usa semilla + i.
+        ruta (str): Ruta al CSV limpio del que se toman las filas reales.
+
+    Yields:
+        pd.DataFrame: Cada bloque del DataFrame limpio sintético.
+    """
+    for numero, inicio in enumerate(range(0, filas, tamaño)):
+        yield generar_limpio(min(tamaño, filas - inicio), semilla + numero, ruta, prefijo=f'S{numero}-')
+
+
+def comparar_distribuciones(real, sintetico, columnas=COLUMNAS_DISTRIBUCION):
+    """
+    Compara las proporciones de cada valor entre los datos reales y los sintéticos.
+
+    Parameters:
+        real (pd.DataFrame): Los datos reales.
+        sintetico (pd.DataFrame): Los datos sintéticos.
+        columnas (list): Columnas a comparar; se omiten las que no están en ambos.
+
+    Returns:
+        pd.DataFrame: Para cada columna, la máxima diferencia absoluta de proporción entre un
+            valor real y el sintético ('Diferencia máxima') y la distancia de variación total.
+    """
+    filas = []
+    for columna in columnas:
+        if columna not in real.columns or columna not in sintetico.columns:
+            continue
+        p = real[columna].astype(str).value_counts(normalize=True)
+        q = sintetico[columna].astype(str).value_counts(normalize=True)
+        diferencia = p.sub(q, fill_value=0).abs()
+        filas.append({'Columna': columna, 'Diferencia máxima': diferencia.max(),
+                      'Variación total': diferencia.sum() / 2})
+    return pd.DataFrame(filas)
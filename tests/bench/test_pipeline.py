@@ -0,0 +1,143 @@
+"""
+Mide el tiempo de cada etapa del pipeline sobre datos sintéticos de distintas escalas.
+
+Para cada escala se generan con 'sinteticos' las tablas HECHOS y VICTIMAS y un DataFrame
+limpio con las distribuciones de los datos reales, y se miden la limpieza del ETL, el merge
+de hechos con víctimas, las funciones de 'Utils' que no grafican, cada tabla de
+'agregaciones' y los KPIs. Cada etapa recibe una copia nueva de los datos en cada ronda
+(así las columnas derivadas cacheadas no se arrastran).
+
+Los benchmarks no corren con 'pytest -q'; se activan pasando las escalas, y las regresiones
+se controlan con el historial de pytest-benchmark:
+    python -m pytest tests/bench --escalas 10000,100000 --benchmark-autosave
+    python -m pytest tests/bench --escalas 10000,100000 --benchmark-compare --benchmark-compare-fail=min:25%
+"""
+import contextlib
+import functools
+import io
+
+import pytest
+
+import agregaciones
+import compactacion
+import demografia
+import etl
+import kpis
+import sinteticos
+import Utils
+import validacion
+
+pytestmark = pytest.mark.bench
+
+RONDAS = 3
+SEMILLA = 0
+
+TABLAS = [
+    ('victimas_mensuales_por_anio', agregaciones.tabla_victimas_mensuales_por_anio),
+    ('accidentes_por_mes', agregaciones.tabla_accidentes_por_mes),
+    ('victimas_por_dia_semana', agregaciones.tabla_victimas_por_dia_semana),
+    ('accidentes_por_categoria_tiempo', agregaciones.tabla_accidentes_por_categoria_tiempo),
+    ('accidentes_por_hora_del_dia', agregaciones.tabla_accidentes_por_hora_del_dia),
+    ('accidentes_semana_fin_de_semana', agregaciones.tabla_accidentes_semana_fin_de_semana),
+    ('estadisticas_edad', agregaciones.tabla_estadisticas_edad),
+    ('accidentes_por_anio_y_sexo', agregaciones.tabla_accidentes_por_anio_y_sexo),
+    ('victimas_por_sexo', agregaciones.tabla_victimas_por_sexo),
+    ('victimas_por_rol_y_sexo', agregaciones.tabla_victimas_por_rol_y_sexo),
+    ('victimas_por_victima_y_sexo', agregaciones.tabla_victimas_por_victima_y_sexo),
+    ('victimas_por_participantes', agregaciones.tabla_victimas_por_participantes),
+    ('acusados', agregaciones.tabla_acusados),
+    ('victimas_por_tipo_de_calle', agregaciones.tabla_victimas_por_tipo_de_calle),
+    ('victimas_por_cruce', agregaciones.tabla_victimas_por_cruce),
+]
+
+
+def _silencioso(funcion):
+    """
+    Envuelve una función de 'Utils' que imprime, descartando su salida.
+    """
+    def envuelta(*args, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return funcion(*args, **kwargs)
+    return envuelta
+
+
+def _agregar_mes(contexto, df):
+    motor = kpis.MotorKPI()
+    motor.contadores = {indice: dict(por_comuna) for indice, por_comuna in contexto['base'].contadores.items()}
+    motor.agregar(df[contexto['ultimo']])
+    return motor.historico()
+
+
+# Cada etapa recibe el contexto preparado para la escala y copias de los datos de entrada
+ETAPAS_FUENTE = {
+    'etl.calcular_huellas': lambda c, h, v: etl.calcular_huellas(h, v),
+    'validacion.validar fuente': lambda c, h, v: validacion.validar({'hechos': h, 'victimas': v}),
+    'etl.limpiar_lote': lambda c, h, v: etl.limpiar_lote(h, v, c['huellas'], etl.EstadoETL()),
+    'merge hechos-víctimas': lambda c, h, v: c['victimas_limpias'].merge(c['hechos_limpios'], on='Id', how='left'),
+    'Utils.convertir_serie_a_time': lambda c, h, v: Utils.convertir_serie_a_time(h['Hora']),
+    'Utils.imputar_edad_promedio_por_sexo': lambda c, h, v: _silencioso(Utils.imputar_edad_promedio_por_sexo)(
+        v.assign(Sexo=c['sexo'])),
+}
+
+ETAPAS_LIMPIO = {
+    'Utils.resumen_columnas': lambda c, df: Utils.resumen_columnas(df),
+    'Utils.tipos_de_variables': lambda c, df: Utils.tipos_de_variables(df),
+    'Utils.top_10_valores_repetidos': lambda c, df: _silencioso(Utils.top_10_valores_repetidos)(df, 'Calle'),
+    'compactacion.compactar': lambda c, df: compactacion.compactar(df),
+    'validacion.validar limpio compacto': lambda c, df: validacion.validar({'limpio': c['compacto']},
+                                                                            validacion.REGLAS_LIMPIO),
+    'demografia.TablaCruzada.construir': lambda c, df: demografia.TablaCruzada.construir(df),
+    **{f'agregaciones.{nombre}': (lambda tabla: lambda c, df: tabla(df))(tabla) for nombre, tabla in TABLAS},
+    'agregaciones.tablas_eda': lambda c, df: agregaciones.tablas_eda(df),
+    'kpis.calcular_historico': lambda c, df: kpis.calcular_historico(df),
+    'kpis.calcular_historico por comuna': lambda c, df: kpis.calcular_historico(df, por_comuna=True),
+    'kpis.MotorKPI mes nuevo': _agregar_mes,
+}
+
+
+def pytest_generate_tests(metafunc):
+    if 'escala' in metafunc.fixturenames:
+        escalas = metafunc.config.getoption('--escalas') or '10000'
+        metafunc.parametrize('escala', [int(escala) for escala in escalas.split(',')], scope='module')
+
+
+@pytest.fixture(scope='module')
+def fuente(escala):
+    # Los hechos se escalan para que sus víctimas ronden la cantidad pedida
+    hechos, victimas = sinteticos.generar_fuente(max(1, round(escala / 1.03)), SEMILLA)
+    huellas = etl.calcular_huellas(hechos, victimas)
+    hechos_limpios, victimas_limpias = etl.limpiar_lote(hechos, victimas, huellas, etl.EstadoETL())
+    # Como en EDA_Parte_1, el sexo se imputa antes que la edad promedio por sexo
+    sexo = victimas['Sexo'].replace('SD', victimas['Sexo'].mode()[0])
+    contexto = {'huellas': huellas, 'hechos_limpios': hechos_limpios, 'victimas_limpias': victimas_limpias,
+                'sexo': sexo}
+    return contexto, (hechos, victimas)
+
+
+@pytest.fixture(scope='module')
+def limpio_sintetico(escala):
+    limpio = sinteticos.generar_limpio(escala, SEMILLA)
+    # El motor incremental recibe todos los meses menos el último, que se agrega al medir
+    meses = limpio['Año'] * 12 + limpio['Mes']
+    ultimo = meses == meses.max()
+    base = kpis.MotorKPI()
+    base.agregar(limpio[~ultimo])
+    contexto = {'compacto': compactacion.compactar(limpio), 'ultimo': ultimo, 'base': base}
+    return contexto, (limpio,)
+
+
+def _medir(benchmark, etapa, contexto, datos):
+    benchmark.pedantic(functools.partial(etapa, contexto),
+                       setup=lambda: (tuple(dato.copy() for dato in datos), {}), rounds=RONDAS)
+
+
+@pytest.mark.parametrize('etapa', ETAPAS_FUENTE)
+def test_etapa_fuente(benchmark, fuente, etapa):
+    benchmark.group = etapa
+    _medir(benchmark, ETAPAS_FUENTE[etapa], *fuente)
+
+
+@pytest.mark.parametrize('etapa', ETAPAS_LIMPIO)
+def test_etapa_limpio(benchmark, limpio_sintetico, etapa):
+    benchmark.group = etapa
+    _medir(benchmark, ETAPAS_LIMPIO[etapa], *limpio_sintetico)
@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+RUTA_LIMPIO = os.path.join(RAIZ, 'Data', 'homicidios_limpio.csv')
+
+
+@pytest.fixture(autouse=True)
+def _en_raiz(monkeypatch):
+    # Los módulos usan rutas relativas a la raíz del repositorio, como 'Data/poblacionCABA.csv'
+    monkeypatch.chdir(RAIZ)
+
+
+@pytest.fixture(scope='session')
+def _limpio():
+    return pd.read_csv(RUTA_LIMPIO)
+
+
+@pytest.fixture
+def limpio(_limpio):
+    """
+    Una copia de 'Data/homicidios_limpio.csv', que cada test puede modificar.
+    """
+    return _limpio.copy()
+
+
+def pytest_addoption(parser):
+    parser.addoption('--escalas', default=None,
+                     help='Corre los benchmarks de tests/bench con estas escalas, en víctimas separadas '
+                          'por comas (por ejemplo 10000,100000).')
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'bench: benchmark del pipeline; solo corre si se pasa --escalas.')
+
+
+def pytest_collection_modifyitems(config, items):
+    # Los benchmarks son opcionales, para que 'pytest -q' siga siendo rápido
+    if config.getoption('--escalas'):
+        return
+    saltear = pytest.mark.skip(reason='benchmark del pipeline: pasar --escalas para correrlo')
+    for item in items:
+        if 'bench' in item.keywords:
+            item.add_marker(saltear)
@@ -0,0 +1,6 @@
+import almacen
+import compactacion
+
+
+def test_tabla_arrow_del_compactado_igual_a_la_del_limpio(limpio):
+    assert almacen.a_tabla_arrow(compactacion.compactar(limpio)).equals(almacen.a_tabla_arrow(limpio))
@@ -0,0 +1,26 @@
+"""
+Los resúmenes por bloques coinciden con los de 'Utils' sobre el DataFrame completo.
+"""
+import numpy as np
+import pandas as pd
+
+import bloques
+import Utils
+
+
+def test_tipos_de_variables_por_bloques(limpio):
+    partes = np.array_split(np.arange(len(limpio)), 7)
+    obtenidos = bloques.tipos_de_variables_por_bloques(limpio.iloc[parte] for parte in partes)
+    assert obtenidos == Utils.tipos_de_variables(limpio, vectorizado=False)
+
+
+def test_tipos_de_variables_por_bloques_con_nulos_en_extensiones():
+    completo = pd.DataFrame({'Entero': pd.array([1, 2, None, 4], dtype='Int64'),
+                             'Texto': pd.array(['a', 'b', 'c', None], dtype='string')})
+    # El primer bloque no tiene nulos; el segundo sí
+    obtenidos = bloques.tipos_de_variables_por_bloques([completo.iloc[:2], completo.iloc[2:]])
+    esperados = {columna: [] for columna in completo}
+    for bloque in [completo.iloc[:2], completo.iloc[2:]]:
+        for columna, tipos in Utils.tipos_de_variables(bloque, vectorizado=False).items():
+            esperados[columna].extend(tipo for tipo in tipos if tipo not in esperados[columna])
+    assert obtenidos == esperados
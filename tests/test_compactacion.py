@@ -0,0 +1,59 @@
+"""
+Las tablas del análisis exploratorio dan lo mismo sobre el DataFrame compactado.
+"""
+import warnings
+
+import pandas as pd
+import pytest
+
+import agregaciones
+import compactacion
+import sinteticos
+
+
+def _ordenada(tabla):
+    # Los empates de los conteos pueden quedar en otro orden en una columna categórica
+    tabla = tabla.reset_index(drop=True)
+    tabla = tabla.astype({columna: object for columna in tabla.columns
+                          if isinstance(tabla[columna].dtype, pd.CategoricalDtype)})
+    return tabla.sort_values(list(tabla.columns), kind='stable').reset_index(drop=True)
+
+
+@pytest.mark.parametrize('filtro', ['todo', 'comuna 1', 'motos 2020'])
+def test_tablas_eda_sobre_compactado(limpio, filtro):
+    mascara = {'todo': limpio['Año'] > 0,
+               'comuna 1': limpio['Comuna'] == 1,
+               'motos 2020': (limpio['Víctima'] == 'MOTO') & (limpio['Año'] == 2020)}[filtro].to_numpy()
+    compacto = compactacion.compactar(limpio)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        esperadas = agregaciones.tablas_eda(limpio[mascara])
+        obtenidas = agregaciones.tablas_eda(compacto[mascara])
+    for nombre, tabla in esperadas.items():
+        pd.testing.assert_frame_equal(_ordenada(tabla), _ordenada(obtenidas[nombre]),
+                                      check_dtype=False, check_index_type=False, obj=nombre)
+
+
+def test_expandir_reconstruye_id_y_xy(limpio):
+    compacto = compactacion.compactar(limpio)
+    assert 'Id' not in compacto and 'XY (CABA)' not in compacto
+    expandido = compactacion.expandir(compacto)
+    assert list(expandido.columns) == [columna for columna in limpio.columns
+                                       if columna not in compactacion.COLUMNAS_DERIVADAS]
+    for columna in ['Id', 'XY (CABA)', 'Hora']:
+        assert expandido[columna].tolist() == limpio[columna].tolist(), columna
+
+
+def test_expandir_con_valores_faltantes():
+    df = pd.DataFrame({'Id': ['2016-0001', None, 'ABC', '0099'],
+                       'XY (CABA)': ['Point (-1.50 2)', 0, None, 'Point (. .)']})
+    expandido = compactacion.expandir(compactacion.compactar(df))
+    assert expandido['Id'].tolist()[::2] == ['2016-0001', 'ABC'] and expandido['Id'].tolist()[3] == '0099'
+    assert pd.isna(expandido['Id'].iloc[1])
+    assert expandido['XY (CABA)'].tolist() == ['Point (-1.50 2)'] + [compactacion.CENTINELA_XY] * 3
+
+
+def test_reduccion_de_memoria_en_datos_sinteticos():
+    df = sinteticos.generar_limpio(100_000)
+    reporte = compactacion.reporte_memoria(df, compactacion.compactar(df))
+    assert reporte.loc['Total', 'Reducción'] >= 5
@@ -0,0 +1,56 @@
+"""
+Las consultas de DuckDB dan los mismos resultados que pandas.
+"""
+import warnings
+
+import pandas as pd
+import pytest
+
+import agregaciones
+import almacen
+import kpis
+
+duckdb = pytest.importorskip('duckdb')
+
+import consultas  # noqa: E402
+
+
+def _ordenada(tabla):
+    # Sin importar el orden de las filas con empates
+    tabla = tabla.reset_index(drop=True)
+    return tabla.sort_values(list(tabla.columns), kind='stable').reset_index(drop=True)
+
+
+def _esperadas(limpio):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        tablas = agregaciones.tablas_eda(limpio)
+    tablas['kpis'] = kpis.calcular_historico(limpio)
+    return tablas
+
+
+def _comparar(esperadas, consulta):
+    obtenidas = consulta.tablas_eda()
+    obtenidas['kpis'] = consulta.kpis_historico()
+    consulta.cerrar()
+    assert obtenidas.keys() == esperadas.keys()
+    for nombre, tabla in esperadas.items():
+        pd.testing.assert_frame_equal(_ordenada(tabla), _ordenada(obtenidas[nombre]),
+                                      check_dtype=False, check_column_type=False, obj=nombre)
+
+
+def test_tablas_desde_csv(limpio):
+    _comparar(_esperadas(limpio), consultas.ConsultasDuckDB(consultas.RUTA_LIMPIO))
+
+
+def test_tablas_desde_parquet_particionado(limpio, tmp_path):
+    ruta = str(tmp_path / 'homicidios_parquet')
+    almacen.escribir_parquet(limpio, ruta)
+    _comparar(_esperadas(limpio), consultas.ConsultasDuckDB(ruta))
+
+
+def test_consultar_con_parametros():
+    consulta = consultas.ConsultasDuckDB()
+    resultado = consulta.consultar('SELECT COUNT(*) AS n FROM homicidios WHERE "Año" = ?', [2021])
+    consulta.cerrar()
+    assert resultado['n'].item() == (pd.read_csv(consultas.RUTA_LIMPIO)['Año'] == 2021).sum()
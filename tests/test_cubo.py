@@ -0,0 +1,13 @@
+import numpy as np
+
+import cubo
+
+
+def test_dimensiones_faltantes_conservan_sus_victimas(limpio):
+    limpio.loc[limpio.index[:10], 'Comuna'] = np.nan
+    victimas_cubo = cubo.CuboVictimas.construir(limpio)
+    assert victimas_cubo.celdas['Víctimas'].sum() == len(limpio)
+    por_comuna = victimas_cubo.agrupar(['Comuna'], ['Víctimas'])
+    assert por_comuna['Víctimas'].sum() == len(limpio)
+    assert por_comuna.loc[por_comuna['Comuna'].isna(), 'Víctimas'].item() == 10
+    assert victimas_cubo.agrupar(['Comuna'], ['Víctimas'], dropna=True)['Víctimas'].sum() == len(limpio) - 10
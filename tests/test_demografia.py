@@ -0,0 +1,49 @@
+"""
+Los conteos, medias y cuantiles de la tabla cruzada coinciden con groupby sobre las filas.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import demografia
+
+
+@pytest.fixture(scope='module')
+def victimas(_limpio):
+    df = _limpio.copy()
+    df['Rango edad'] = df.derivadas['Rango edad']
+    return df
+
+
+@pytest.fixture(scope='module')
+def tabla(victimas):
+    return demografia.TablaCruzada.construir(victimas)
+
+
+@pytest.mark.parametrize('dimensiones', [['Sexo'], ['Rango edad', 'Sexo'], ['Rol', 'Víctima', 'Año']])
+def test_conteos_iguales_a_groupby(victimas, tabla, dimensiones):
+    esperados = victimas.groupby(dimensiones, observed=True).size()
+    esperados = esperados[esperados > 0]
+    obtenidos = tabla.conteos(dimensiones).set_index(dimensiones)
+    np.testing.assert_array_equal(obtenidos['Cantidad víctimas'].to_numpy(), esperados.to_numpy())
+    assert obtenidos.index.tolist() == esperados.index.tolist()
+    np.testing.assert_allclose(obtenidos['Porcentaje'], esperados / len(victimas) * 100)
+
+
+def test_porcentajes_dentro_de_un_grupo(tabla):
+    conteos = tabla.conteos(['Rango edad', 'Sexo'], dentro_de=['Rango edad'])
+    np.testing.assert_allclose(conteos.groupby('Rango edad', observed=True)['Porcentaje'].sum(), 100)
+
+
+@pytest.mark.parametrize('dimensiones', [[], ['Sexo'], ['Rol', 'Año']])
+def test_estadisticas_edad_iguales_a_groupby(victimas, tabla, dimensiones):
+    obtenidas = tabla.estadisticas_edad(dimensiones)
+    edades = victimas['Edad'].astype(float)
+    if dimensiones:
+        grupos = edades.groupby([victimas[d] for d in dimensiones], observed=True)
+        obtenidas = obtenidas.set_index(dimensiones)
+    else:
+        grupos = edades.groupby(np.zeros(len(edades)))
+    esperadas = pd.DataFrame({'Cantidad víctimas': grupos.size(), 'Edad media': grupos.mean(),
+                              **{f'Q{round(q * 100)}': grupos.quantile(q) for q in demografia.CUANTILES}})
+    np.testing.assert_allclose(obtenidas.to_numpy(dtype=float), esperadas.to_numpy(dtype=float))
@@ -0,0 +1,38 @@
+"""
+Caché de columnas derivadas del accesor df.derivadas.
+"""
+import pandas as pd
+
+import agregaciones
+
+
+def test_se_reutiliza_entre_accesos(limpio):
+    assert limpio.derivadas['Día semana'] is limpio.derivadas['Día semana']
+
+
+def test_escribir_una_columna_de_origen_invalida(limpio):
+    dia = limpio.derivadas['Día semana'].copy()
+    limpio.loc[0, 'Fecha'] = '2021-01-04'
+    assert limpio.derivadas['Día semana'].iloc[0] == 0 != dia.iloc[0]
+
+    rango = limpio.derivadas['Rango edad'].copy()
+    limpio.loc[5, 'Edad'] = 90
+    assert limpio.derivadas['Rango edad'].iloc[5] == '65+' != rango.iloc[5]
+
+
+def test_permutar_o_reindexar_invalida(limpio):
+    dia = limpio.derivadas['Día semana']
+    limpio['Fecha'] = limpio['Fecha'].to_numpy()[::-1]
+    assert limpio.derivadas['Día semana'].tolist() == dia.tolist()[::-1]
+
+    limpio.index = limpio.index + 1000
+    pd.testing.assert_index_equal(limpio.derivadas['Día semana'].index, limpio.index)
+
+
+def test_la_cache_se_libera_con_el_dataframe(limpio):
+    copia = limpio.copy()
+    copia.derivadas['Hora del día']
+    assert id(copia) in agregaciones._CACHES_DERIVADAS
+    clave = id(copia)
+    del copia
+    assert clave not in agregaciones._CACHES_DERIVADAS
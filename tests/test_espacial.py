@@ -0,0 +1,17 @@
+import numpy as np
+
+import espacial
+
+
+def test_indice_desde_df_con_datos_limpios(limpio):
+    indice = espacial.indice_desde_df(limpio)
+    x, y = espacial.parsear_xy(limpio['XY (CABA)'])
+    validos = ~(np.isnan(x) | np.isnan(y))
+    # Las coordenadas faltantes se guardan como 'Point (. .)' o 0 y quedan fuera del índice
+    assert 0 < validos.sum() < len(limpio)
+    assert indice.densidad()['Cantidad'].sum() == validos.sum()
+
+    centro = np.flatnonzero(validos)[0]
+    cercanos = indice.en_radio(x[centro], y[centro], 500)
+    distancias = np.hypot(x - x[centro], y - y[centro])
+    assert cercanos.tolist() == np.flatnonzero(validos & (distancias <= 500)).tolist()
@@ -0,0 +1,38 @@
+"""
+El estado acumulado del ETL no depende de cómo se parte la fuente en lotes.
+"""
+import pandas as pd
+import pytest
+
+import etl
+
+
+@pytest.fixture(scope='module')
+def fuente():
+    hechos, victimas = etl.leer_fuente()
+    return hechos, victimas, etl.calcular_huellas(hechos, victimas)
+
+
+def _estadisticas(estado):
+    return estado.horas, estado.sexos, estado.roles, {sexo: (pytest.approx(suma), cantidad)
+                                                      for sexo, (suma, cantidad) in estado.edades.items()}
+
+
+def test_lotes_y_retiros_equivalen_a_un_lote(fuente):
+    hechos, victimas, huellas = fuente
+    completo = etl.EstadoETL()
+    esperado = etl.limpiar_lote(hechos, victimas, huellas, completo)
+
+    ids = sorted(hechos['Id'].unique())
+    primeros, resto, repetidos = set(ids[:300]), set(ids[300:]), ids[100:120]
+    por_lotes = etl.EstadoETL()
+    lotes = [etl.limpiar_lote(hechos[hechos['Id'].isin(parte)], victimas[victimas['Id'].isin(parte)],
+                              huellas, por_lotes)
+             for parte in (primeros, resto)]
+    etl.limpiar_lote(hechos[hechos['Id'].isin(repetidos)], victimas[victimas['Id'].isin(repetidos)],
+                     huellas, por_lotes, retirados=repetidos)
+
+    assert _estadisticas(por_lotes) == _estadisticas(completo)
+    assert por_lotes.aportes.keys() == completo.aportes.keys()
+    hechos_lotes = pd.concat([hechos_lote for hechos_lote, _ in lotes]).sort_index()
+    pd.testing.assert_frame_equal(hechos_lotes[['Id', 'Hora']], esperado[0][['Id', 'Hora']].sort_index())
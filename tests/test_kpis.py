@@ -0,0 +1,11 @@
+import kpis
+
+
+def test_historico_sin_lotes_devuelve_tabla_vacia(limpio):
+    motor = kpis.MotorKPI()
+    assert motor.historico().empty
+    assert motor.historico().columns.tolist() == kpis.COLUMNAS_HISTORICO
+    assert motor.historico(por_comuna=True).columns.tolist() == ['Comuna'] + kpis.COLUMNAS_HISTORICO
+
+    motor.agregar(limpio)
+    assert motor.historico().columns.tolist() == kpis.COLUMNAS_HISTORICO
@@ -0,0 +1,24 @@
+import pytest
+
+import normalizacion
+
+
+@pytest.mark.parametrize('nombre, clave', [
+    ('3 DE FEBRERO', '3 FEBRERO'),
+    ('27 DE FEBRERO AV.', '27 FEBRERO'),
+    ('9 DE JULIO AV.', '9 JULIO'),
+    ('DE MAYO AV.', 'MAYO'),
+    ('FERNANDEZ DE LA CRUZ, F., GRAL. AV.', 'CRUZ FERNANDEZ GRAL'),
+])
+def test_canonizar_calle(nombre, clave):
+    assert normalizacion.canonizar_calle(nombre) == clave
+
+
+def test_calles_numeradas_distintas_no_se_unifican():
+    resolvedor = normalizacion.ResolvedorCalles(calles=['27 DE FEBRERO AV.', 'JULIO'])
+    assert resolvedor.resolver_calle('3 DE FEBRERO') == '3 FEBRERO'
+    assert resolvedor.resolver_calle('27 DE FEBRERO') == '27 FEBRERO'
+    assert resolvedor.resolver_calle('9 DE JULIO AV.') == '9 JULIO'
+    assert resolvedor.resolver_lugar('MONROE y 3 DE FEBRERO') == '3 FEBRERO Y MONROE'
+    # Los errores de tipeo se siguen unificando
+    assert resolvedor.resolver_calle('27 DE FEBRRERO') == '27 FEBRERO'
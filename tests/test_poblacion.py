@@ -0,0 +1,53 @@
+"""
+La tabla diaria de población coincide con la interpolación de los censos fecha por fecha.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import poblacion
+
+
+@pytest.fixture(scope='module')
+def censos():
+    return pd.read_csv(poblacion.RUTA_POBLACION)
+
+
+@pytest.mark.parametrize('metodo', poblacion.METODOS)
+def test_censos_al_1_de_enero(censos, metodo):
+    interpolada = poblacion.InterpolacionPoblacion(censos, metodo)
+    np.testing.assert_allclose(interpolada.anual(censos['Año']), censos['Población'])
+
+
+@pytest.mark.parametrize('metodo', poblacion.METODOS)
+def test_fechas_entre_censos(censos, metodo):
+    interpolada = poblacion.InterpolacionPoblacion(censos, metodo)
+    fechas = pd.to_datetime(['2016-07-01', '2019-03-15', '2021-12-31'])
+    fraccion = fechas.year + (fechas.dayofyear - 1) / np.where(fechas.is_leap_year, 366, 365)
+    anios, valores = censos['Año'].to_numpy(float), censos['Población'].to_numpy(float)
+    esperadas = (np.interp(fraccion, anios, valores) if metodo == 'lineal'
+                 else np.exp(np.interp(fraccion, anios, np.log(valores))))
+    np.testing.assert_allclose(interpolada.en_fechas(fechas), esperadas)
+
+
+def test_extrapola_con_el_ultimo_tramo(censos):
+    interpolada = poblacion.InterpolacionPoblacion(censos)
+    ultimos = censos.sort_values('Año').tail(2)
+    pendiente = np.diff(ultimos['Población']) / np.diff(ultimos['Año'])
+    esperada = ultimos['Población'].iloc[-1] + pendiente * (2030 - ultimos['Año'].iloc[-1])
+    np.testing.assert_allclose(interpolada.anual([2030]), esperada)
+
+
+def test_promedio_periodo_igual_al_promedio_diario(censos):
+    interpolada = poblacion.InterpolacionPoblacion(censos)
+    desde, hasta = ['2019-01-01', '2020-02-10'], ['2019-12-31', '2020-03-05']
+    esperados = [interpolada.en_fechas(pd.date_range(d, h)).mean() for d, h in zip(desde, hasta)]
+    np.testing.assert_allclose(interpolada.promedio_periodo(desde, hasta), esperados)
+
+
+def test_fechas_fuera_de_la_tabla(censos):
+    interpolada = poblacion.InterpolacionPoblacion(censos, hasta=2030)
+    with pytest.raises(ValueError):
+        interpolada.en_fechas(['2031-01-01'])
+    with pytest.raises(ValueError):
+        poblacion.InterpolacionPoblacion(censos, metodo='cuadratico')
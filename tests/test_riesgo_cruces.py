@@ -0,0 +1,59 @@
+"""
+Ranking de intersecciones sobre los datos limpios, agregados en lotes por año.
+"""
+import pandas as pd
+import pytest
+
+import normalizacion
+import riesgo_cruces
+
+
+@pytest.fixture
+def ranking(limpio):
+    ranking = riesgo_cruces.RankingCruces(k=20)
+    for _, lote in limpio.groupby('Año'):
+        ranking.agregar(lote)
+    return ranking
+
+
+def _par_exacto(direccion):
+    # Las calles del cruce canonizadas sin unificar por similitud
+    calles, _ = normalizacion.separar_lugar(direccion)
+    return frozenset(filter(None, map(normalizacion.canonizar_calle, calles)))
+
+
+def test_top_no_mezcla_cruces_distintos(limpio, ranking):
+    claves = normalizacion.claves_de_lugar(limpio, ranking.resolvedor)['Clave lugar']
+    pares = limpio['Dirección normalizada'].map(_par_exacto)
+    for vida in ranking.vidas_medias:
+        for comuna in [None] + sorted(limpio['Comuna'].unique()):
+            for clave in ranking.top(comuna=comuna, vida_media=vida)['Intersección']:
+                assert pares[claves == clave].nunique() == 1, clave
+
+    por_nombre = ranking.tabla().set_index('Nombre')['Intersección']
+    assert por_nombre['MONROE y 3 DE FEBRERO'] == '3 FEBRERO Y MONROE'
+    assert por_nombre['9 DE JULIO AV. y LAVALLE'] == '9 JULIO Y LAVALLE'
+
+
+def test_top_igual_a_ordenar_todos_los_contadores(limpio, ranking):
+    for vida in ranking.vidas_medias:
+        completa = ranking.tabla(vida).sort_values(['Riesgo', 'Intersección'], ascending=[False, True])
+        for comuna in [None, 1, 4]:
+            esperada = completa if comuna is None else completa[completa['Comuna'] == comuna]
+            obtenida = ranking.top(comuna=comuna, vida_media=vida)
+            assert obtenida['Intersección'].tolist() == esperada['Intersección'].head(20).tolist()
+            pd.testing.assert_series_equal(obtenida['Riesgo'], esperada['Riesgo'].head(20).reset_index(drop=True))
+
+
+def test_fecha_faltante_no_anula_el_ranking(limpio):
+    en_cruce = limpio.index[limpio['Dirección normalizada'].str.contains(' y ', na=False)]
+    limpio.loc[en_cruce[0], 'Fecha'] = None
+    ranking = riesgo_cruces.RankingCruces(k=20)
+    asignadas = ranking.agregar(limpio)
+
+    sin_fecha = riesgo_cruces.RankingCruces(k=20)
+    assert asignadas == sin_fecha.agregar(limpio.drop(en_cruce[0]))
+    for vida in ranking.vidas_medias:
+        top = ranking.top(vida_media=vida)
+        assert top['Riesgo'].notna().all()
+        pd.testing.assert_frame_equal(top, sin_fecha.top(vida_media=vida))
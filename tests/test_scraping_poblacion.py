@@ -0,0 +1,96 @@
+"""
+Caché HTTP del scraping de población con una sesión falsa, y paridad de los parsers sin conexión.
+"""
+import pandas as pd
+import pytest
+
+import scraping_poblacion
+
+requests = pytest.importorskip('requests')
+
+URL = 'https://ejemplo.invalid/Buenos_Aires'
+
+
+class Respuesta:
+    def __init__(self, status_code, text='', headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+        self.encoding = 'utf-8'
+
+
+class SesionFalsa:
+    """
+    Devuelve las respuestas indicadas en orden y guarda los encabezados de cada petición.
+    """
+
+    def __init__(self, *respuestas):
+        self.respuestas = list(respuestas)
+        self.pedidos = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.pedidos.append(dict(headers or {}))
+        respuesta = self.respuestas.pop(0)
+        if isinstance(respuesta, Exception):
+            raise respuesta
+        return respuesta
+
+
+@pytest.fixture
+def fixture_html():
+    with open(scraping_poblacion.RUTA_FIXTURE, encoding='utf-8') as archivo:
+        return archivo.read()
+
+
+def test_get_condicional_y_304(tmp_path, fixture_html):
+    sesion = SesionFalsa(Respuesta(200, fixture_html, {'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jan 2024'}),
+                         Respuesta(304))
+    cache = scraping_poblacion.CacheHTTP(str(tmp_path), sesion=sesion)
+    assert cache.obtener(URL) == fixture_html
+    assert 'If-None-Match' not in sesion.pedidos[0]
+
+    assert cache.obtener(URL) == fixture_html
+    assert sesion.pedidos[1]['If-None-Match'] == '"v1"'
+    assert sesion.pedidos[1]['If-Modified-Since'] == 'Mon, 01 Jan 2024'
+
+
+def test_sin_red_usa_la_copia_guardada(tmp_path, fixture_html):
+    sesion = SesionFalsa(Respuesta(200, fixture_html, {'ETag': '"v1"'}), requests.ConnectionError('sin red'))
+    cache = scraping_poblacion.CacheHTTP(str(tmp_path), sesion=sesion)
+    cache.obtener(URL)
+    assert cache.obtener(URL) == fixture_html
+    assert cache.obtener(URL, offline=True) == fixture_html
+    assert len(sesion.pedidos) == 2
+
+
+def test_sin_red_ni_copia(tmp_path):
+    cache = scraping_poblacion.CacheHTTP(str(tmp_path), sesion=SesionFalsa(requests.Timeout('sin red')))
+    with pytest.raises(scraping_poblacion.ErrorScraping):
+        cache.obtener(URL)
+    with pytest.raises(scraping_poblacion.ErrorScraping):
+        cache.obtener(URL, offline=True)
+
+
+def test_respuesta_de_error_sin_copia(tmp_path):
+    cache = scraping_poblacion.CacheHTTP(str(tmp_path), sesion=SesionFalsa(Respuesta(503)))
+    with pytest.raises(scraping_poblacion.ErrorScraping, match='503'):
+        cache.obtener(URL)
+
+
+def test_obtener_poblacion_reutiliza_la_tabla_parseada(tmp_path, fixture_html, monkeypatch):
+    sesion = SesionFalsa(Respuesta(200, fixture_html, {'ETag': '"v1"'}), Respuesta(304))
+    cache = scraping_poblacion.CacheHTTP(str(tmp_path), sesion=sesion)
+    primera = scraping_poblacion.obtener_poblacion(URL, cache=cache)
+
+    def sin_parsear(*args, **kwargs):
+        raise AssertionError('la página no cambió y no debería volver a parsearse')
+
+    monkeypatch.setattr(scraping_poblacion, 'extraer_poblacion', sin_parsear)
+    pd.testing.assert_frame_equal(scraping_poblacion.obtener_poblacion(URL, cache=cache), primera)
+
+
+@pytest.mark.parametrize('parser', ['lxml', 'bs4'])
+def test_parsers_sin_conexion_reproducen_el_csv(parser):
+    pytest.importorskip('lxml' if parser == 'lxml' else 'bs4')
+    tabla = scraping_poblacion.obtener_poblacion(offline=True, parser=parser)
+    pd.testing.assert_frame_equal(tabla, pd.read_csv('Data/poblacionCABA.csv'), check_dtype=False)
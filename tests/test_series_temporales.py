@@ -0,0 +1,67 @@
+"""
+Las series de 'series_temporales' coinciden con las de resample y rolling de pandas.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import series_temporales
+
+
+def _por_periodo(fechas, frecuencia):
+    if frecuencia == 'W':
+        # Semanas de lunes a domingo, con la fecha del lunes
+        return fechas.dt.to_period('W-SUN').dt.start_time
+    return fechas.dt.to_period(frecuencia).dt.start_time
+
+
+@pytest.mark.parametrize('frecuencia', ['D', 'W', 'M'])
+def test_series_iguales_a_resample(limpio, frecuencia):
+    series = series_temporales.construir_series(limpio, frecuencia)
+    fechas = pd.to_datetime(limpio['Fecha'])
+
+    total = limpio.set_index(fechas).resample({'D': 'D', 'W': 'W-SUN', 'M': 'MS'}[frecuencia]).size()
+    assert series[('Total', 'Total')].sum() == len(limpio)
+    assert series[('Total', 'Total')].to_numpy().tolist() == total.to_numpy().tolist()
+
+    periodos = _por_periodo(fechas, frecuencia)
+    for dimension in series_temporales.DIMENSIONES_SERIES:
+        esperadas = (limpio.groupby([periodos.rename('Período'), limpio[dimension]]).size()
+                           .unstack(fill_value=0).reindex(series.index, fill_value=0))
+        obtenidas = series[dimension]
+        pd.testing.assert_frame_equal(obtenidas, esperadas.reindex(columns=obtenidas.columns),
+                                      check_dtype=False, check_names=False, check_freq=False)
+
+
+def test_fecha_faltante_se_omite(limpio):
+    con_faltantes = limpio.copy()
+    con_faltantes.loc[con_faltantes.index[:3], 'Fecha'] = [None, 'SD', float('nan')]
+    pd.testing.assert_frame_equal(series_temporales.construir_series(con_faltantes),
+                                  series_temporales.construir_series(limpio.iloc[3:]))
+
+    con_faltantes['Fecha'] = None
+    with pytest.raises(ValueError):
+        series_temporales.construir_series(con_faltantes)
+
+
+@pytest.mark.parametrize('funcion', ['sum', 'mean'])
+def test_ventana_movil_igual_a_rolling(limpio, funcion):
+    series = series_temporales.construir_series(limpio, 'W')
+    pd.testing.assert_frame_equal(series_temporales.ventana_movil(series, 4, funcion),
+                                  series.astype(float).rolling(4).agg(funcion), check_freq=False)
+
+
+def test_variacion_interanual_mensual(limpio):
+    series = series_temporales.construir_series(limpio, 'M')
+    variacion = series_temporales.variacion_interanual(series)
+    pd.testing.assert_frame_equal(variacion, series - series.shift(12))
+    assert variacion.iloc[:12].isna().all().all()
+
+
+def test_descomponer_suma_la_serie(limpio):
+    series = series_temporales.construir_series(limpio, 'M')
+    partes = series_temporales.descomponer(series)
+    suma = partes['tendencia'] + partes['estacional'] + partes['residuo']
+    validas = partes['tendencia'].notna().to_numpy()
+    np.testing.assert_allclose(suma.to_numpy()[validas], series.to_numpy(dtype=float)[validas])
+    np.testing.assert_allclose(partes['estacional'].iloc[:12].sum(), 0, atol=1e-9)
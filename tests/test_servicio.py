@@ -0,0 +1,136 @@
+"""
+Parámetros, caché y respuestas HTTP del servicio analítico.
+"""
+import asyncio
+import http.client
+import json
+import threading
+
+import pytest
+
+import servicio
+
+
+@pytest.fixture(scope='module')
+def analitico():
+    return servicio.ServicioAnalitico.desde_csv(ttl=60)
+
+
+@pytest.fixture(scope='module')
+def puerto(analitico):
+    bucle = asyncio.new_event_loop()
+    listo = threading.Event()
+    efectivo = []
+
+    def escuchando(numero):
+        efectivo.append(numero)
+        listo.set()
+
+    tarea = bucle.create_task(analitico.servir(puerto=0, listo=escuchando))
+
+    def correr():
+        try:
+            bucle.run_until_complete(tarea)
+        except asyncio.CancelledError:
+            pass
+
+    hilo = threading.Thread(target=correr, daemon=True)
+    hilo.start()
+    assert listo.wait(10)
+    yield efectivo[0]
+    bucle.call_soon_threadsafe(tarea.cancel)
+    hilo.join(10)
+    bucle.close()
+
+
+def _pedir(puerto, objetivo, **encabezados):
+    conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=30)
+    conexion.request('GET', objetivo, headers=encabezados)
+    respuesta = conexion.getresponse()
+    resultado = respuesta.status, dict(respuesta.getheaders()), respuesta.read()
+    conexion.close()
+    return resultado
+
+
+def test_normalizar_parametros_equivalentes():
+    esperados = servicio.normalizar_parametros('anio=2020&anio=2021&victima=moto')
+    assert servicio.normalizar_parametros('anio=2021,2020&victima=MOTO') == esperados
+    assert servicio.normalizar_parametros('victima=Moto&anio=2021&anio=2020,2021') == esperados
+    assert servicio.normalizar_parametros('anio=&comuna=') == ()
+    assert servicio.normalizar_parametros('desde=2020-01-01') == (('desde', '2020-01-01'),)
+
+
+@pytest.mark.parametrize('consulta', ['color=rojo', 'anio=dos mil', 'desde=2021-02-30',
+                                      'desde=2021-01-01&hasta=2020-01-01'])
+def test_normalizar_parametros_invalidos(consulta):
+    with pytest.raises(servicio.ErrorPeticion) as error:
+        servicio.normalizar_parametros(consulta)
+    assert error.value.codigo == 400
+
+
+def test_cache_lru_desaloja_el_menos_usado_y_vence():
+    ahora = [0.0]
+    cache = servicio.CacheLRU(capacidad=2, ttl=10, reloj=lambda: ahora[0])
+    cache.guardar('a', 1)
+    cache.guardar('b', 2)
+    assert cache.obtener('a') == 1
+    cache.guardar('c', 3)
+    assert cache.obtener('b') is None
+    assert list(cache.entradas) == ['a', 'c']
+
+    ahora[0] = 10.0
+    assert cache.obtener('c') == 3
+    ahora[0] = 10.5
+    assert cache.obtener('a') is None
+    assert 'a' not in cache.entradas
+    assert cache.estado() == {'entradas': 1, 'capacidad': 2, 'aciertos': 2, 'fallos': 2}
+
+
+def test_peticiones_iguales_comparten_el_calculo(analitico, monkeypatch):
+    llamadas = []
+    calcular = analitico.calcular
+
+    def contar(ruta, parametros):
+        llamadas.append((ruta, parametros))
+        return calcular(ruta, parametros)
+
+    monkeypatch.setattr(analitico, 'calcular', contar)
+    parametros = servicio.normalizar_parametros('anio=2019&comuna=3')
+
+    async def pedir_varias():
+        # Otro bucle que el del servidor: el ejecutor es el mismo
+        return await asyncio.gather(*(analitico.responder(f'/tablas/{nombre}', parametros)
+                                      for nombre in analitico.tablas for _ in range(20)))
+
+    cuerpos = asyncio.run(pedir_varias())
+    assert llamadas == [('/tablas/', parametros)]
+    assert len(set(cuerpos)) <= len(analitico.tablas)
+    assert analitico.cache.obtener((f'/tablas/{analitico.tablas[0]}', parametros)) == cuerpos[0]
+
+
+def test_etag_y_304(puerto):
+    codigo, encabezados, cuerpo = _pedir(puerto, '/tablas/victimas_por_sexo?anio=2021,2020')
+    assert codigo == 200 and json.loads(cuerpo)
+    etag = encabezados['ETag']
+
+    codigo, encabezados, cuerpo = _pedir(puerto, '/tablas/victimas_por_sexo?anio=2020&anio=2021',
+                                         **{'If-None-Match': etag})
+    assert (codigo, cuerpo, encabezados['ETag']) == (304, b'', etag)
+
+    codigo, _, _ = _pedir(puerto, '/tablas/victimas_por_sexo?anio=2020', **{'If-None-Match': etag})
+    assert codigo == 200
+
+
+def test_rutas_y_tablas_desconocidas(puerto):
+    codigo, _, cuerpo = _pedir(puerto, '/tablas/no_existe')
+    assert codigo == 404 and 'no_existe' in json.loads(cuerpo)['error']
+    assert _pedir(puerto, '/otra')[0] == 404
+    assert _pedir(puerto, '/tablas?color=rojo')[0] == 400
+
+
+def test_kpis_con_conteos_enteros(puerto):
+    codigo, _, cuerpo = _pedir(puerto, '/kpis?anio=2021&comuna=1')
+    filas = json.loads(cuerpo)
+    assert codigo == 200 and {fila['Año'] for fila in filas} == {2021}
+    for columna in servicio.CONTEOS_KPI:
+        assert all(isinstance(fila[columna], int) for fila in filas), columna
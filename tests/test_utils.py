@@ -0,0 +1,105 @@
+"""
+Equivalencia de los caminos vectorizados de Utils y agregaciones con los originales fila a fila.
+"""
+import warnings
+from datetime import datetime, time
+
+import pandas as pd
+import pytest
+
+import agregaciones
+import Utils
+
+TABLAS_VECTORIZADAS = [
+    agregaciones.tabla_victimas_por_dia_semana,
+    agregaciones.tabla_accidentes_por_categoria_tiempo,
+    agregaciones.tabla_accidentes_por_hora_del_dia,
+    agregaciones.tabla_accidentes_semana_fin_de_semana,
+]
+
+
+def test_convertir_serie_a_time_en_datos_limpios(limpio):
+    pd.testing.assert_series_equal(Utils.convertir_serie_a_time(limpio['Hora']),
+                                   Utils.convertir_serie_a_time(limpio['Hora'], vectorizado=False))
+
+
+def test_convertir_serie_a_time_con_tipos_mezclados():
+    serie = pd.Series(['04:00:00', 'SD', datetime(2020, 1, 1, 23, 59, 1), time(7, 30), None, '25:00:00'],
+                      dtype=object)
+    vectorizada = Utils.convertir_serie_a_time(serie)
+    original = Utils.convertir_serie_a_time(serie, vectorizado=False)
+    assert vectorizada.tolist() == original.tolist()
+
+
+def test_crea_categoria_momento_dia_serie_por_hora():
+    horas = pd.Series(range(24))
+    esperadas = [agregaciones.crea_categoria_momento_dia(time(hora)) for hora in horas]
+    assert agregaciones.crea_categoria_momento_dia_serie(horas).tolist() == esperadas
+
+
+def test_crea_categoria_momento_dia_serie_en_datos_limpios(limpio):
+    horas = pd.to_datetime(limpio['Hora'], format='%H:%M:%S')
+    esperadas = horas.apply(agregaciones.crea_categoria_momento_dia)
+    obtenidas = agregaciones.crea_categoria_momento_dia_serie(horas.dt.hour)
+    assert obtenidas.tolist() == esperadas.tolist()
+
+
+def test_imputar_edad_promedio_por_sexo(limpio, capsys):
+    limpio['Edad'] = limpio['Edad'].astype(object)
+    limpio.loc[limpio.index[::7], 'Edad'] = 'SD'
+    vectorizado, original = limpio.copy(), limpio.copy()
+    Utils.imputar_edad_promedio_por_sexo(vectorizado)
+    Utils.imputar_edad_promedio_por_sexo(original, vectorizado=False)
+    pd.testing.assert_series_equal(vectorizado['Edad'], original['Edad'])
+
+
+@pytest.mark.parametrize('tabla', TABLAS_VECTORIZADAS, ids=lambda tabla: tabla.__name__)
+def test_tablas_vectorizadas(limpio, tabla):
+    with warnings.catch_warnings():
+        # El camino original convierte 'Hora' sin formato, como lo hacía el notebook
+        warnings.simplefilter('ignore', UserWarning)
+        original = tabla(limpio, vectorizado=False)
+    pd.testing.assert_frame_equal(tabla(limpio).reset_index(drop=True), original.reset_index(drop=True))
+
+
+def test_tablas_eda(limpio):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        originales = agregaciones.tablas_eda(limpio, vectorizado=False)
+    vectorizadas = agregaciones.tablas_eda(limpio)
+    assert vectorizadas.keys() == originales.keys()
+    for nombre, tabla in vectorizadas.items():
+        pd.testing.assert_frame_equal(tabla.reset_index(drop=True), originales[nombre].reset_index(drop=True),
+                                      obj=nombre)
+
+
+def test_tipos_de_variables(limpio):
+    vectorizado = Utils.tipos_de_variables(limpio)
+    original = Utils.tipos_de_variables(limpio, vectorizado=False)
+    pd.testing.assert_frame_equal(pd.DataFrame(vectorizado), pd.DataFrame(original))
+
+
+@pytest.mark.parametrize('serie', [
+    pd.Series(pd.array([1, None, 3], dtype='Int64')),
+    pd.Series(pd.array([1, 3], dtype='Int64')),
+    pd.Series(pd.array([True, None], dtype='boolean')),
+    pd.Series(pd.array([1.5, None], dtype='Float64')),
+    pd.Series(['a', None], dtype='string'),
+    pd.Series([1, None, 2], dtype='category'),
+], ids=lambda serie: str(serie.dtype))
+def test_conteo_tipos_en_extensiones_con_nulos(serie):
+    original = serie.apply(type).value_counts(sort=False).to_dict()
+    conteos = Utils._conteo_tipos_serie(serie)
+    assert {tipo: cantidad for tipo, (cantidad, _) in conteos.items()} == original
+    assert Utils.tipos_de_variables(serie.to_frame('x')) == Utils.tipos_de_variables(serie.to_frame('x'),
+                                                                                      vectorizado=False)
+
+
+def test_hora_del_dia_omite_horas_invalidas(limpio):
+    validas = limpio.copy()
+    limpio.loc[limpio.index[:4], 'Hora'] = ['SD', None, '25:99:00', float('nan')]
+    esperada = agregaciones.tabla_accidentes_por_hora_del_dia(validas.iloc[4:])
+    obtenida = agregaciones.tabla_accidentes_por_hora_del_dia(limpio)
+    pd.testing.assert_frame_equal(obtenida.reset_index(drop=True), esperada.reset_index(drop=True),
+                                  check_dtype=False)
+    assert limpio.derivadas['Hora del día'].iloc[:4].isna().all()
@@ -0,0 +1,30 @@
+"""
+Severidad de las reglas de calidad sobre la fuente del ETL.
+"""
+import pytest
+
+import etl
+import validacion
+
+
+@pytest.fixture(scope='module')
+def fuente():
+    return etl.leer_fuente()
+
+
+def test_coordenada_fuera_de_caba_es_aviso(fuente):
+    hechos, victimas = fuente
+    hechos = hechos.copy()
+    hechos.loc[hechos.index[0], 'Pos x'] = '-60.5'
+    resultado = validacion.validar({'hechos': hechos, 'victimas': victimas})
+    fila = resultado.resumen[(resultado.resumen['Columna'] == 'Pos x') & (resultado.resumen['Regla'] == 'rango')]
+    assert fila['Severidad'].item() == 'aviso'
+    assert fila['Violaciones'].item() >= 1
+    # Una coordenada mal geocodificada no detiene la carga
+    resultado.exigir()
+
+
+def test_las_coordenadas_tienen_la_severidad_de_las_demas_reglas_de_calidad():
+    for reglas in (validacion.REGLAS_FUENTE, validacion.REGLAS_LIMPIO):
+        severidades = {regla.severidad for regla in reglas if regla.columna in validacion.LIMITES_CABA}
+        assert severidades == {'aviso'}
@@ -0,0 +1,373 @@
+"""
+Validación declarativa de la calidad de los datos de homicidios.
+
+Reemplaza los controles puntuales de EDA_Parte_1.ipynb ('SD' como valor faltante, 'Point (. .)'
+y '.' como coordenadas, 'Id' duplicados, tipos mezclados en 'Hora') por reglas declaradas en
+listas ('REGLAS_FUENTE' para las hojas del Excel, 'REGLAS_LIMPIO' para el DataFrame limpio
+compacto). Los tipos de regla son:
+
+* 'centinela': valores que representan un dato faltante, como 'SD'. Las demás reglas de la
+  columna no los evalúan, para no contarlos dos veces.
+* 'categorias': valores permitidos.
+* 'rango': mínimo y máximo de los valores numéricos (los que no son números se ignoran).
+* 'tipo': tipos de Python permitidos, para detectar columnas con tipos mezclados.
+* 'patron': expresión regular que deben cumplir los valores de texto.
+* 'no_nulo': la columna no admite nulos.
+* 'unica': la columna no admite valores repetidos.
+* 'referencia': cada valor debe existir en la columna de otra tabla.
+
+Las reglas de valores se evalúan en una sola pasada por columna: la columna se factoriza una
+vez (en las categóricas, los códigos ya existen), cada regla se evalúa sobre los valores
+distintos y las violaciones se cuentan con un np.bincount de los códigos. Las filas solo se
+recorren de nuevo para tomar los ejemplos de las reglas con violaciones. En las columnas
+numéricas, los rangos se comparan directamente sobre el array.
+
+Cada regla tiene una severidad: 'error' hace fallar 'ResultadoValidacion.exigir', mientras
+que 'aviso' solo se informa (por ejemplo, los 'SD' de la fuente, que el ETL imputa).
+"""
+import datetime
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+SEVERIDADES = ('error', 'aviso')
+
+TIPOS_REGLA = ('centinela', 'categorias', 'rango', 'tipo', 'patron', 'no_nulo', 'unica', 'referencia')
+
+# Rectángulo que contiene a CABA, en grados (longitud para 'Pos x', latitud para 'Pos y')
+LIMITES_CABA = {'Pos x': (-58.54, -58.33), 'Pos y': (-34.71, -34.52)}
+
+VICTIMAS = ['MOTO', 'PEATON', 'AUTO', 'BICICLETA', 'CARGAS', 'PASAJEROS', 'MOVIL', 'OTRO', 'SD']
+
+ROLES = ['CONDUCTOR', 'PEATON', 'PASAJERO_ACOMPAÑANTE', 'CICLISTA']
+
+SEXOS = ['MASCULINO', 'FEMENINO']
+
+TIPOS_CALLE = ['AVENIDA', 'CALLE', 'AUTOPISTA', 'GRAL PAZ']
+
+ACUSADOS = ['AUTO', 'PASAJEROS', 'CARGAS', 'OBJETO FIJO', 'MOTO', 'MULTIPLE', 'BICICLETA', 'OTRO', 'TREN', 'SD']
+
+PATRON_XY = r'Point \(-?\d+(\.\d+)? -?\d+(\.\d+)?\)'
+
+PATRON_HORA = r'\d{1,2}:\d{2}(:\d{2})?'
+
+
+class Regla:
+    """
+    Una regla de calidad sobre una columna de una tabla.
+
+    Parameters:
+        tabla (str): Nombre de la tabla, la clave en el diccionario pasado a 'validar'.
+        columna (str): Columna a validar.
+        tipo (str): Uno de TIPOS_REGLA.
+        parametro: Depende del tipo: la lista de valores ('centinela', 'categorias'), el par
+            (mínimo, máximo) ('rango'), la tupla de tipos ('tipo'), la expresión regular
+            ('patron') o el par (tabla, columna) referenciado ('referencia').
+        severidad (str): 'error' o 'aviso'.
+        descripcion (str, opcional): Texto del reporte. Por defecto, uno generado.
+    """
+
+    def __init__(self, tabla, columna, tipo, parametro=None, severidad='error', descripcion=None):
+        if tipo not in TIPOS_REGLA:
+            raise ValueError(f"tipo debe ser uno de {TIPOS_REGLA}, no {tipo!r}")
+        if severidad not in SEVERIDADES:
+            raise ValueError(f"severidad debe ser una de {SEVERIDADES}, no {severidad!r}")
+        self.tabla = tabla
+        self.columna = columna
+        self.tipo = tipo
+        self.parametro = re.compile(parametro) if tipo == 'patron' else parametro
+        self.severidad = severidad
+        self.descripcion = descripcion or self._descripcion()
+
+    def _descripcion(self):
+        if self.tipo == 'centinela':
+            return f'Valores faltantes {list(self.parametro)}'
+        if self.tipo == 'categorias':
+            return 'Valores fuera de las categorías permitidas'
+        if self.tipo == 'rango':
+            return f'Valores fuera de [{self.parametro[0]}, {self.parametro[1]}]'
+        if self.tipo == 'tipo':
+            return f'Valores que no son {"/".join(t.__name__ for t in self.parametro)}'
+        if self.tipo == 'patron':
+            return f'Textos que no cumplen {self.parametro.pattern!r}'
+        if self.tipo == 'no_nulo':
+            return 'Valores nulos'
+        if self.tipo == 'unica':
+            return 'Valores repetidos'
+        return f'Valores que no están en {self.parametro[0]}.{self.parametro[1]}'
+
+    def __repr__(self):
+        return f'Regla({self.tabla!r}, {self.columna!r}, {self.tipo!r}, severidad={self.severidad!r})'
+
+
+def _reglas_coordenadas(tabla, centinela):
+    # En el DataFrame compacto, los '.' de la fuente quedan como nulos al convertir a float.
+    # Una coordenada mal geocodificada es un problema de calidad como una comuna fuera de
+    # rango o un punto faltante: se informa como aviso y no detiene la carga del ETL
+    return [regla
+            for columna, (minimo, maximo) in LIMITES_CABA.items()
+            for regla in (Regla(tabla, columna, 'centinela', [centinela], 'aviso'),
+                          Regla(tabla, columna, 'no_nulo', severidad='aviso', descripcion='Coordenadas faltantes'),
+                          Regla(tabla, columna, 'rango', (minimo, maximo), 'aviso',
+                                f'Coordenadas fuera de CABA [{minimo}, {maximo}]'))]
+
+
+REGLAS_FUENTE = [
+    Regla('hechos', 'Id', 'no_nulo'),
+    Regla('hechos', 'Id', 'unica'),
+    Regla('hechos', 'Id', 'referencia', ('victimas', 'Id'), 'aviso', 'Hechos sin víctimas'),
+    Regla('hechos', 'Cantidad víctimas', 'rango', (1, 50)),
+    Regla('hechos', 'Año', 'rango', (2000, 2100)),
+    Regla('hechos', 'Mes', 'rango', (1, 12)),
+    Regla('hechos', 'Día', 'rango', (1, 31)),
+    Regla('hechos', 'Hora', 'centinela', ['SD'], 'aviso'),
+    Regla('hechos', 'Hora', 'tipo', (datetime.time,), 'aviso', 'Horas que no son datetime.time (tipos mezclados)'),
+    Regla('hechos', 'Hora', 'patron', PATRON_HORA),
+    Regla('hechos', 'Hora entera', 'centinela', ['SD'], 'aviso'),
+    Regla('hechos', 'Hora entera', 'rango', (0, 23)),
+    Regla('hechos', 'Tipo de calle', 'categorias', TIPOS_CALLE),
+    Regla('hechos', 'Comuna', 'categorias', list(range(1, 16)), 'aviso', 'Comunas fuera de 1 a 15'),
+    Regla('hechos', 'XY (CABA)', 'centinela', ['Point (. .)'], 'aviso'),
+    Regla('hechos', 'XY (CABA)', 'patron', PATRON_XY),
+    *_reglas_coordenadas('hechos', '.'),
+    Regla('hechos', 'Víctima', 'categorias', VICTIMAS + ['OBJETO FIJO', 'PEATON_MOTO']),
+    Regla('hechos', 'Acusado', 'categorias', ACUSADOS),
+    Regla('victimas', 'Id', 'no_nulo'),
+    Regla('victimas', 'Id', 'referencia', ('hechos', 'Id'), 'error', "'Id' que no están en HECHOS"),
+    Regla('victimas', 'Rol', 'centinela', ['SD'], 'aviso'),
+    Regla('victimas', 'Rol', 'categorias', ROLES),
+    Regla('victimas', 'Sexo', 'centinela', ['SD'], 'aviso'),
+    Regla('victimas', 'Sexo', 'categorias', SEXOS),
+    Regla('victimas', 'Edad', 'centinela', ['SD'], 'aviso'),
+    Regla('victimas', 'Edad', 'tipo', (int, np.integer)),
+    Regla('victimas', 'Edad', 'rango', (0, 110)),
+    Regla('victimas', 'Víctima', 'categorias', VICTIMAS),
+]
+
+REGLAS_LIMPIO = [
+    Regla('limpio', 'Id número', 'no_nulo'),
+    Regla('limpio', 'Rol', 'categorias', ROLES),
+    Regla('limpio', 'Sexo', 'categorias', SEXOS),
+    Regla('limpio', 'Edad', 'no_nulo'),
+    Regla('limpio', 'Edad', 'rango', (0, 110)),
+    Regla('limpio', 'Fecha', 'no_nulo'),
+    Regla('limpio', 'Mes', 'rango', (1, 12)),
+    Regla('limpio', 'Hora', 'no_nulo'),
+    Regla('limpio', 'Hora', 'rango', (0, 86399), descripcion='Segundos del día fuera de [0, 86399]'),
+    Regla('limpio', 'Hora entera', 'rango', (0, 23)),
+    Regla('limpio', 'Tipo de calle', 'categorias', TIPOS_CALLE),
+    Regla('limpio', 'Comuna', 'categorias', list(range(1, 16)), 'aviso', 'Comunas fuera de 1 a 15'),
+    *_reglas_coordenadas('limpio', 0),
+    Regla('limpio', 'Víctima', 'centinela', ['SD'], 'aviso'),
+    Regla('limpio', 'Víctima', 'categorias', VICTIMAS),
+    Regla('limpio', 'Acusado', 'categorias', ACUSADOS),
+]
+
+
+class ErrorValidacion(ValueError):
+    """
+    Los datos no cumplen alguna regla de severidad 'error'.
+
+    Parameters:
+        resultado (ResultadoValidacion): El resultado con las violaciones.
+    """
+
+    def __init__(self, resultado):
+        errores = resultado.errores()
+        detalle = '; '.join(f"{fila['Tabla']}.{fila['Columna']}: {fila['Descripción']} ({fila['Violaciones']})"
+                            for _, fila in errores.iterrows())
+        super().__init__(f'{len(errores)} reglas con errores: {detalle}')
+        self.resultado = resultado
+
+
+class ResultadoValidacion:
+    """
+    Resultado de 'validar': el resumen por regla y los ejemplos de filas que no cumplen.
+
+    Parameters:
+        resumen (pd.DataFrame): Una fila por regla con 'Tabla', 'Columna', 'Regla',
+            'Severidad', 'Descripción', 'Filas', 'Violaciones' y 'Porcentaje'.
+        ejemplos (dict): Para cada regla con violaciones (por su posición en el resumen), un
+            DataFrame con algunas de las filas que no la cumplen.
+    """
+
+    def __init__(self, resumen, ejemplos):
+        self.resumen = resumen
+        self.ejemplos = ejemplos
+
+    def errores(self):
+        """
+        Devuelve las filas del resumen de reglas 'error' con violaciones.
+        """
+        return self.resumen[(self.resumen['Severidad'] == 'error') & (self.resumen['Violaciones'] > 0)]
+
+    @property
+    def valido(self):
+        return self.errores().empty
+
+    def exigir(self):
+        """
+        Lanza ErrorValidacion si alguna regla de severidad 'error' tiene violaciones.
+
+        Returns:
+            ResultadoValidacion: El mismo resultado, para encadenar.
+        """
+        if not self.valido:
+            raise ErrorValidacion(self)
+        return self
+
+
+def _codificar(serie):
+    """
+    Devuelve los códigos de cada fila (-1 para nulos) y los valores distintos de la columna.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(), pd.Index(serie.cat.categories, dtype=object)
+    codigos, valores = pd.factorize(serie, use_na_sentinel=True)
+    return codigos, pd.Index(valores, dtype=object)
+
+
+def _en(valores, lista):
+    """
+    Indica qué valores distintos están en la lista; en el Index de objetos, 3 y np.int8(3) son iguales.
+    """
+    return pd.Index(valores, dtype=object).isin(list(lista))
+
+
+def _esta_en(serie, referencia):
+    """
+    Indica qué filas de la Serie tienen un valor presente en 'referencia'.
+
+    Para textos se usa pyarrow.compute.is_in, mucho más rápido que Series.isin sobre las
+    cadenas de pyarrow de pandas 3 cuando la referencia tiene cientos de miles de valores.
+    """
+    try:
+        return pc.is_in(pa.array(serie, from_pandas=True),
+                        value_set=pa.array(referencia, from_pandas=True)).to_numpy(zero_copy_only=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return serie.isin(referencia).to_numpy()
+
+
+def _violaciones_valores(regla, valores):
+    """
+    Evalúa una regla de valores sobre los valores distintos de la columna.
+
+    Returns:
+        np.ndarray: Booleano por valor distinto; True si el valor viola la regla.
+    """
+    if regla.tipo == 'centinela':
+        return _en(valores, set(regla.parametro))
+    if regla.tipo == 'categorias':
+        return ~_en(valores, set(regla.parametro))
+    if regla.tipo == 'rango':
+        minimo, maximo = regla.parametro
+        numeros = pd.to_numeric(pd.Series(valores, dtype=object), errors='coerce').to_numpy(dtype=float)
+        with np.errstate(invalid='ignore'):
+            return (numeros < minimo) | (numeros > maximo)
+    if regla.tipo == 'tipo':
+        return np.array([not isinstance(valor, regla.parametro) for valor in valores], dtype=bool)
+    textos = (np.ones(len(valores), dtype=bool) if valores.inferred_type == 'string'
+              else np.array([isinstance(valor, str) for valor in valores], dtype=bool))
+    # Las expresiones regulares se resuelven con pyarrow sobre todos los textos a la vez
+    cumplen = pd.Series(valores[textos], dtype='string[pyarrow]').str.fullmatch(regla.parametro.pattern)
+    malos = np.zeros(len(valores), dtype=bool)
+    malos[textos] = ~cumplen.to_numpy(dtype=bool, na_value=True)
+    return malos
+
+
+def _evaluar_columna(serie, reglas, tablas):
+    """
+    Evalúa todas las reglas de una columna.
+
+    Returns:
+        list: Pares (regla, resultado), donde el resultado es una máscara de filas o, para las
+            reglas evaluadas sobre los valores distintos, la tupla (máscara de valores,
+            conteo de cada valor, códigos de las filas).
+    """
+    resultados = []
+    codigos = valores = conteos = excluidos = None
+    centinelas = {valor for regla in reglas if regla.tipo == 'centinela' for valor in regla.parametro}
+    numerica = pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie)
+    if numerica:
+        numeros = serie.to_numpy(dtype=float, na_value=np.nan)
+        faltantes = np.isin(numeros, list(centinelas))
+
+    for regla in reglas:
+        if regla.tipo == 'no_nulo':
+            resultados.append((regla, serie.isna().to_numpy()))
+        elif regla.tipo == 'unica':
+            resultados.append((regla, serie.duplicated(keep='first').to_numpy() & serie.notna().to_numpy()))
+        elif regla.tipo == 'referencia':
+            tabla, columna = regla.parametro
+            resultados.append((regla, ~_esta_en(serie, tablas[tabla][columna]) & serie.notna().to_numpy()))
+        elif numerica and regla.tipo == 'centinela':
+            resultados.append((regla, np.isin(numeros, list(regla.parametro))))
+        elif numerica and regla.tipo == 'rango':
+            minimo, maximo = regla.parametro
+            with np.errstate(invalid='ignore'):
+                resultados.append((regla, ((numeros < minimo) | (numeros > maximo)) & ~faltantes))
+        else:
+            if codigos is None:
+                codigos, valores = _codificar(serie)
+                conteos = np.bincount(codigos[codigos >= 0], minlength=len(valores))
+                excluidos = _en(valores, centinelas)
+            malos = _violaciones_valores(regla, valores)
+            if regla.tipo != 'centinela':
+                malos &= ~excluidos
+            resultados.append((regla, (malos, conteos, codigos)))
+    return resultados
+
+
+def validar(tablas, reglas=REGLAS_FUENTE, ejemplos=5):
+    """
+    Evalúa las reglas sobre las tablas, agrupando las reglas de cada columna en una pasada.
+
+    Parameters:
+        tablas (dict): DataFrames por nombre de tabla, por ejemplo {'hechos': ..., 'victimas': ...}.
+            Las reglas de tablas que no están en el diccionario se omiten.
+        reglas (list): Reglas a evaluar.
+        ejemplos (int): Cantidad máxima de filas de ejemplo por regla con violaciones.
+
+    Returns:
+        ResultadoValidacion: El resumen por regla, en el orden de 'reglas', y los ejemplos.
+    """
+    por_columna = {}
+    for regla in reglas:
+        if regla.tabla in tablas:
+            por_columna.setdefault((regla.tabla, regla.columna), []).append(regla)
+
+    evaluadas = {}
+    for (tabla, columna), reglas_columna in por_columna.items():
+        df = tablas[tabla]
+        if columna not in df.columns:
+            raise KeyError(f"La tabla '{tabla}' no tiene la columna '{columna}'")
+        for regla, resultado in _evaluar_columna(df[columna], reglas_columna, tablas):
+            evaluadas[id(regla)] = resultado
+
+    filas, muestras = [], {}
+    for regla in reglas:
+        if id(regla) not in evaluadas:
+            continue
+        resultado = evaluadas[id(regla)]
+        df = tablas[regla.tabla]
+        if isinstance(resultado, tuple):
+            malos, conteos, codigos = resultado
+            violaciones = int(conteos[malos].sum())
+        else:
+            violaciones = int(resultado.sum())
+        if violaciones and ejemplos:
+            if isinstance(resultado, tuple):
+                # Se agrega un False al final para que el código -1 de los nulos no cuente
+                resultado = np.append(malos, False)[codigos]
+            muestras[len(filas)] = df.iloc[np.flatnonzero(resultado)[:ejemplos]]
+        filas.append({'Tabla': regla.tabla, 'Columna': regla.columna, 'Regla': regla.tipo,
+                      'Severidad': regla.severidad, 'Descripción': regla.descripcion,
+                      'Filas': len(df), 'Violaciones': violaciones})
+
+    resumen = pd.DataFrame(filas, columns=['Tabla', 'Columna', 'Regla', 'Severidad', 'Descripción',
+                                           'Filas', 'Violaciones'])
+    resumen['Porcentaje'] = resumen['Violaciones'] / resumen['Filas'].replace(0, np.nan) * 100
+    return ResultadoValidacion(resumen, muestras)